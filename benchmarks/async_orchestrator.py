@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Async Orchestrator Benchmark
+
+Extracts every (pdf, system) unit twice: with the sequential loop (one
+``extract_text`` and one artifact write at a time, what the benchmark does
+without ``--async``) and with ``run_extraction_jobs`` at the given engine
+limit. Models are loaded before the sequential run and the orchestrator's
+worker start-up is included, so the comparison is conservative. Both runs
+must produce identical text (PyMuPDF4LLM's header detection is not
+bit-for-bit reproducible even between two sequential runs, so a few of its
+units may differ by a character or two).
+
+A second run gives every job a timeout far below the engine's latency, and
+a third caps worker RSS below the engine's footprint: all jobs must come
+back as ``timeout`` / ``oom`` with their workers replaced, and a final job
+without limits must still succeed. Both checks use the last system; RSS is
+polled every 0.25s, so it must be slower than that (PyMuPDF4LLM is).
+
+Usage: python -m benchmarks.async_orchestrator [--systems PyMuPDF PyMuPDF4LLM] [--limit 2] [--repeat 1] [--memory-limit 50]
+"""
+
+import argparse
+import asyncio
+import tempfile
+import time
+from pathlib import Path
+
+from scripts.async_orchestrator import EngineMemoryError, EnginePool, _extraction_handler, run_extraction_jobs
+from scripts.ocr_benchmark_gpu_optimized import GPUOptimizedOCRSystem, save_extraction
+from scripts.page_sharding import default_workers
+
+DEVICE_INFO = {'cuda_available': False, 'device': 'cpu', 'device_name': 'CPU'}
+
+
+def run_sequential(jobs, output_dir):
+    systems = {system_name: GPUOptimizedOCRSystem(system_name, DEVICE_INFO) for _, system_name in jobs}
+    for system in systems.values():
+        system.initialize()
+    start = time.perf_counter()
+    texts = {}
+    for pdf_path, system_name in jobs:
+        text, metadata = systems[system_name].extract_text(pdf_path)
+        save_extraction(output_dir, pdf_path.stem, system_name, text, metadata)
+        texts[(pdf_path, system_name)] = text
+    return time.perf_counter() - start, texts
+
+
+async def check_recovery(jobs, system_name, timeout=None, memory_limit_mb=None):
+    """Statuses of jobs run under an impossible limit, then of one job without"""
+    pool = EnginePool(system_name, 1, _extraction_handler, (system_name, DEVICE_INFO),
+                      memory_limit_mb=memory_limit_mb)
+    statuses = []
+    try:
+        for pdf_path, _ in jobs:
+            try:
+                await pool.run(pdf_path, timeout)
+                statuses.append('success')
+            except asyncio.TimeoutError:
+                statuses.append('timeout')
+            except EngineMemoryError:
+                statuses.append('oom')
+        pool.memory_limit_mb = None
+        _, metadata, _ = await pool.run(jobs[0][0])
+        return statuses, metadata['status'], pool.restarts
+    finally:
+        pool.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sequential vs asyncio-orchestrated extraction")
+    parser.add_argument('--pdf-dir', default='./pdfs')
+    parser.add_argument('--systems', nargs='+', default=['PyMuPDF', 'PyMuPDF4LLM'])
+    parser.add_argument('--limit', type=int, default=max(2, default_workers()),
+                        help='worker processes per engine for the orchestrated run')
+    parser.add_argument('--repeat', type=int, default=1)
+    parser.add_argument('--timeout', type=float, default=0.01,
+                        help='per-job timeout for the cancellation check')
+    parser.add_argument('--memory-limit', type=float, default=50,
+                        help='worker RSS cap in MB for the out-of-memory check')
+    args = parser.parse_args()
+
+    pdf_files = sorted(Path(args.pdf_dir).glob('*.pdf')) * args.repeat
+    if not pdf_files:
+        print(f"❌ No PDFs found in {args.pdf_dir}")
+        return
+    jobs = [(pdf_path, system_name) for pdf_path in pdf_files for system_name in args.systems]
+
+    print(f"\n⚡ ASYNC ORCHESTRATOR BENCHMARK ({len(jobs)} units, limit {args.limit} per engine)")
+    print("=" * 70)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        sequential_dir = Path(tmp) / 'sequential'
+        async_dir = Path(tmp) / 'async'
+        sequential_dir.mkdir()
+        async_dir.mkdir()
+
+        sequential_time, sequential = run_sequential(jobs, sequential_dir)
+        start = time.perf_counter()
+        limits = {system_name: args.limit for system_name in args.systems}
+        orchestrated = asyncio.run(run_extraction_jobs(jobs, async_dir, DEVICE_INFO, limits=limits))
+        async_time = time.perf_counter() - start
+
+    print()
+    for label, seconds in (('sequential loop', sequential_time), ('async orchestrator', async_time)):
+        print(f"  {label:<20} {len(jobs) / seconds * 60:>8.1f} units/min  ({seconds:.1f}s)")
+    print(f"  speedup: {sequential_time / async_time:.2f}x")
+
+    system_name = args.systems[-1]
+    print()
+    recovered = True
+    for label, expected, limits in ((f"{args.timeout:g}s timeout", 'timeout', {'timeout': args.timeout}),
+                                    (f"{args.memory_limit:g} MB RSS cap", 'oom',
+                                     {'memory_limit_mb': args.memory_limit})):
+        statuses, after, restarts = asyncio.run(check_recovery(jobs[:3], system_name, **limits))
+        print(f"  {system_name} with a {label}: {statuses}, {restarts} worker restarts; next job: {after}")
+        recovered = recovered and all(status == expected for status in statuses) and after == 'success'
+
+    print()
+    for name in args.systems:
+        units = [job for job in jobs if job[1] == name]
+        same = sum(orchestrated[job]['text'] == sequential[job] for job in units)
+        print(f"  Output identical ({name}): {'✅' if same == len(units) else '⚠️ '} {same}/{len(units)} units")
+    print(f"  Stuck and oversized jobs killed, run recovered: {'✅' if recovered else '❌'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Batched Inference Benchmark
+
+Measures CPU throughput in documents per minute for one system: one
+``extract_text`` call per PDF against a single ``extract_batch`` submission
+of the same PDFs (Docling's ``convert_all``). Models are loaded before
+either run, so only inference is compared, and the two runs must produce
+identical text.
+
+Systems without a batch interface fall back to the same per-document loop
+in ``extract_batch``, so they show no difference.
+
+Usage: python -m benchmarks.batch_inference [--system Docling] [--repeat 2]
+"""
+
+import argparse
+import time
+from pathlib import Path
+
+from scripts.ocr_backends import BATCH, get_backend
+from scripts.ocr_benchmark_gpu_optimized import GPUOptimizedOCRSystem
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Single-document loop vs batch extraction throughput")
+    parser.add_argument('--pdf-dir', default='./pdfs')
+    parser.add_argument('--system', default='Docling')
+    parser.add_argument('--repeat', type=int, default=2,
+                        help='submit the PDF set this many times (a larger batch)')
+    args = parser.parse_args()
+
+    pdf_files = sorted(Path(args.pdf_dir).glob('*.pdf')) * args.repeat
+    if not pdf_files:
+        print(f"❌ No PDFs found in {args.pdf_dir}")
+        return
+
+    device_info = {'cuda_available': False, 'device': 'cpu', 'device_name': 'CPU'}
+    system = GPUOptimizedOCRSystem(args.system, device_info)
+    batched = BATCH in get_backend(args.system).capabilities
+
+    print(f"\n📦 BATCHED INFERENCE BENCHMARK ({args.system}, {len(pdf_files)} documents, CPU)")
+    print("=" * 70)
+    if not batched:
+        print(f"  ⚠️  {args.system} has no batch interface; extract_batch loops per document")
+
+    start = time.perf_counter()
+    try:
+        system.initialize()
+    except ImportError as e:
+        print(f"❌ {args.system} is not installed: {e}")
+        return
+    print(f"  Model load: {time.perf_counter() - start:.1f}s (excluded below)\n")
+
+    start = time.perf_counter()
+    single = [system.extract_text(pdf_path) for pdf_path in pdf_files]
+    single_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    batch = system.extract_batch(pdf_files)
+    batch_time = time.perf_counter() - start
+
+    failed = sum(metadata['status'] != 'success' for _, metadata in single + batch)
+    if failed:
+        print(f"  ⚠️  {failed} failed extractions")
+
+    for label, seconds in (('single-document loop', single_time), ('extract_batch', batch_time)):
+        print(f"  {label:<22} {len(pdf_files) / seconds * 60:>8.1f} docs/min  ({seconds:.1f}s)")
+    print(f"  speedup: {single_time / batch_time:.2f}x")
+    identical = all(a[0] == b[0] for a, b in zip(single, batch))
+    print(f"\n  Output identical: {'✅' if identical else '❌'}")
+
+
+if __name__ == "__main__":
+    main()
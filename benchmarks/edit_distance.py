@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Edit Distance Benchmark
+
+Times the bit-parallel Levenshtein engine of ``scripts/edit_distance.py``
+against ``textdistance`` on the PDF corpus (each PyMuPDF baseline against
+its stored Markdown) and checks that both give the same character and word
+distances.
+
+Usage: python -m benchmarks.edit_distance [--pdf-dir ./pdfs] [--markdown-dir ./output_markdown] [--max-chars 5000]
+"""
+
+import argparse
+import re
+import time
+from pathlib import Path
+
+from scripts.edit_distance import character_accuracy, levenshtein, tokenize_ids, word_accuracy
+
+
+def load_pairs(pdf_dir, markdown_dir):
+    """Build (name, reference, candidate) triples from the shipped corpus.
+
+    The reference is the PyMuPDF baseline in the same format the benchmark
+    writes; the candidate is the stored Markdown extraction when one exists,
+    otherwise PyMuPDF's block-sorted text.
+    """
+    import fitz  # PyMuPDF
+
+    pairs = []
+    for pdf_path in sorted(pdf_dir.glob('*.pdf')):
+        doc = fitz.open(str(pdf_path))
+        reference = ""
+        blocks = []
+        for page_num in range(len(doc)):
+            page = doc.load_page(page_num)
+            reference += f"\n=== Page {page_num + 1} ===\n{page.get_text()}\n"
+            blocks.append(page.get_text(sort=True))
+        doc.close()
+
+        markdown_file = markdown_dir / f"{pdf_path.stem}.md"
+        candidate = ""
+        if markdown_file.exists():
+            candidate = markdown_file.read_text(encoding='utf-8')
+        if not candidate.strip():
+            candidate = "\n".join(blocks)
+        pairs.append((pdf_path.stem, reference, candidate))
+    return pairs
+
+
+def run_benchmark(pdf_dir="./pdfs", markdown_dir="./output_markdown", max_chars=5000):
+    """Compare the engine against ``textdistance`` on the PDF corpus.
+
+    ``textdistance`` fills the full DP table in pure Python, so both paths
+    are run on the first ``max_chars`` characters (and the words within
+    them); the engine is additionally timed on the full documents.
+    """
+    import textdistance
+
+    pairs = load_pairs(Path(pdf_dir), Path(markdown_dir))
+    if not pairs:
+        print(f"❌ No PDFs found in {pdf_dir}")
+        return []
+
+    print("⚡ EDIT DISTANCE BENCHMARK")
+    print("=" * 70)
+
+    rows = []
+    for name, reference, candidate in pairs:
+        ref_clean = re.sub(r'\s+', ' ', reference.strip())
+        cand_clean = re.sub(r'\s+', ' ', candidate.strip())
+        ref_cut, cand_cut = ref_clean[:max_chars], cand_clean[:max_chars]
+        ref_words, cand_words = ref_cut.lower().split(), cand_cut.lower().split()
+
+        start = time.perf_counter()
+        old_chars = textdistance.levenshtein(ref_cut, cand_cut)
+        old_words = textdistance.levenshtein(ref_words, cand_words)
+        old_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        new_chars = levenshtein(ref_cut, cand_cut)
+        vocabulary = {}
+        new_words = levenshtein(tokenize_ids(ref_words, vocabulary),
+                                tokenize_ids(cand_words, vocabulary))
+        new_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        character_accuracy(ref_clean, cand_clean)
+        word_accuracy(reference.lower().split(), candidate.lower().split())
+        full_time = time.perf_counter() - start
+
+        match = old_chars == new_chars and old_words == new_words
+        rows.append({
+            'PDF': name,
+            'Chars': len(ref_clean),
+            'Textdistance_Time': old_time,
+            'Engine_Time': new_time,
+            'Speedup': old_time / new_time if new_time > 0 else float('inf'),
+            'Engine_Full_Doc_Time': full_time,
+            'Distances_Match': match,
+        })
+
+        print(f"📄 {name[:50]}")
+        print(f"    textdistance ({max_chars:,} chars): {old_time:.2f}s")
+        print(f"    engine       ({max_chars:,} chars): {new_time:.3f}s "
+              f"({rows[-1]['Speedup']:.0f}x)")
+        print(f"    engine       (full, {len(ref_clean):,} chars): {full_time:.2f}s")
+        print(f"    {'✅' if match else '❌'} distances match")
+
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bit-parallel Levenshtein vs textdistance")
+    parser.add_argument('--pdf-dir', default='./pdfs')
+    parser.add_argument('--markdown-dir', default='./output_markdown')
+    parser.add_argument('--max-chars', type=int, default=5000)
+    args = parser.parse_args()
+    run_benchmark(args.pdf_dir, args.markdown_dir, args.max_chars)
+
+
+if __name__ == "__main__":
+    main()
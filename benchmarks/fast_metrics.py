@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+Fast Metrics Agreement Benchmark
+
+Scores three populations of (reference, candidate) pairs with the exact
+metrics and with their near-linear replacements from
+``scripts/fast_metrics.py``, and reports how closely they agree:
+
+- documents: each PyMuPDF baseline against the stored Markdown (or the
+  block-sorted text), as ``benchmarks/edit_distance.py`` loads them;
+- pages: the same pairs cut into page-aligned chunks (``align_pages``);
+- noise: every baseline page against a copy with synthetic OCR errors
+  (character substitutions, deletions and insertions, dropped words) at
+  rates from 1% to 20%.
+
+Sparse CER/WER are compared with the exact edit distances (correlations,
+mean and worst absolute difference, share of pairs where they are equal),
+the MinHash estimate with the exact character n-gram Jaccard, and token
+F1 with exact character accuracy (rank correlation only: it is a
+different metric). Times are the totals over each population.
+
+Usage: python -m benchmarks.fast_metrics [--pdf-dir ./pdfs] [--markdown-dir ./output_markdown] [--seed 0]
+"""
+
+import argparse
+import random
+import string
+import time
+from pathlib import Path
+
+from benchmarks.edit_distance import load_pairs
+from scripts.edit_distance import levenshtein
+from scripts.fast_metrics import (bag_of_words_scores, char_ngrams, error_rate, minhash_sketch,
+                                  sketch_jaccard, sparse_distances)
+from scripts.normalized_text import normalize_pair
+from scripts.page_scoring import align_pages
+
+NOISE_RATES = [0.01, 0.02, 0.05, 0.1, 0.2]
+
+
+def add_noise(text, rate, rng):
+    """text with OCR-like character errors and dropped words at roughly ``rate`` per character"""
+    words = []
+    for word in text.split():
+        if rng.random() < rate / 2:
+            continue
+        chars = []
+        for char in word:
+            roll = rng.random()
+            if roll < rate / 3:
+                chars.append(rng.choice(string.ascii_letters))
+            elif roll < 2 * rate / 3:
+                continue
+            elif roll < rate:
+                chars.extend((char, rng.choice(string.ascii_letters)))
+            else:
+                chars.append(char)
+        words.append(''.join(chars))
+    return ' '.join(words)
+
+
+def build_populations(pairs, seed):
+    rng = random.Random(seed)
+    documents = [(reference, candidate) for _, reference, candidate in pairs]
+    pages = []
+    noise = []
+    for _, reference, candidate in pairs:
+        for _, ref_chunk, cand_chunk in align_pages(reference, candidate):
+            if ref_chunk and cand_chunk:
+                pages.append((ref_chunk, cand_chunk))
+            if ref_chunk:
+                rate = NOISE_RATES[len(noise) % len(NOISE_RATES)]
+                noise.append((ref_chunk, add_noise(ref_chunk, rate, rng)))
+    return {'documents': documents, 'pages': pages, 'noise': noise}
+
+
+def score_pairs(pairs):
+    """One row of exact and fast scores per pair, plus (exact, fast) total seconds"""
+    rows = []
+    exact_time = fast_time = 0.0
+    for reference_text, candidate_text in pairs:
+        reference, candidate = normalize_pair(reference_text, candidate_text)
+
+        start = time.perf_counter()
+        char_distance = levenshtein(reference.collapsed, candidate.collapsed)
+        word_distance = levenshtein(reference.token_ids, candidate.token_ids)
+        exact_time += time.perf_counter() - start
+        ref_grams = char_ngrams(reference.collapsed)
+        cand_grams = char_ngrams(candidate.collapsed)
+        union = len(ref_grams | cand_grams)
+
+        start = time.perf_counter()
+        sparse_char, sparse_word = sparse_distances(reference, candidate)
+        token_f1 = bag_of_words_scores(reference, candidate)['token_f1']
+        jaccard = sketch_jaccard(minhash_sketch(reference), minhash_sketch(candidate))
+        fast_time += time.perf_counter() - start
+
+        max_chars = max(len(reference.collapsed), len(candidate.collapsed))
+        rows.append({
+            'exact_cer': error_rate(char_distance, len(reference.collapsed)),
+            'sparse_cer': error_rate(sparse_char, len(reference.collapsed)),
+            'exact_wer': error_rate(word_distance, reference.word_count),
+            'sparse_wer': error_rate(sparse_word, reference.word_count),
+            'exact_char_accuracy': 1 - char_distance / max_chars if max_chars else 1.0,
+            'token_f1': token_f1,
+            'exact_jaccard': len(ref_grams & cand_grams) / union if union else 1.0,
+            'minhash_jaccard': jaccard,
+        })
+    return rows, exact_time, fast_time
+
+
+def spearman(a, b):
+    # Pearson correlation of the ranks (pandas' method='spearman' needs scipy)
+    return a.rank().corr(b.rank())
+
+
+def agreement(df, exact, fast):
+    difference = (df[fast] - df[exact]).abs()
+    return (f"pearson {df[exact].corr(df[fast]):.3f}  spearman {spearman(df[exact], df[fast]):.3f}  "
+            f"mean |d| {difference.mean():.4f}  max |d| {difference.max():.4f}  "
+            f"equal {(difference < 1e-12).mean():.0%}")
+
+
+def main():
+    import pandas as pd
+
+    parser = argparse.ArgumentParser(description="Agreement of the fast metrics with exact Levenshtein")
+    parser.add_argument('--pdf-dir', default='./pdfs')
+    parser.add_argument('--markdown-dir', default='./output_markdown')
+    parser.add_argument('--seed', type=int, default=0, help='seed of the synthetic OCR noise')
+    args = parser.parse_args()
+
+    pairs = load_pairs(Path(args.pdf_dir), Path(args.markdown_dir))
+    if not pairs:
+        print(f"❌ No PDFs found in {args.pdf_dir}")
+        return
+
+    print(f"\n📏 FAST METRICS AGREEMENT ({len(pairs)} documents)")
+    print("=" * 70)
+    for name, population in build_populations(pairs, args.seed).items():
+        rows, exact_time, fast_time = score_pairs(population)
+        df = pd.DataFrame(rows)
+        print(f"\n  {name} ({len(df)} pairs): exact {exact_time:.2f}s -> fast {fast_time:.2f}s "
+              f"({exact_time / fast_time:.1f}x)")
+        print(f"    CER      {agreement(df, 'exact_cer', 'sparse_cer')}")
+        print(f"    WER      {agreement(df, 'exact_wer', 'sparse_wer')}")
+        print(f"    Jaccard  {agreement(df, 'exact_jaccard', 'minhash_jaccard')}")
+        print(f"    Token F1 vs exact character accuracy: spearman "
+              f"{spearman(df['exact_char_accuracy'], df['token_f1']):.3f}")
+        print(f"    sparse CER >= exact CER on every pair: "
+              f"{'✅' if (df['sparse_cer'] >= df['exact_cer'] - 1e-12).all() else '❌'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Ground-Truth Corpus Benchmark
+
+Builds a synthetic ground-truth corpus of ``--documents`` entries in a
+temporary directory (the shipped PDFs and their PyMuPDF text, linked
+under new names, listed in a JSONL manifest) and measures:
+
+- enumeration: records/s and peak Python memory of streaming the
+  manifest with ``GroundTruthCorpus`` against reading every record and
+  its reference into memory first;
+- end to end: PyMuPDF extraction plus scoring against the references,
+  ``--chunk-size`` documents at a time as ``run_ground_truth_benchmark``
+  does, against one chunk holding the whole corpus. Both must produce the
+  same rows; peak memory should stay flat for the chunked run.
+
+Peak memory is the tracemalloc peak, so it covers Python allocations
+(texts, rows) but not PyMuPDF's native buffers.
+
+Usage: python -m benchmarks.ground_truth [--documents 64] [--chunk-size 16] [--manifest-records 20000]
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+from scripts.ground_truth import GroundTruthCorpus
+from scripts.ocr_benchmark_gpu_optimized import calculate_enhanced_metrics, extract_documents
+
+DEVICE_INFO = {'cuda_available': False, 'device': 'cpu', 'device_name': 'CPU'}
+
+
+def build_corpus(pdf_dir, root, documents):
+    """Link the shipped PDFs as ``documents`` entries with text references; returns the manifest path"""
+    import fitz  # PyMuPDF
+
+    sources = []
+    for pdf_path in sorted(Path(pdf_dir).glob('*.pdf')):
+        with fitz.open(str(pdf_path)) as doc:
+            reference = root / f"{pdf_path.stem}.txt"
+            reference.write_text(''.join(page.get_text() for page in doc), encoding='utf-8')
+        sources.append((pdf_path.resolve(), reference))
+    if not sources:
+        return None
+
+    manifest = root / 'corpus.jsonl'
+    with open(manifest, 'w', encoding='utf-8') as f:
+        for idx in range(documents):
+            pdf_path, reference = sources[idx % len(sources)]
+            link = root / f"doc{idx:06d}.pdf"
+            os.symlink(pdf_path, link)
+            f.write(json.dumps({'pdf': link.name, 'reference': reference.name}) + '\n')
+    return manifest
+
+
+def measure(function):
+    """(result, seconds, peak MB of Python allocations)"""
+    tracemalloc.start()
+    start = time.perf_counter()
+    try:
+        result = function()
+        return result, time.perf_counter() - start, tracemalloc.get_traced_memory()[1] / 1e6
+    finally:
+        tracemalloc.stop()
+
+
+def stream_records(corpus, chunk_size):
+    count = 0
+    for chunk in corpus.chunks(chunk_size):
+        count += sum(len(record.reference_text()) > 0 for record in chunk)
+    return count
+
+
+def eager_records(corpus):
+    loaded = [(record, record.reference_text()) for record in corpus]
+    return sum(len(text) > 0 for _, text in loaded)
+
+
+def score_in_chunks(corpus, chunk_size, output_dir):
+    """The extract -> score loop of run_ground_truth_benchmark, keeping only the rows"""
+    rows = []
+    for chunk in corpus.chunks(chunk_size):
+        extractions = extract_documents([record.pdf_path for record in chunk], ['PyMuPDF'], output_dir,
+                                        device_info=DEVICE_INFO)
+        references = {record.doc_id: record.reference_text() for record in chunk}
+        scores = calculate_enhanced_metrics(extractions, references=references)
+        rows += scores[['PDF', 'Sparse_Char_Accuracy', 'Sparse_Word_Accuracy', 'Sparse_CER', 'Sparse_WER',
+                        'Token_F1']].values.tolist()
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Streaming vs eager ground-truth corpus processing")
+    parser.add_argument('--pdf-dir', default='./pdfs')
+    parser.add_argument('--documents', type=int, default=64, help='documents extracted and scored end to end')
+    parser.add_argument('--chunk-size', type=int, default=16)
+    parser.add_argument('--manifest-records', type=int, default=20000, help='records in the enumeration test')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        manifest = build_corpus(args.pdf_dir, root, max(args.documents, args.manifest_records))
+        if manifest is None:
+            print(f"❌ No PDFs found in {args.pdf_dir}")
+            return
+
+        print(f"\n📚 GROUND-TRUTH CORPUS BENCHMARK")
+        print("=" * 70)
+
+        corpus = GroundTruthCorpus(manifest)
+        streamed, stream_time, stream_peak = measure(lambda: stream_records(corpus, args.chunk_size))
+        eager, eager_time, eager_peak = measure(lambda: eager_records(corpus))
+        print(f"  Enumerate {streamed:,} records + references:")
+        print(f"    all at once      {eager / eager_time:>9,.0f} records/s  peak {eager_peak:8.1f} MB")
+        print(f"    chunks of {args.chunk_size:<6} {streamed / stream_time:>9,.0f} records/s  peak {stream_peak:8.1f} MB")
+
+        small = root / 'small.jsonl'
+        with open(manifest, encoding='utf-8') as src, open(small, 'w', encoding='utf-8') as dst:
+            for _, line in zip(range(args.documents), src):
+                dst.write(line)
+        corpus = GroundTruthCorpus(small)
+        output_dir = root / 'out'
+        output_dir.mkdir()
+        runs = {}
+        for label, chunk_size in (('one chunk', args.documents), (f"chunks of {args.chunk_size}", args.chunk_size)):
+            with contextlib.redirect_stdout(io.StringIO()):
+                runs[label] = measure(lambda: score_in_chunks(corpus, chunk_size, output_dir))
+        print(f"\n  Extract + score {args.documents} documents (PyMuPDF):")
+        for label, (_, seconds, peak) in runs.items():
+            print(f"    {label:<16} {args.documents / seconds * 60:>9,.0f} docs/min    peak {peak:8.1f} MB")
+
+        (whole, _, _), (chunked, _, _) = runs.values()
+        print(f"\n  Rows identical: {'✅' if whole == chunked else '❌'} ({len(chunked)} rows)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Warm Model Server Benchmark
+
+Simulates repeated small benchmark invocations: each invocation is a fresh
+interpreter that extracts a small batch of PDFs with one system. In cold
+mode it loads the models itself (what every CLI run does today); in warm
+mode it sends the batch to a model server started once beforehand. The
+report shows per-invocation wall time and per-document latency for both,
+plus the one-time server load cost.
+
+Docling and Marker must be installed for the default systems; ``--systems
+PyMuPDF`` exercises the same path where they are not.
+
+Usage: python -m benchmarks.model_server [--systems Docling Marker] [--batch 2] [--invocations 3]
+"""
+
+import argparse
+import multiprocessing
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from scripts.model_server import ModelClient, SERVED_SYSTEMS, wait_for_server
+
+
+def _invocation(system_name, pdf_paths, model_server, results):
+    """One benchmark invocation in a fresh interpreter"""
+    from scripts.ocr_benchmark_gpu_optimized import GPUOptimizedOCRSystem
+
+    device_info = {'cuda_available': False, 'device': 'cpu', 'device_name': 'CPU'}
+    system = GPUOptimizedOCRSystem(system_name, device_info, model_server=model_server)
+    statuses = []
+    for pdf_path in pdf_paths:
+        _, metadata = system.extract_text(pdf_path)
+        statuses.append(metadata['status'])
+    if system.client is not None:
+        system.client.close()
+    results.put(statuses)
+
+
+def time_invocation(context, system_name, pdf_paths, model_server=None):
+    """Wall time of one invocation including interpreter start and model load"""
+    results = context.Queue()
+    start = time.perf_counter()
+    process = context.Process(target=_invocation, args=(system_name, pdf_paths, model_server, results))
+    process.start()
+    statuses = results.get()
+    process.join()
+    return time.perf_counter() - start, statuses
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cold vs warm-server extraction latency")
+    parser.add_argument('--pdf-dir', default='./pdfs')
+    parser.add_argument('--systems', nargs='+', default=SERVED_SYSTEMS)
+    parser.add_argument('--batch', type=int, default=2, help='PDFs per invocation')
+    parser.add_argument('--invocations', type=int, default=3)
+    args = parser.parse_args()
+
+    pdf_files = sorted(Path(args.pdf_dir).glob('*.pdf'))[:args.batch]
+    if not pdf_files:
+        print(f"❌ No PDFs found in {args.pdf_dir}")
+        return
+
+    context = multiprocessing.get_context('spawn')
+    socket_path = Path(tempfile.mkdtemp()) / 'model-server.sock'
+
+    print(f"\n🔥 WARM MODEL SERVER BENCHMARK ({len(pdf_files)} PDFs x {args.invocations} invocations)")
+    print("=" * 70)
+
+    start = time.perf_counter()
+    server = subprocess.Popen([sys.executable, '-m', 'scripts.model_server',
+                               '--systems', *args.systems, '--socket', str(socket_path)],
+                              env=dict(os.environ, PYTHONPATH=os.pathsep.join(
+                                  filter(None, [os.getcwd(), os.environ.get('PYTHONPATH')]))))
+    try:
+        try:
+            wait_for_server(socket_path, process=server)
+        except RuntimeError as e:
+            print(f"❌ {e}: check that {', '.join(args.systems)} can be loaded")
+            return
+        startup = time.perf_counter() - start
+        print(f"  Server ready in {startup:.1f}s\n")
+
+        for system_name in args.systems:
+            timings = {}
+            for mode, model_server in (('cold', None), ('warm', str(socket_path))):
+                walls = []
+                for _ in range(args.invocations):
+                    wall, statuses = time_invocation(context, system_name, pdf_files, model_server)
+                    if any(status != 'success' for status in statuses):
+                        print(f"  ⚠️  {system_name} ({mode}): {statuses}")
+                    walls.append(wall)
+                timings[mode] = sum(walls) / len(walls)
+
+            print(f"  {system_name}:")
+            for mode, wall in timings.items():
+                print(f"    {mode:<5} {wall:>8.2f}s per invocation  {wall / len(pdf_files):>8.2f}s per document")
+            print(f"    speedup: {timings['cold'] / timings['warm']:.2f}x "
+                  f"(server load paid once: {startup:.1f}s)")
+    finally:
+        try:
+            ModelClient(socket_path).shutdown()
+        except (OSError, EOFError, RuntimeError):
+            pass
+        try:
+            server.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            server.kill()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+"""
+Normalized Text Benchmark
+
+Scores several candidate "systems" against each PyMuPDF baseline, the way
+``calculate_enhanced_metrics`` does, twice: with the previous
+``calculate_text_metrics`` (which collapsed whitespace, lower-cased, split
+words and lines of both texts on every call) and with one shared
+``NormalizedText`` per extraction computing the same metric set. Metrics
+must be identical, whole-document and page-aligned, and
+``calculate_text_metrics(exact=True)`` must agree on those keys; the
+metrics it adds (sparse alignment, bag-of-words, MinHash) are timed
+separately. The report also shows the preprocessing time per
+comparison and the memory held by the word tokens. Timings are the best
+of ``--repeat`` runs.
+
+Candidates are the stored Markdown in ``output_markdown/`` and PyMuPDF's
+block-sorted text, repeated ``--systems`` times between them.
+
+Usage: python -m benchmarks.normalized_text [--systems 6] [--max-chars 20000] [--repeat 3]
+"""
+
+import argparse
+import re
+import sys
+import time
+from pathlib import Path
+
+from scripts.edit_distance import character_accuracy, levenshtein, word_accuracy
+from scripts.fast_metrics import bag_of_words_scores, minhash_sketch, sketch_jaccard, sparse_distances
+from scripts.normalized_text import NormalizedText
+from scripts.ocr_benchmark_gpu_optimized import calculate_text_metrics
+from scripts.page_scoring import score_page_aligned
+
+
+def legacy_calculate_text_metrics(reference_text, candidate_text, page_aligned=False):
+    """calculate_text_metrics before NormalizedText (reference only)"""
+    if not reference_text or not candidate_text:
+        return {'character_accuracy': 0.0, 'word_accuracy': 0.0, 'length_ratio': 0.0,
+                'word_count_ratio': 0.0, 'line_count_ratio': 0.0}
+    ref_words = reference_text.lower().split()
+    cand_words = candidate_text.lower().split()
+    if page_aligned:
+        page_scores = score_page_aligned(reference_text, candidate_text)
+        char_accuracy = page_scores['character_accuracy']
+        word_acc = page_scores['word_accuracy']
+    else:
+        ref_clean = re.sub(r'\s+', ' ', reference_text.strip())
+        cand_clean = re.sub(r'\s+', ' ', candidate_text.strip())
+        char_accuracy = character_accuracy(ref_clean, cand_clean)
+        word_acc = word_accuracy(ref_words, cand_words)
+    length_ratio = len(candidate_text) / len(reference_text) if len(reference_text) > 0 else 0.0
+    word_count_ratio = len(cand_words) / len(ref_words) if len(ref_words) > 0 else 0.0
+    ref_lines = len(reference_text.split('\n'))
+    cand_lines = len(candidate_text.split('\n'))
+    return {
+        'character_accuracy': max(0.0, char_accuracy),
+        'word_accuracy': max(0.0, word_acc),
+        'length_ratio': length_ratio,
+        'word_count_ratio': word_count_ratio,
+        'line_count_ratio': cand_lines / ref_lines if ref_lines > 0 else 0.0
+    }
+
+
+def shared_text_metrics(reference, candidate, page_aligned=False):
+    """legacy_calculate_text_metrics on NormalizedText, as calculate_text_metrics computes those keys"""
+    if page_aligned:
+        page_scores = score_page_aligned(reference, candidate)
+        char_accuracy = page_scores['character_accuracy']
+        word_acc = page_scores['word_accuracy']
+    else:
+        max_chars = max(len(reference.collapsed), len(candidate.collapsed))
+        max_words = max(reference.word_count, candidate.word_count)
+        char_distance = levenshtein(reference.collapsed, candidate.collapsed)
+        word_distance = levenshtein(reference.token_ids, candidate.token_ids)
+        char_accuracy = 1 - char_distance / max_chars if max_chars else 1.0
+        word_acc = 1 - word_distance / max_words if max_words else 1.0
+    return {
+        'character_accuracy': max(0.0, char_accuracy),
+        'word_accuracy': max(0.0, word_acc),
+        'length_ratio': len(candidate) / len(reference) if len(reference) > 0 else 0.0,
+        'word_count_ratio': candidate.word_count / reference.word_count if reference.word_count > 0 else 0.0,
+        'line_count_ratio': candidate.line_count / reference.line_count
+    }
+
+
+def added_metrics(reference, candidate):
+    """The metrics calculate_text_metrics computes beyond the legacy ones"""
+    sparse_distances(reference, candidate)
+    bag_of_words_scores(reference, candidate)
+    sketch_jaccard(minhash_sketch(reference), minhash_sketch(candidate))
+
+
+def best_time(repeat, run):
+    """(best seconds, result of the last run) over repeat calls of run()"""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = run()
+        timings.append(time.perf_counter() - start)
+    return min(timings), result
+
+
+def score_shared(documents, score):
+    """[metrics] scoring every candidate against its baseline's shared NormalizedText"""
+    results = []
+    vocabulary = {}
+    for _, baseline, candidates in documents:
+        normalized = NormalizedText(baseline, vocabulary)
+        results += [score(normalized, NormalizedText(candidate, vocabulary)) for candidate in candidates]
+    return results
+
+
+def legacy_preprocessing(reference_text, candidate_text):
+    """The string work legacy_calculate_text_metrics repeated for every comparison"""
+    ref_words = reference_text.lower().split()
+    cand_words = candidate_text.lower().split()
+    re.sub(r'\s+', ' ', reference_text.strip())
+    re.sub(r'\s+', ' ', candidate_text.strip())
+    vocabulary = {}
+    for words in (ref_words, cand_words):
+        for word in words:
+            vocabulary.setdefault(word, len(vocabulary))
+    reference_text.split('\n')
+    candidate_text.split('\n')
+
+
+def load_documents(pdf_dir, markdown_dir, systems, max_chars):
+    """[(name, baseline, [candidate, ...])] from the shipped corpus"""
+    import fitz  # PyMuPDF
+
+    documents = []
+    for pdf_path in sorted(Path(pdf_dir).glob('*.pdf')):
+        reference = ""
+        blocks = []
+        with fitz.open(str(pdf_path)) as doc:
+            for page_num in range(len(doc)):
+                page = doc.load_page(page_num)
+                reference += f"\n=== Page {page_num + 1} ===\n{page.get_text()}\n"
+                blocks.append(page.get_text(sort=True))
+        markdown_file = Path(markdown_dir) / f"{pdf_path.stem}.md"
+        markdown = markdown_file.read_text(encoding='utf-8') if markdown_file.exists() else ""
+        variants = [text for text in (markdown, "\n".join(blocks)) if text.strip()]
+        candidates = [variants[i % len(variants)][:max_chars] for i in range(systems)]
+        documents.append((pdf_path.stem, reference[:max_chars], candidates))
+    return documents
+
+
+def token_bytes(words):
+    return sys.getsizeof(words) + sum(sys.getsizeof(word) for word in words)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-call vs shared text normalization for accuracy metrics")
+    parser.add_argument('--pdf-dir', default='./pdfs')
+    parser.add_argument('--markdown-dir', default='./output_markdown')
+    parser.add_argument('--systems', type=int, default=6, help='candidates scored against each baseline')
+    parser.add_argument('--max-chars', type=int, default=20000,
+                        help='truncate texts so the exact edit distance stays quick')
+    parser.add_argument('--repeat', type=int, default=3, help='timed runs per variant (best is reported)')
+    args = parser.parse_args()
+
+    documents = load_documents(args.pdf_dir, args.markdown_dir, args.systems, args.max_chars)
+    if not documents:
+        print(f"❌ No PDFs found in {args.pdf_dir}")
+        return
+    comparisons = sum(len(candidates) for _, _, candidates in documents)
+
+    print(f"\n🧮 NORMALIZED TEXT BENCHMARK ({len(documents)} baselines x {args.systems} systems)")
+    print("=" * 70)
+
+    legacy_prep, _ = best_time(args.repeat, lambda: [legacy_preprocessing(baseline, candidate)
+                                                     for _, baseline, candidates in documents
+                                                     for candidate in candidates])
+    shared_prep, _ = best_time(args.repeat, lambda: score_shared(documents, lambda reference, candidate: None))
+    print(f"  Preprocessing per comparison: {legacy_prep / comparisons * 1000:.2f} ms per call -> "
+          f"{shared_prep / comparisons * 1000:.2f} ms shared ({legacy_prep / shared_prep:.2f}x)")
+
+    identical = True
+    for page_aligned in (False, True):
+        legacy_time, legacy = best_time(args.repeat, lambda: [
+            legacy_calculate_text_metrics(baseline, candidate, page_aligned)
+            for _, baseline, candidates in documents for candidate in candidates])
+        shared_time, shared = best_time(args.repeat, lambda: score_shared(
+            documents, lambda reference, candidate: shared_text_metrics(reference, candidate, page_aligned)))
+        full = score_shared(documents, lambda reference, candidate: calculate_text_metrics(
+            reference, candidate, page_aligned, exact=True))
+
+        same = legacy == shared == [{key: metrics[key] for key in old} for old, metrics in zip(legacy, full)]
+        identical = identical and same
+        label = 'page-aligned' if page_aligned else 'whole-document'
+        print(f"  {label:<15} metrics: {legacy_time:.2f}s -> {shared_time:.2f}s "
+              f"({legacy_time / shared_time:.2f}x)  {'✅' if same else '❌'} identical")
+    added_time, _ = best_time(args.repeat, lambda: score_shared(documents, added_metrics))
+    print(f"  Added by calculate_text_metrics (sparse, bag-of-words, MinHash): {added_time:.2f}s "
+          f"({added_time / comparisons * 1000:.2f} ms per comparison)")
+
+    words = [word for _, baseline, _ in documents for word in baseline.lower().split()]
+    vocabulary = {}
+    normalized = [NormalizedText(baseline, vocabulary).token_ids for _, baseline, _ in documents]
+    ids_bytes = sum(ids.itemsize * len(ids) for ids in normalized)
+    print(f"  Baseline word tokens: {token_bytes(words) / 1e6:.2f} MB as str lists -> "
+          f"{ids_bytes / 1e6:.2f} MB as token-ID arrays")
+    print(f"\n  Metrics identical: {'✅' if identical else '❌'}")
+
+
+if __name__ == "__main__":
+    main()
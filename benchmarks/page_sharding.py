@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Page Sharding Benchmark
+
+Times PyMuPDF text extraction and pymupdf4llm Markdown conversion of one
+long document with 1..N page-range worker processes, reporting speedup
+against the single-process run and checking the merged output matches.
+
+Usage: python -m benchmarks.page_sharding [--pages 300] [--workers 1 2 4]
+"""
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.page_streaming import build_long_pdf
+from scripts.ocr_text import extract_markdown_with_hierarchy
+from scripts.page_sharding import default_workers, extract_pages_sharded
+
+
+def _content_lines(md_text):
+    """Sorted non-blank lines of a Markdown document.
+
+    pymupdf4llm itself does not reproduce blank lines or the order of some
+    blocks within a page between two calls on the same document, so the
+    comparison is over the multiset of lines (headers included).
+    """
+    return sorted(line for line in md_text.splitlines() if line.strip())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Page-sharded extraction benchmark")
+    parser.add_argument('--pages', type=int, default=300)
+    parser.add_argument('--pdf-dir', default='./pdfs')
+    parser.add_argument('--workers', type=int, nargs='+', default=None)
+    args = parser.parse_args()
+
+    cores = default_workers()
+    worker_counts = args.workers or sorted({1, 2, 4, cores})
+
+    with tempfile.TemporaryDirectory() as tmp:
+        pdf_path = Path(tmp) / 'long.pdf'
+        build_long_pdf(args.pdf_dir, args.pages, pdf_path)
+
+        print(f"\n🧩 PAGE SHARDING BENCHMARK ({args.pages} pages, {cores} usable cores)")
+        print("=" * 70)
+        print(f"  {'workers':>7} {'text':>9} {'speedup':>8} {'markdown':>10} {'speedup':>8}  match")
+
+        base_text = base_md = None
+        base_text_time = base_md_time = None
+        for workers in worker_counts:
+            start = time.perf_counter()
+            pages = extract_pages_sharded(pdf_path, workers)
+            text_time = time.perf_counter() - start
+
+            start = time.perf_counter()
+            md_text = extract_markdown_with_hierarchy(pdf_path, workers=workers)
+            md_time = time.perf_counter() - start
+
+            if base_text is None:
+                base_text, base_md = pages, _content_lines(md_text)
+                base_text_time, base_md_time = text_time, md_time
+            match = pages == base_text and _content_lines(md_text) == base_md
+
+            print(f"\r  {workers:>7} {text_time:>8.2f}s {base_text_time / text_time:>7.2f}x "
+                  f"{md_time:>9.2f}s {base_md_time / md_time:>7.2f}x  {'✅' if match else '❌'}")
+
+
+if __name__ == "__main__":
+    main()
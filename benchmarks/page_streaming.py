@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Page Streaming Benchmark
+
+Compares the original PyMuPDF extraction loop (``text += ...`` per page)
+with GPUOptimizedOCRSystem.extract_text and the streaming iter_pages path
+on a long document built by concatenating the shipped PDFs until it
+reaches the requested page count.
+
+Usage: python -m benchmarks.page_streaming [--pages 400]
+"""
+
+import argparse
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+import fitz  # PyMuPDF
+
+from scripts.ocr_backends import format_page
+from scripts.ocr_benchmark_gpu_optimized import GPUOptimizedOCRSystem
+
+
+def build_long_pdf(pdf_dir, pages, output_path):
+    """Concatenate the PDFs in ``pdf_dir`` until the result has ``pages`` pages"""
+    sources = sorted(Path(pdf_dir).glob('*.pdf'))
+    if not sources:
+        raise SystemExit(f"❌ No PDFs found in {pdf_dir}")
+
+    long_doc = fitz.open()
+    while len(long_doc) < pages:
+        for source in sources:
+            with fitz.open(str(source)) as src:
+                needed = pages - len(long_doc)
+                long_doc.insert_pdf(src, to_page=min(len(src), needed) - 1)
+            if len(long_doc) >= pages:
+                break
+    long_doc.save(str(output_path))
+    long_doc.close()
+
+
+def concat_extract(pdf_path):
+    """The pre-streaming PyMuPDF loop, kept for comparison"""
+    doc = fitz.open(str(pdf_path))
+    text = ""
+    for page_num in range(len(doc)):
+        page = doc.load_page(page_num)
+        text += f"\n=== Page {page_num + 1} ===\n{page.get_text()}\n"
+    doc.close()
+    return text
+
+
+def measure(label, func):
+    """Run ``func`` and report wall time and peak traced allocation"""
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = func()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"  {label:<28} {elapsed:8.2f}s   peak {peak / 1e6:8.2f} MB")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="PyMuPDF page streaming benchmark")
+    parser.add_argument('--pages', type=int, default=400)
+    parser.add_argument('--pdf-dir', default='./pdfs')
+    args = parser.parse_args()
+
+    system = GPUOptimizedOCRSystem('PyMuPDF', {'cuda_available': False, 'device': 'cpu'})
+
+    with tempfile.TemporaryDirectory() as tmp:
+        pdf_path = Path(tmp) / 'long.pdf'
+        build_long_pdf(args.pdf_dir, args.pages, pdf_path)
+
+        print(f"\n📄 STREAMING BENCHMARK ({args.pages} pages)")
+        print("=" * 60)
+
+        concat_text = measure("text += per page", lambda: concat_extract(pdf_path))
+        joined_text, _ = measure("extract_text", lambda: system.extract_text(pdf_path))
+
+        def stream_to_file():
+            chars = 0
+            with open(Path(tmp) / 'stream.txt', 'w', encoding='utf-8') as f:
+                for number, page_text in system.iter_pages(pdf_path):
+                    record = format_page(number, page_text)
+                    f.write(record)
+                    chars += len(record)
+            return chars
+
+        streamed_chars = measure("iter_pages -> file", stream_to_file)
+
+        print(f"\n  Identical output: {concat_text == joined_text and streamed_chars == len(joined_text)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Scientific Content Analyzer Benchmark
+
+Compares ``analyze_scientific_batch`` against the previous
+``analyze_scientific_content`` (five ``re.findall`` scans per document,
+repeated for the unused baseline in ``calculate_enhanced_metrics``) on the
+corpus and on generated text built from the tokens each pattern looks for.
+Counts must be identical; the report shows documents per second.
+
+The corpus is every Markdown file in ``output_markdown/`` plus any OCR
+outputs under ``results/``.
+
+Usage: python -m benchmarks.scientific_content [--repeat 50] [--workers N] [--fuzz-docs 2000]
+"""
+
+import argparse
+import random
+import re
+import time
+
+from benchmarks.structure_parser import load_corpus
+from scripts.ocr_benchmark_gpu_optimized import SCIENTIFIC_COLUMNS, analyze_scientific_batch
+from scripts.page_sharding import default_workers
+
+
+def legacy_analyze_scientific_content(text):
+    """analyze_scientific_content before the batched analyzer (reference only)"""
+    equations = len(re.findall(r'\$.*?\$|\\\(.*?\\\)|\\\[.*?\\\]|\\begin\{equation\}.*?\\end\{equation\}', text, re.DOTALL))
+    citations = len(re.findall(r'\[[\d,\s-]+\]|\(\w+\s+et\s+al\.?,?\s+\d{4}\)|\(\w+,?\s+\d{4}\)', text))
+    figures = len(re.findall(r'[Ff]igure\s+\d+|[Ff]ig\.?\s+\d+|Figure\s+[A-Z]', text))
+    tables = len(re.findall(r'[Tt]able\s+\d+|Table\s+[A-Z]', text))
+    formulas = len(re.findall(r'[A-Za-z]+\s*=\s*[A-Za-z0-9\+\-\*/\(\)]+', text))
+    return {
+        'equations_count': equations,
+        'citations_count': citations,
+        'figures_count': figures,
+        'tables_count': tables,
+        'formulas_count': formulas,
+        'total_scientific_elements': equations + citations + figures + tables + formulas
+    }
+
+
+_FUZZ_TOKENS = [
+    '$', '$x$', '\\(', '\\)', '\\[', '\\]', '\\begin{equation}', '\\end{equation}', '\\',
+    '[1]', '[1, 2]', '[3-5]', '[a]', '(Smith et al., 2001)', '(Lee 1999)', '(Lee, 1999)', '(et al. 12)',
+    'Figure 2', 'figure 3', 'Fig. 4', 'fig 5', 'Figure A', 'Figure', 'Table 1', 'table 2', 'Table B',
+    'Table', 'x', 'x=', '= y', 'ab = c+d', '==', '=', ' = ', 'a =\n b', ' =', 'é=1', 'K',
+    '(', ')', '*', '-', '/', '12', 'word', '\n', '\t', ' ',
+]
+
+
+def fuzz_documents(count, seed=0):
+    rng = random.Random(seed)
+    return [''.join(rng.choice(_FUZZ_TOKENS) + rng.choice(['', ' ', ''])
+                    for _ in range(rng.randint(0, 200)))
+            for _ in range(count)]
+
+
+def matches_legacy(texts, frame):
+    expected = [[legacy_analyze_scientific_content(text)[column] for column in SCIENTIFIC_COLUMNS]
+                for text in texts]
+    return expected == frame[SCIENTIFIC_COLUMNS].values.tolist()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Scientific content analyzer throughput and equivalence")
+    parser.add_argument('--markdown-dir', default='./output_markdown')
+    parser.add_argument('--results-dir', default='./results')
+    parser.add_argument('--repeat', type=int, default=50,
+                        help='analyze the corpus this many times (documents per run)')
+    parser.add_argument('--workers', type=int, default=default_workers())
+    parser.add_argument('--fuzz-docs', type=int, default=2000)
+    args = parser.parse_args()
+
+    corpus = [text for _, text in load_corpus(args.markdown_dir, args.results_dir)]
+    if not corpus:
+        print(f"❌ No Markdown/OCR outputs found in {args.markdown_dir} or {args.results_dir}")
+        return
+
+    print(f"\n🔬 SCIENTIFIC CONTENT ANALYZER BENCHMARK ({len(corpus)} documents)")
+    print("=" * 70)
+
+    corpus_match = matches_legacy(corpus, analyze_scientific_batch(corpus))
+    fuzz = fuzz_documents(args.fuzz_docs)
+    fuzz_match = matches_legacy(fuzz, analyze_scientific_batch(fuzz))
+    print(f"  {'✅' if corpus_match else '❌'} corpus counts")
+    print(f"  {'✅' if fuzz_match else '❌'} {args.fuzz_docs:,} generated documents")
+
+    documents = corpus * args.repeat
+    timings = {}
+    start = time.perf_counter()
+    for text in documents:
+        # calculate_enhanced_metrics also scanned the baseline once per document
+        legacy_analyze_scientific_content(text)
+        legacy_analyze_scientific_content(text)
+    timings['legacy (candidate + baseline)'] = time.perf_counter() - start
+    start = time.perf_counter()
+    analyze_scientific_batch(documents)
+    timings['batch, 1 worker'] = time.perf_counter() - start
+    if args.workers > 1:
+        start = time.perf_counter()
+        analyze_scientific_batch(documents, workers=args.workers)
+        timings[f'batch, {args.workers} workers'] = time.perf_counter() - start
+
+    print(f"\n  Throughput on {len(documents):,} documents:")
+    legacy = timings['legacy (candidate + baseline)']
+    for label, seconds in timings.items():
+        print(f"    {label:<30} {len(documents) / seconds:>10,.0f} docs/s  ({legacy / seconds:.2f}x)")
+    print(f"\n  Counts identical: {'✅' if corpus_match and fuzz_match else '❌'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Selective OCR Benchmark
+
+Classifies every page of a PDF corpus as scanned or born-digital and
+compares the pages the per-page classifier sends to OCR against the
+document-level ``is_scanned_pdf`` gate, which OCRs whole documents. With
+``--mixed`` each PDF is first turned into a mixed document by rasterizing
+every Nth page. When OCRmyPDF's Tesseract is available, documents with
+scanned pages are also OCR'd both ways and the wall time compared, and
+every selectively OCR'd document is checked: same page count, born-digital
+pages unchanged, and text recognized on the OCR'd pages.
+
+Usage: python -m benchmarks.selective_ocr [--pdf-dir ./383-pdfs] [--mixed 4] [--limit N]
+"""
+
+import argparse
+import shutil
+import tempfile
+import time
+from pathlib import Path
+
+import fitz  # PyMuPDF
+
+from scripts.ocr_text import classify_pages, is_scanned_pdf, run_ocr, run_selective_ocr
+
+
+def build_mixed_pdf(pdf_path, every, output_path, dpi=150):
+    """Copy of ``pdf_path`` with every ``every``-th page replaced by an image of itself"""
+    with fitz.open(pdf_path) as src, fitz.open() as out:
+        for page_num, page in enumerate(src):
+            if page_num % every == every - 1:
+                pix = page.get_pixmap(dpi=dpi)
+                new_page = out.new_page(width=page.rect.width, height=page.rect.height)
+                new_page.insert_image(new_page.rect, pixmap=pix)
+            else:
+                out.insert_pdf(src, from_page=page_num, to_page=page_num)
+        out.save(output_path)
+    return Path(output_path)
+
+
+def check_splice(source_path, spliced_path, ocr_pages):
+    """Problems with a selectively OCR'd document (an empty list if the splice is right)"""
+    problems = []
+    with fitz.open(source_path) as src, fitz.open(spliced_path) as out:
+        if len(out) != len(src):
+            return [f"{len(out)} pages instead of {len(src)}"]
+        for page_num in range(len(src)):
+            text = out[page_num].get_text()
+            if page_num + 1 in ocr_pages:
+                if not text.strip():
+                    problems.append(f"page {page_num + 1}: no text after OCR")
+            elif text != src[page_num].get_text():
+                problems.append(f"page {page_num + 1}: born-digital text changed")
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-page selective OCR benchmark")
+    parser.add_argument('--pdf-dir', default='./383-pdfs')
+    parser.add_argument('--mixed', type=int, default=0,
+                        help='rasterize every Nth page to simulate mixed documents')
+    parser.add_argument('--limit', type=int, default=None)
+    parser.add_argument('--workers', type=int, default=1)
+    args = parser.parse_args()
+
+    pdf_files = sorted(Path(args.pdf_dir).rglob('*.pdf'))[:args.limit]
+    can_ocr = shutil.which('tesseract') is not None
+
+    print(f"\n🧾 SELECTIVE OCR BENCHMARK ({len(pdf_files)} PDFs from {args.pdf_dir})")
+    print("=" * 70)
+    if not can_ocr:
+        print("⚠️  tesseract not found: reporting page counts only, OCR timing skipped")
+
+    total_pages = selective_pages = document_pages = 0
+    classify_time = full_time = selective_time = 0.0
+    mixed_docs = failed = splices = bad_splices = 0
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        for pdf_path in pdf_files:
+            try:
+                if args.mixed:
+                    pdf_path = build_mixed_pdf(pdf_path, args.mixed, tmp / pdf_path.name)
+
+                start = time.perf_counter()
+                pages = classify_pages(pdf_path, workers=args.workers)
+                classify_time += time.perf_counter() - start
+                scanned_doc = is_scanned_pdf(pdf_path)
+            except Exception as e:
+                failed += 1
+                print(f"❌ {pdf_path.name[:50]}: {e}")
+                continue
+
+            ocr_pages = [page['page'] for page in pages if page['needs_ocr']]
+            total_pages += len(pages)
+            selective_pages += len(ocr_pages)
+            document_pages += len(pages) if scanned_doc else 0
+
+            if not ocr_pages:
+                continue
+            mixed_docs += len(ocr_pages) < len(pages)
+            print(f"📄 {pdf_path.name[:50]}: {len(ocr_pages)}/{len(pages)} pages need OCR "
+                  f"(document gate: {'all' if scanned_doc else 'none'})")
+
+            if can_ocr:
+                start = time.perf_counter()
+                run_ocr(pdf_path, tmp / f"{pdf_path.stem}_full.pdf")
+                full_time += time.perf_counter() - start
+
+                start = time.perf_counter()
+                spliced = run_selective_ocr(pdf_path, tmp / f"{pdf_path.stem}_selective.pdf", ocr_pages, tmp)
+                selective_time += time.perf_counter() - start
+
+                splices += 1
+                problems = check_splice(pdf_path, spliced, ocr_pages)
+                if problems:
+                    bad_splices += 1
+                    print(f"   ❌ splice: {'; '.join(problems)}")
+
+    print("\n📊 SUMMARY")
+    print(f"   Pages classified: {total_pages:,} in {classify_time:.2f}s "
+          f"({total_pages / classify_time if classify_time else 0:.0f} pages/s)")
+    print(f"   Pages OCR'd (per-page classifier): {selective_pages:,}")
+    print(f"   Pages OCR'd (document-level gate): {document_pages:,}")
+    print(f"   Documents with scanned and born-digital pages: {mixed_docs}")
+    if failed:
+        print(f"   Unreadable PDFs: {failed}")
+    if can_ocr and full_time:
+        print(f"   OCR wall time: full {full_time:.1f}s, selective {selective_time:.1f}s "
+              f"(saved {full_time - selective_time:.1f}s)")
+        print(f"   Selective OCR splices checked: {splices} "
+              f"({'✅ all correct' if not bad_splices else f'❌ {bad_splices} wrong'})")
+
+
+if __name__ == "__main__":
+    main()
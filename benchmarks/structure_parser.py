@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+Structure Parser Benchmark
+
+Measures Marker structure parsing throughput (lines per second) with the
+single-pass precompiled classifier against the previous chain of one
+``re.search`` per element type, and checks that both produce identical
+``document_elements`` / ``reading_order`` JSON on the corpus and on
+randomly generated lines built from the tokens each rule looks for.
+
+The corpus is every Markdown file in ``output_markdown/`` plus any OCR
+outputs under ``results/`` (the text behind ``examples/outputs``).
+
+Usage: python -m benchmarks.structure_parser [--repeat 20] [--fuzz-lines 200000]
+"""
+
+import argparse
+import json
+import random
+import re
+import time
+from pathlib import Path
+
+from scripts.structure_parser import DocumentStructureParser
+
+
+def legacy_parse_marker_structure(parser, text):
+    """parse_marker_structure as it was before the classifier engine (reference only).
+
+    Tables are grouped with the parser's own _extract_table, so the check
+    covers line classification only.
+    """
+    structure = {
+        "document_elements": {
+            "title": None, "authors": [], "abstract": None, "sections": [],
+            "references": [], "equations": [], "tables": [], "figures": [], "captions": []
+        },
+        "reading_order": [],
+        "metadata": {"total_sections": 0, "total_paragraphs": 0, "has_structured_content": False}
+    }
+    elements = structure["document_elements"]
+    lines = text.split('\n')
+    current_section = None
+    in_abstract = False
+    table_end = 0
+
+    for i, line in enumerate(lines):
+        if i < table_end:
+            continue
+        line = line.strip()
+        if not line:
+            continue
+        if line.startswith('# ') and not elements["title"]:
+            elements["title"] = line[2:].strip()
+            structure["reading_order"].append({"type": "title", "content": elements["title"], "line": i})
+        elif line.startswith('## '):
+            section_title = line[3:].strip()
+            current_section = {"title": section_title, "content": [], "subsections": []}
+            elements["sections"].append(current_section)
+            structure["reading_order"].append({"type": "section_header", "content": section_title, "line": i})
+            structure["metadata"]["total_sections"] += 1
+            if "abstract" in section_title.lower():
+                in_abstract = True
+        elif line.startswith('### '):
+            subsection_title = line[4:].strip()
+            if current_section:
+                current_section["subsections"].append({"title": subsection_title, "content": []})
+            structure["reading_order"].append({"type": "subsection_header", "content": subsection_title, "line": i})
+        elif (not elements["authors"] and re.search(r'[A-Z][a-z]+ [A-Z][a-z]+', line)
+              and len(line.split()) < 20):
+            authors = parser._extract_authors(line)
+            elements["authors"] = authors
+            structure["reading_order"].append({"type": "authors", "content": authors, "line": i})
+        elif re.search(r'\$.*\$|\\[a-zA-Z]+|=.*[+\-*/]', line):
+            elements["equations"].append(line)
+            structure["reading_order"].append({"type": "equation", "content": line, "line": i})
+        elif '|' in line and line.count('|') >= 2:
+            table_content, table_end = parser._extract_table(lines, i)
+            if table_content:
+                elements["tables"].append(table_content)
+                structure["reading_order"].append({"type": "table", "content": table_content, "line": i})
+        elif re.search(r'[Ff]igure\s+\d+|[Ff]ig\.?\s+\d+', line):
+            elements["figures"].append(line)
+            structure["reading_order"].append({"type": "figure", "content": line, "line": i})
+        elif re.search(r'^\[\d+\]|\(\d{4}\)|et\s+al\.', line):
+            elements["references"].append(line)
+            structure["reading_order"].append({"type": "reference", "content": line, "line": i})
+        elif len(line) > 50:
+            if in_abstract and not elements["abstract"]:
+                elements["abstract"] = line
+                structure["reading_order"].append({"type": "abstract", "content": line, "line": i})
+                in_abstract = False
+            else:
+                if current_section:
+                    current_section["content"].append(line)
+                structure["reading_order"].append({"type": "paragraph", "content": line[:100] + "...", "line": i})
+                structure["metadata"]["total_paragraphs"] += 1
+
+    structure["metadata"]["has_structured_content"] = len(elements["sections"]) > 0
+    return structure
+
+
+def _comparable(structure):
+    """The parts of a structure that must not change (timestamps excluded)"""
+    return json.dumps({key: structure[key] for key in ("document_elements", "reading_order", "metadata")},
+                      sort_keys=True, ensure_ascii=False)
+
+
+def load_corpus(markdown_dir, results_dir):
+    files = sorted(Path(markdown_dir).glob('*.md')) + sorted(Path(results_dir).glob('**/*_*.txt'))
+    return [(path.name, path.read_text(encoding='utf-8')) for path in files]
+
+
+_FUZZ_TOKENS = [
+    '#', '##', '###', '# ', '## ', '### ', 'Abstract', '|', '| a |', '$x$', '$', '\\alpha',
+    '\\', '=', 'x = y + 1', '-', '*', '/', 'Figure 2', 'figure', 'Fig. 3', 'Fig 4', 'fig.',
+    '[12]', '[a]', '(2014)', '(201)', 'et al.', 'et  al.', 'John Smith', 'Anna Lee,',
+    'word', 'lorem ipsum dolor', 'x' * 60, '\t', ' ', '\x1c', 'é', '12', ',',
+]
+
+
+def fuzz_text(lines, seed=0):
+    rng = random.Random(seed)
+    out = []
+    for _ in range(lines):
+        out.append(' '.join(rng.choice(_FUZZ_TOKENS) for _ in range(rng.randint(0, 25)))
+                   if rng.random() > 0.05 else '')
+    return '\n'.join(out)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Structure parser throughput benchmark")
+    parser.add_argument('--markdown-dir', default='./output_markdown')
+    parser.add_argument('--results-dir', default='./results')
+    parser.add_argument('--repeat', type=int, default=20,
+                        help='concatenate the corpus this many times for the large-document run')
+    parser.add_argument('--fuzz-lines', type=int, default=200000)
+    args = parser.parse_args()
+
+    structure_parser = DocumentStructureParser()
+    corpus = load_corpus(args.markdown_dir, args.results_dir)
+    if not corpus:
+        print(f"❌ No Markdown/OCR outputs found in {args.markdown_dir} or {args.results_dir}")
+        return
+
+    print(f"\n🧱 MARKER STRUCTURE PARSER BENCHMARK ({len(corpus)} documents)")
+    print("=" * 70)
+
+    all_match = True
+    for name, text in corpus:
+        match = (_comparable(structure_parser.parse_marker_structure(text))
+                 == _comparable(legacy_parse_marker_structure(structure_parser, text)))
+        all_match &= match
+        print(f"  {'✅' if match else '❌'} {name[:60]}")
+
+    fuzz = fuzz_text(args.fuzz_lines)
+    fuzz_match = (_comparable(structure_parser.parse_marker_structure(fuzz))
+                  == _comparable(legacy_parse_marker_structure(structure_parser, fuzz)))
+    print(f"  {'✅' if fuzz_match else '❌'} {args.fuzz_lines:,} generated lines")
+
+    big_text = '\n'.join(text for _, text in corpus) * args.repeat
+    line_count = big_text.count('\n') + 1
+    timings = {}
+    for label, func in [('legacy regex chain', lambda t: legacy_parse_marker_structure(structure_parser, t)),
+                        ('single-pass engine', structure_parser.parse_marker_structure)]:
+        start = time.perf_counter()
+        func(big_text)
+        timings[label] = time.perf_counter() - start
+
+    print(f"\n  Throughput on {line_count:,} lines:")
+    for label, seconds in timings.items():
+        print(f"    {label:<20} {line_count / seconds:>12,.0f} lines/s  ({seconds:.2f}s)")
+    print(f"    speedup: {timings['legacy regex chain'] / timings['single-pass engine']:.2f}x")
+    print(f"\n  Output identical: {'✅' if all_match and fuzz_match else '❌'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,495 @@
+#!/usr/bin/env python3
+"""
+Asyncio Extraction Orchestrator
+
+Runs many extraction jobs at once from one event loop, without doing any
+CPU-heavy or blocking work on the loop itself:
+
+- engine calls go to a pool of worker processes per engine, each holding
+  one loaded engine; the pool size is the engine's concurrency limit
+- cache lookups, artifact writes, cache writes and manifest records go to a
+  single I/O thread, so they never block the loop and never interleave
+- OCRmyPDF pipeline jobs (``ocr_text.process_pdf_pipeline``) run in worker
+  processes of their own engine, ``OCRmyPDF``, and their Markdown is written
+  from the I/O thread
+
+Each job can have a wall-clock timeout (which includes starting its worker
+and loading the engine when none is idle), and each worker a memory cap: an
+RSS limit the parent polls from /proc, and an address-space limit
+(RLIMIT_AS) the worker sets on itself, which turns runaway allocations into
+MemoryError. When a job exceeds either limit, crashes its worker or is
+cancelled, the worker process running it is killed and a fresh one is
+started for the next job. A stuck or exploding Docling or Marker
+conversion then costs one job (status ``timeout`` or ``oom``), not the
+whole run, and never the memory of the other workers.
+
+The benchmark uses this with ``--async``. Run directly, it converts a
+directory of PDFs with the OCRmyPDF pipeline:
+
+Usage: python -m scripts.async_orchestrator PDF_DIR [--output-dir DIR] [--limit N] [--timeout S]
+"""
+
+import asyncio
+import multiprocessing
+import os
+import signal
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+try:
+    from scripts.ocr_backends import execution_mode
+    from scripts.ocr_benchmark_gpu_optimized import GPUOptimizedOCRSystem, save_extraction
+except ImportError:  # run directly from the scripts directory
+    from ocr_backends import execution_mode
+    from ocr_benchmark_gpu_optimized import GPUOptimizedOCRSystem, save_extraction
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# One loaded Docling/Marker instance already uses every core and several GB
+DEFAULT_ENGINE_LIMITS = {'Docling': 1, 'Marker': 1}
+PIPELINE_ENGINE = 'OCRmyPDF'
+RSS_POLL_INTERVAL = 0.25
+
+
+class EngineError(RuntimeError):
+    """An engine could not be loaded, failed a job or its worker died"""
+
+
+class EngineMemoryError(EngineError):
+    """A job ran its worker out of memory (MemoryError, RSS cap or OOM kill)"""
+
+
+def engine_limit(system_name, workers, limits=None):
+    """Concurrent jobs allowed for a system: explicit limit, engine default or workers"""
+    if limits and system_name in limits:
+        return limits[system_name]
+    if execution_mode(system_name, workers) != 'process':
+        return 1
+    return DEFAULT_ENGINE_LIMITS.get(system_name, workers)
+
+
+def _process_rss_mb(pid):
+    """Resident set size of a process in MB, or None where /proc is unavailable"""
+    try:
+        with open(f'/proc/{pid}/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / (1024 * 1024)
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def _worker_main(conn, handler_factory, args, address_space_limit_mb=None):
+    """Engine worker process: build the handler once, then run jobs until told to stop.
+
+    A job that raises MemoryError is reported as 'oom' and ends the worker,
+    as its heap may no longer be usable.
+    """
+    if address_space_limit_mb and resource is not None:
+        limit = int(address_space_limit_mb * 1024 * 1024)
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+    start = time.perf_counter()
+    try:
+        handler = handler_factory(*args)
+    except Exception as e:
+        conn.send(('failed', f"{type(e).__name__}: {e}"))
+        return
+    conn.send(('ready', time.perf_counter() - start))
+    while True:
+        try:
+            job = conn.recv()
+        except EOFError:
+            return
+        if job is None:
+            return
+        try:
+            conn.send(('ok', handler(job)))
+        except MemoryError as e:
+            conn.send(('oom', f"MemoryError: {e}" if str(e) else "MemoryError"))
+            return
+        except Exception as e:
+            conn.send(('error', f"{type(e).__name__}: {e}"))
+
+
+def _extraction_handler(system_name, device_info, model_server=None):
+    """Load one OCR system; jobs are PDF paths, results (text, metadata, trace events)"""
+    system = GPUOptimizedOCRSystem(system_name, device_info, model_server=model_server)
+    start = time.perf_counter()
+    system.initialize()
+    load_time = [time.perf_counter() - start]
+
+    def extract(pdf_path):
+        text, metadata = system.extract_text(pdf_path)
+        if metadata['status'] == 'oom':
+            raise MemoryError(metadata.get('error'))
+        # Models were loaded before the first job; charge that job for it
+        metadata['model_load_time'] = load_time.pop() if load_time else 0.0
+        return text, metadata, system.last_trace_events
+
+    return extract
+
+
+def _pipeline_handler(temp_dir, workers=1):
+    """OCRmyPDF pipeline; jobs are PDF paths, results the Markdown text"""
+    try:
+        from scripts.ocr_text import process_pdf_pipeline
+    except ImportError:  # run directly from the scripts directory
+        from ocr_text import process_pdf_pipeline
+
+    def convert(pdf_path):
+        return process_pdf_pipeline(pdf_path, output_dir=None, temp_dir=Path(temp_dir), workers=workers)
+
+    return convert
+
+
+class EngineWorker:
+    """One engine worker process and the parent end of its pipe"""
+
+    def __init__(self, context, handler_factory, args, address_space_limit_mb=None):
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(target=_worker_main,
+                                       args=(child_conn, handler_factory, args, address_space_limit_mb),
+                                       daemon=True)
+        self.process.start()
+        child_conn.close()
+
+    async def receive(self):
+        """Next message from the worker, awaited without blocking the loop"""
+        loop = asyncio.get_running_loop()
+        readable = loop.create_future()
+        fd = self.conn.fileno()
+        loop.add_reader(fd, lambda: readable.done() or readable.set_result(None))
+        try:
+            await readable
+        finally:
+            loop.remove_reader(fd)
+        try:
+            return self.conn.recv()
+        except (EOFError, OSError):
+            await loop.run_in_executor(None, self.process.join, 5)
+            if self.process.exitcode == -signal.SIGKILL:
+                raise EngineMemoryError("worker killed by SIGKILL (likely the kernel OOM killer)") from None
+            raise EngineError(f"worker exited with code {self.process.exitcode}") from None
+
+    async def call(self, job):
+        self.conn.send(job)
+        return await self.receive()
+
+    def rss_mb(self):
+        return _process_rss_mb(self.process.pid)
+
+    def kill(self):
+        self.process.kill()
+        self.process.join()
+        self.conn.close()
+
+    def stop(self, timeout=10):
+        try:
+            self.conn.send(None)
+        except OSError:
+            pass
+        self.process.join(timeout)
+        if self.process.is_alive():
+            self.process.kill()
+            self.process.join()
+        self.conn.close()
+
+
+class EnginePool:
+    """Worker processes for one engine, running at most `limit` jobs at a time.
+
+    Workers start on first demand and stay loaded between jobs. A worker
+    whose job times out, goes over memory_limit_mb of RSS, runs out of
+    address space (address_space_limit_mb), is cancelled or crashes is
+    killed and replaced on the next job; if the handler cannot even be
+    built (e.g. the engine is not installed) every later job fails with
+    that error instead.
+    """
+
+    def __init__(self, name, limit, handler_factory, args=(), context=None,
+                 memory_limit_mb=None, address_space_limit_mb=None):
+        self.name = name
+        self.limit = limit
+        self.handler_factory = handler_factory
+        self.args = args
+        self.context = context or multiprocessing.get_context('spawn')
+        self.memory_limit_mb = memory_limit_mb
+        self.address_space_limit_mb = address_space_limit_mb
+        self.restarts = 0
+        self.failure = None
+        self._slots = asyncio.Semaphore(limit)
+        self._idle = []
+        self._workers = set()
+
+    async def run(self, job, timeout=None):
+        """Result of one job; raises asyncio.TimeoutError, EngineMemoryError or EngineError
+
+        The timeout covers starting a worker (and loading its engine) when
+        no loaded one is idle, as well as the job itself.
+        """
+        loop = asyncio.get_running_loop()
+        async with self._slots:
+            if self.failure is not None:
+                raise EngineError(self.failure)
+            deadline = loop.time() + timeout if timeout is not None else None
+            if self._idle:
+                worker = self._idle.pop()
+            else:
+                try:
+                    worker = await asyncio.wait_for(self._start(), timeout)
+                except asyncio.TimeoutError:
+                    # _start killed the half-started worker
+                    self.restarts += 1
+                    raise
+            remaining = max(0.0, deadline - loop.time()) if deadline is not None else None
+            try:
+                status, value = await self._supervise(worker, job, remaining)
+            except BaseException:
+                # Timed out, over its memory cap, cancelled or crashed: the worker state is unknown
+                self._discard(worker)
+                self.restarts += 1
+                raise
+            if status == 'oom':
+                # The worker has exited after a MemoryError
+                self._discard(worker)
+                self.restarts += 1
+                raise EngineMemoryError(value)
+            self._idle.append(worker)
+        if status == 'error':
+            raise EngineError(value)
+        return value
+
+    async def _supervise(self, worker, job, timeout):
+        """Reply to job, polling the worker's RSS against the memory cap while it runs"""
+        if not self.memory_limit_mb:
+            return await asyncio.wait_for(worker.call(job), timeout)
+
+        call = asyncio.ensure_future(worker.call(job))
+        watch = asyncio.ensure_future(self._watch_rss(worker))
+        try:
+            done, _ = await asyncio.wait({call, watch}, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            # Let the call unregister its pipe before the worker is killed and the fd reused
+            call.cancel()
+            watch.cancel()
+            await asyncio.gather(call, watch, return_exceptions=True)
+        if call in done:
+            return call.result()
+        if watch in done:
+            raise EngineMemoryError(f"RSS {watch.result():.0f} MB over the {self.memory_limit_mb:g} MB cap")
+        raise asyncio.TimeoutError
+
+    async def _watch_rss(self, worker):
+        """Return the worker's RSS once it exceeds the cap"""
+        while True:
+            await asyncio.sleep(RSS_POLL_INTERVAL)
+            rss = worker.rss_mb()
+            if rss is not None and rss > self.memory_limit_mb:
+                return rss
+
+    async def _start(self):
+        worker = EngineWorker(self.context, self.handler_factory, self.args, self.address_space_limit_mb)
+        self._workers.add(worker)
+        try:
+            status, value = await worker.receive()
+        except BaseException:
+            self._discard(worker)
+            raise
+        if status == 'failed':
+            self.failure = value
+            self._discard(worker)
+            raise EngineError(value)
+        return worker
+
+    def _discard(self, worker):
+        self._workers.discard(worker)
+        worker.kill()
+
+    def close(self):
+        for worker in self._workers:
+            worker.stop()
+        self._workers.clear()
+        self._idle.clear()
+
+
+def _failed_result(device, status, error, elapsed):
+    return f"Error: {error}", {
+        'status': status,
+        'processing_time': elapsed,
+        'device': device,
+        'error': error
+    }
+
+
+async def run_extraction_jobs(jobs, output_dir, device_info, cache=None, manifest=None, trace=None,
+                              model_server=None, limits=None, timeout=None, memory_limit_mb=None,
+                              address_space_limit_mb=None):
+    """Extract (pdf_path, system_name) jobs concurrently; returns {job: {'text', 'metadata'}}.
+
+    limits maps system names to their number of worker processes. Cached
+    units are served from the I/O thread without starting an engine. A job
+    with no result after timeout seconds gets status 'timeout'; one that
+    ran its worker out of memory (see EnginePool) gets status 'oom'; one
+    whose engine failed to load or whose worker died gets status 'error'.
+    """
+    loop = asyncio.get_running_loop()
+    io = ThreadPoolExecutor(max_workers=1, thread_name_prefix='extraction-io')
+    systems = {system_name: GPUOptimizedOCRSystem(system_name, device_info) for _, system_name in jobs}
+    pools = {
+        system_name: EnginePool(system_name, limits[system_name], _extraction_handler,
+                                (system_name, device_info, model_server), memory_limit_mb=memory_limit_mb,
+                                address_space_limit_mb=address_space_limit_mb)
+        for system_name in systems
+    }
+    results = {}
+
+    def store(pdf_path, system_name, text, metadata):
+        if cache is not None and metadata['status'] == 'success' and not metadata.get('cache_hit'):
+            cache.put(pdf_path, system_name, text, metadata, systems[system_name].cache_config())
+            metadata['cache_hit'] = False
+        output_file = save_extraction(output_dir, pdf_path.stem, system_name, text, metadata)
+        if manifest is not None:
+            manifest.record(pdf_path, system_name, output_file, text, metadata)
+        return output_file
+
+    async def extract(pdf_path, system_name):
+        system = systems[system_name]
+        cached = None
+        if cache is not None:
+            cached = await loop.run_in_executor(io, cache.get, pdf_path, system_name, system.cache_config())
+        start = time.perf_counter()
+        if cached is not None:
+            text, metadata = cached
+        else:
+            try:
+                text, metadata, events = await pools[system_name].run(pdf_path, timeout)
+                if trace is not None:
+                    trace.extend(events)
+            except asyncio.TimeoutError:
+                text, metadata = _failed_result(system.device, 'timeout', f"no result after {timeout}s",
+                                                time.perf_counter() - start)
+            except EngineMemoryError as e:
+                text, metadata = _failed_result(system.device, 'oom', str(e), time.perf_counter() - start)
+            except EngineError as e:
+                text, metadata = _failed_result(system.device, 'error', str(e), time.perf_counter() - start)
+
+        output_file = await loop.run_in_executor(io, store, pdf_path, system_name, text, metadata)
+        results[(pdf_path, system_name)] = {'text': text, 'metadata': metadata}
+        if metadata['status'] == 'success':
+            print(f"  ✅ {pdf_path.stem} / {system_name}: "
+                  f"{metadata.get('processing_time', 0):.2f}s, {len(text):,} chars -> {output_file.name}")
+        else:
+            print(f"  ❌ {pdf_path.stem} / {system_name}: {metadata['status']} ({metadata.get('error')})")
+
+    try:
+        await asyncio.gather(*(extract(pdf_path, system_name) for pdf_path, system_name in jobs))
+    finally:
+        for pool in pools.values():
+            await loop.run_in_executor(None, pool.close)
+        io.shutdown()
+    restarts = {name: pool.restarts for name, pool in pools.items() if pool.restarts}
+    if restarts:
+        print(f"🔁 Engine workers restarted: {restarts}")
+    return results
+
+
+def run_async_extractions(pdf_files, system_names, output_dir, workers, device_info, cache=None, manifest=None,
+                          trace=None, model_server=None, limits=None, timeout=None, memory_limit_mb=None,
+                          address_space_limit_mb=None):
+    """Benchmark entry point: extract every (pdf, system) unit with run_extraction_jobs.
+
+    Returns extractions in the benchmark's {pdf_name: {system: result}}
+    layout and order. Units the manifest already holds as complete are not
+    resubmitted. Engines run on the CPU, like the parallel process pool.
+    """
+    cpu_device_info = dict(device_info, cuda_available=False, device='cpu', device_name='CPU')
+    limits = {name: engine_limit(name, workers, limits) for name in system_names}
+    results = {}
+    jobs = []
+    for pdf_path in pdf_files:
+        for system_name in system_names:
+            done = manifest.completed(pdf_path, system_name) if manifest else None
+            if done:
+                results[(pdf_path, system_name)] = {'text': done[0], 'metadata': done[1]}
+            else:
+                jobs.append((pdf_path, system_name))
+
+    print(f"\n⚡ Async extraction: {len(jobs)} units, engine limits "
+          + ', '.join(f"{name}={limit}" for name, limit in limits.items())
+          + (f", {timeout:g}s timeout per job" if timeout else "")
+          + (f", {memory_limit_mb:g} MB RSS cap" if memory_limit_mb else "")
+          + (f", {address_space_limit_mb:g} MB address space" if address_space_limit_mb else ""))
+    results.update(asyncio.run(run_extraction_jobs(
+        jobs, output_dir, cpu_device_info, cache, manifest, trace, model_server, limits, timeout,
+        memory_limit_mb, address_space_limit_mb)))
+
+    return {
+        pdf_path.stem: {system_name: results[(pdf_path, system_name)] for system_name in system_names}
+        for pdf_path in pdf_files
+    }
+
+
+async def run_pipeline_jobs(pdf_files, output_dir, temp_dir, limit=1, timeout=None, workers=1,
+                            memory_limit_mb=None):
+    """Convert PDFs with the OCRmyPDF pipeline; returns [{'pdf', 'md_output', 'status', 'error', 'seconds'}]"""
+    try:
+        from scripts.batch_pipeline import write_atomic
+    except ImportError:  # run directly from the scripts directory
+        from batch_pipeline import write_atomic
+
+    loop = asyncio.get_running_loop()
+    io = ThreadPoolExecutor(max_workers=1, thread_name_prefix='pipeline-io')
+    pool = EnginePool(PIPELINE_ENGINE, limit, _pipeline_handler, (str(temp_dir), workers),
+                      memory_limit_mb=memory_limit_mb)
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    async def convert(pdf_path):
+        record = {'pdf': str(pdf_path), 'md_output': None, 'status': 'success', 'error': None}
+        start = time.perf_counter()
+        try:
+            md_text = await pool.run(pdf_path, timeout)
+            md_output = output_dir / f"{Path(pdf_path).stem}.md"
+            await loop.run_in_executor(io, write_atomic, md_output, md_text)
+            record['md_output'] = str(md_output)
+        except asyncio.TimeoutError:
+            record.update(status='timeout', error=f"no result after {timeout}s")
+        except EngineMemoryError as e:
+            record.update(status='oom', error=str(e))
+        except EngineError as e:
+            record.update(status='error', error=str(e))
+        record['seconds'] = time.perf_counter() - start
+        status = '✅' if record['status'] == 'success' else '❌'
+        print(f"{status} {Path(pdf_path).stem[:50]} ({record['seconds']:.1f}s)"
+              f"{' - ' + record['error'] if record['error'] else ''}")
+        return record
+
+    try:
+        return await asyncio.gather(*(convert(pdf_path) for pdf_path in pdf_files))
+    finally:
+        await loop.run_in_executor(None, pool.close)
+        io.shutdown()
+
+
+if __name__ == "__main__":
+    import argparse
+    import tempfile
+
+    parser = argparse.ArgumentParser(description="Convert PDFs with the OCRmyPDF pipeline on an asyncio orchestrator")
+    parser.add_argument('pdf_dir')
+    parser.add_argument('--output-dir', default='./output_markdown')
+    parser.add_argument('--temp-dir', default=tempfile.gettempdir())
+    parser.add_argument('--limit', type=int, default=1, help="PDFs converted at once (worker processes)")
+    parser.add_argument('--timeout', type=float, default=None, help="Seconds before a PDF's job is killed")
+    parser.add_argument('--memory-limit', type=float, default=None, metavar='MB',
+                        help="RSS above which a PDF's job is killed")
+    args = parser.parse_args()
+
+    pdfs = sorted(Path(args.pdf_dir).glob('*.pdf'))
+    started = time.perf_counter()
+    records = asyncio.run(run_pipeline_jobs(pdfs, args.output_dir, args.temp_dir, args.limit, args.timeout,
+                                            memory_limit_mb=args.memory_limit))
+    failed = sum(record['status'] != 'success' for record in records)
+    print(f"\n🏁 {len(records) - failed}/{len(records)} PDFs converted in {time.perf_counter() - started:.1f}s")
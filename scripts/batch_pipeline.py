@@ -0,0 +1,352 @@
+#!/usr/bin/env python3
+"""
+Batch PDF Ingestion Pipeline
+
+Runs ``process_pdf_pipeline``'s steps for many PDFs as four stages, each
+with its own pool of worker processes, connected by bounded queues:
+
+    detect  -> per-page scanned/born-digital classification
+    ocr     -> full or selective OCRmyPDF (scanned pages only)
+    markdown-> pymupdf4llm Markdown with header hierarchy
+    analyze -> heading normalization, header analysis, output write
+
+Born-digital files go from ``detect`` straight to ``markdown``, so a slow
+OCR job only occupies the OCR workers. Every job works in its own temp
+directory, so several batches can share an output or temp root. Per-stage
+throughput and sampled queue depths are reported at the end.
+
+A stage worker that dies (an OCRmyPDF/tesseract crash, the OOM killer)
+fails only the job it was running: the parent polls for results, notices
+the dead process, reports that job as failed and starts a replacement
+worker so the rest of the batch keeps flowing. A job with no result
+``job_timeout`` seconds after it entered the pipeline is failed as well
+(its worker is killed and replaced if it is still running it), so a job
+lost with a worker killed between queues, or stuck in one, cannot hang
+the batch.
+
+Usage: python -m scripts.batch_pipeline PDF_DIR [--output-dir DIR] [--ocr-workers N] [--job-timeout S]
+"""
+
+import os
+import queue
+import shutil
+import tempfile
+import threading
+import time
+from multiprocessing import Array, Process, Queue
+from pathlib import Path
+
+try:
+    from scripts.ocr_text import (
+        analyze_markdown_header_hierarchy,
+        classify_pages,
+        extract_markdown_with_hierarchy,
+        normalize_heading_hierarchy,
+        run_ocr,
+        run_selective_ocr,
+    )
+except ImportError:  # run directly from the scripts directory
+    from ocr_text import (
+        analyze_markdown_header_hierarchy,
+        classify_pages,
+        extract_markdown_with_hierarchy,
+        normalize_heading_hierarchy,
+        run_ocr,
+        run_selective_ocr,
+    )
+
+STAGES = ['detect', 'ocr', 'markdown', 'analyze']
+DEFAULT_STAGE_WORKERS = {'detect': 1, 'ocr': 1, 'markdown': 2, 'analyze': 1}
+DEFAULT_QUEUE_SIZE = 8
+# Seconds between liveness checks of the stage workers while waiting for results
+POLL_INTERVAL = 0.5
+# Seconds shutdown waits for a stop sentinel to fit in a queue / a worker to exit
+SHUTDOWN_TIMEOUT = 5
+# Seconds from entering the pipeline until a job without a result is failed
+DEFAULT_JOB_TIMEOUT = 3600
+_STOP = None
+
+
+def write_atomic(path, text):
+    """Write text via a temp file + rename so concurrent batches never see partial files"""
+    path = Path(path)
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(text)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def _detect(job):
+    pages = classify_pages(job['pdf'])
+    job['page_count'] = len(pages)
+    job['ocr_pages'] = [page['page'] for page in pages if page['needs_ocr']]
+    return 'ocr' if job['ocr_pages'] else 'markdown'
+
+
+def _ocr(job):
+    ocr_path = Path(job['temp_dir']) / f"{job['name']}_ocr.pdf"
+    if len(job['ocr_pages']) == job['page_count']:
+        run_ocr(job['pdf'], ocr_path)
+    else:
+        run_selective_ocr(job['pdf'], ocr_path, job['ocr_pages'], Path(job['temp_dir']))
+    job['used_pdf'] = str(ocr_path)
+    return 'markdown'
+
+
+def _markdown(job):
+    job['markdown'] = extract_markdown_with_hierarchy(job.get('used_pdf') or job['pdf'])
+    # The OCR'd copy is no longer needed once it has been converted
+    shutil.rmtree(job['temp_dir'], ignore_errors=True)
+    return 'analyze'
+
+
+def _analyze(job):
+    md_text = normalize_heading_hierarchy(job.pop('markdown'))
+    md_output = Path(job['output_dir']) / f"{job['name']}.md"
+    write_atomic(md_output, md_text)
+    job['md_output'] = str(md_output)
+    job['header_analysis'] = analyze_markdown_header_hierarchy(md_text)
+    return None
+
+
+_STAGE_FUNCS = {'detect': _detect, 'ocr': _ocr, 'markdown': _markdown, 'analyze': _analyze}
+
+
+def _stage_worker(stage, queues, results, held, slot):
+    """Pull jobs for one stage, run it and forward each job to its next stage.
+
+    held[slot] is the id of the job this worker is running (-1 when idle),
+    in shared memory so the parent can still read it if the worker dies.
+    """
+    func = _STAGE_FUNCS[stage]
+    inbox = queues[stage]
+    while True:
+        job = inbox.get()
+        if job is _STOP:
+            break
+        held[slot] = job['id']
+        start = time.perf_counter()
+        try:
+            next_stage = func(job)
+        except Exception as e:
+            job['error'] = f"{stage}: {e}"
+            next_stage = None
+            shutil.rmtree(job['temp_dir'], ignore_errors=True)
+        end = time.perf_counter()
+        job['timings'][stage] = (start, end)
+
+        if next_stage is None:
+            job.pop('markdown', None)
+            results.put(job)
+        else:
+            queues[next_stage].put(job)
+        held[slot] = -1
+
+
+def _sample_depths(queues, samples, done, interval):
+    while not done.wait(interval):
+        for stage, stage_queue in queues.items():
+            try:
+                samples[stage].append(stage_queue.qsize())
+            except NotImplementedError:  # macOS has no sem_getvalue
+                return
+
+
+def _stage_stats(results, samples, workers):
+    stats = {}
+    for stage in STAGES:
+        spans = [job['timings'][stage] for job in results if stage in job['timings']]
+        depths = samples[stage]
+        busy = sum(end - start for start, end in spans)
+        wall = max(end for _, end in spans) - min(start for start, _ in spans) if spans else 0.0
+        stats[stage] = {
+            'workers': workers[stage],
+            'jobs': len(spans),
+            'busy_seconds': busy,
+            'wall_seconds': wall,
+            'throughput_per_min': len(spans) / wall * 60 if wall else 0.0,
+            'mean_queue_depth': sum(depths) / len(depths) if depths else 0.0,
+            'max_queue_depth': max(depths) if depths else 0,
+        }
+    return stats
+
+
+def run_batch_pipeline(pdf_files, output_dir, temp_root=None, stage_workers=None,
+                       queue_size=DEFAULT_QUEUE_SIZE, sample_interval=0.05, job_timeout=DEFAULT_JOB_TIMEOUT):
+    """Process PDFs through the staged pipeline.
+
+    Returns (results, stage_stats): one dict per PDF (ocr_pages, md_output,
+    header_analysis, timings, error) and per-stage throughput/queue stats.
+    A job with no result job_timeout seconds after it was queued for
+    detection fails (job_timeout=None waits forever).
+    """
+    pdf_files = [Path(p) for p in pdf_files]
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    temp_root = Path(temp_root or tempfile.gettempdir())
+    temp_root.mkdir(parents=True, exist_ok=True)
+    workers = dict(DEFAULT_STAGE_WORKERS, **(stage_workers or {}))
+
+    queues = {stage: Queue(maxsize=queue_size) for stage in STAGES}
+    results_queue = Queue()
+    slots = [stage for stage in STAGES for _ in range(workers[stage])]
+    held = Array('i', [-1] * len(slots), lock=False)
+
+    def start_worker(slot):
+        process = Process(target=_stage_worker,
+                          args=(slots[slot], queues, results_queue, held, slot), daemon=True)
+        process.start()
+        return process
+
+    processes = [start_worker(slot) for slot in range(len(slots))]
+
+    samples = {stage: [] for stage in STAGES}
+    done = threading.Event()
+    sampler = threading.Thread(target=_sample_depths,
+                               args=(queues, samples, done, sample_interval), daemon=True)
+    sampler.start()
+
+    jobs = {}
+    queued_at = {}
+
+    def feed():
+        for job_id, pdf_path in enumerate(pdf_files):
+            job = {
+                'id': job_id,
+                'pdf': str(pdf_path),
+                'name': pdf_path.stem,
+                'output_dir': str(output_dir),
+                'temp_dir': tempfile.mkdtemp(prefix=f"{pdf_path.stem[:40]}_", dir=temp_root),
+                'ocr_pages': [],
+                'timings': {},
+                'error': None,
+            }
+            jobs[job_id] = job
+            while not done.is_set():
+                try:
+                    queues['detect'].put(job, timeout=POLL_INTERVAL)
+                    queued_at[job_id] = time.monotonic()
+                    break
+                except queue.Full:
+                    continue
+
+    feeder = threading.Thread(target=feed, daemon=True)
+    feeder.start()
+
+    start = time.perf_counter()
+    results = []
+    finished = set()
+
+    def finish(job):
+        if job['id'] in finished:
+            return  # already failed with a dead worker
+        finished.add(job['id'])
+        results.append(job)
+        status = '❌' if job['error'] else '✅'
+        print(f"{status} [{len(results)}/{len(pdf_files)}] {job['name'][:50]}"
+              f"{' - ' + job['error'] if job['error'] else ''}")
+
+    def reap_dead_workers():
+        for slot, process in enumerate(processes):
+            if process.is_alive():
+                continue
+            # Jobs the worker finished before dying may still be in the queue
+            while True:
+                try:
+                    finish(results_queue.get_nowait())
+                except queue.Empty:
+                    break
+            job_id = held[slot]
+            held[slot] = -1
+            if job_id != -1 and job_id not in finished:
+                job = jobs[job_id]
+                job['error'] = f"{slots[slot]}: worker exited with code {process.exitcode}"
+                shutil.rmtree(job['temp_dir'], ignore_errors=True)
+                finish(job)
+            processes[slot] = start_worker(slot)
+
+    def fail_overdue_jobs():
+        now = time.monotonic()
+        for job_id, queued in list(queued_at.items()):
+            if job_id in finished or now - queued < job_timeout:
+                continue
+            stage = None
+            for slot, process in enumerate(processes):
+                if held[slot] == job_id:
+                    # Stuck in this stage: kill the worker, reap_dead_workers replaces it
+                    stage = slots[slot]
+                    process.kill()
+                    process.join()
+            job = jobs[job_id]
+            job['error'] = (f"{stage}: no result after {job_timeout:g}s" if stage
+                            else f"no result after {job_timeout:g}s (lost or still queued)")
+            shutil.rmtree(job['temp_dir'], ignore_errors=True)
+            finish(job)
+
+    try:
+        while len(finished) < len(pdf_files):
+            try:
+                finish(results_queue.get(timeout=POLL_INTERVAL))
+            except queue.Empty:
+                pass
+            if job_timeout is not None:
+                fail_overdue_jobs()
+            reap_dead_workers()
+    finally:
+        done.set()
+        feeder.join(timeout=SHUTDOWN_TIMEOUT)
+        for stage in slots:
+            try:
+                queues[stage].put(_STOP, timeout=SHUTDOWN_TIMEOUT)
+            except queue.Full:
+                pass
+        for process in processes:
+            process.join(timeout=SHUTDOWN_TIMEOUT)
+            if process.is_alive():
+                process.terminate()
+                process.join()
+
+    stats = _stage_stats(results, samples, workers)
+    stats['total'] = {'jobs': len(results), 'wall_seconds': time.perf_counter() - start}
+    return results, stats
+
+
+def print_stage_stats(stats):
+    """Print per-stage throughput and queue depths"""
+    print(f"\n🏭 PIPELINE STAGES ({stats['total']['jobs']} PDFs in "
+          f"{stats['total']['wall_seconds']:.1f}s)")
+    print(f"  {'stage':<9} {'workers':>7} {'jobs':>5} {'busy':>8} {'PDFs/min':>9} "
+          f"{'queue avg':>10} {'queue max':>10}")
+    for stage in STAGES:
+        s = stats[stage]
+        print(f"  {stage:<9} {s['workers']:>7} {s['jobs']:>5} {s['busy_seconds']:>7.1f}s "
+              f"{s['throughput_per_min']:>9.1f} {s['mean_queue_depth']:>10.1f} "
+              f"{s['max_queue_depth']:>10}")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description=__doc__.strip().split('\n')[0])
+    parser.add_argument('pdf_dir')
+    parser.add_argument('--output-dir', default='./output_markdown')
+    parser.add_argument('--temp-dir', default=None)
+    parser.add_argument('--queue-size', type=int, default=DEFAULT_QUEUE_SIZE)
+    parser.add_argument('--job-timeout', type=float, default=DEFAULT_JOB_TIMEOUT,
+                        help="Seconds after which a PDF without a result is failed")
+    for stage in STAGES:
+        parser.add_argument(f'--{stage}-workers', type=int, default=DEFAULT_STAGE_WORKERS[stage])
+    args = parser.parse_args()
+
+    pdfs = sorted(Path(args.pdf_dir).glob('*.pdf'))
+    _, stage_stats = run_batch_pipeline(
+        pdfs, args.output_dir, args.temp_dir,
+        {stage: getattr(args, f'{stage}_workers') for stage in STAGES},
+        args.queue_size,
+        job_timeout=args.job_timeout,
+    )
+    print_stage_stats(stage_stats)
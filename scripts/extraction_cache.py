@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+"""
+Content-Addressed Extraction Cache
+
+Persists OCR extractions on disk keyed by the SHA-256 of the PDF bytes,
+the OCR system name, the installed engine package version and the
+extraction config. Re-running the benchmark on unchanged PDFs returns the
+stored text instead of loading models and re-extracting. Entries are
+evicted least-recently-used first once the cache exceeds its size limit.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import time
+from pathlib import Path
+
+try:
+    from scripts.ocr_backends import BACKENDS
+except ImportError:  # run directly from the scripts directory
+    from ocr_backends import BACKENDS
+
+DEFAULT_CACHE_DIR = Path("./.extraction_cache")
+DEFAULT_MAX_BYTES = 2 * 1024 ** 3
+# Eviction frees this share of max_bytes beyond the limit, so a full cache
+# is not rescanned on every insert
+EVICTION_HEADROOM = 0.1
+
+
+def engine_version(system_name):
+    """Installed version of the package behind an OCR system, or 'unknown'"""
+    from importlib import metadata as importlib_metadata
+
+    backend = BACKENDS.get(system_name)
+    package = backend.package if backend is not None else system_name
+    try:
+        return importlib_metadata.version(package)
+    except importlib_metadata.PackageNotFoundError:
+        return 'unknown'
+
+
+def file_sha256(path, chunk_size=1024 * 1024):
+    """SHA-256 hex digest of a file, read in chunks"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ExtractionCache:
+    """On-disk LRU cache of (text, metadata) extraction results"""
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, max_bytes=DEFAULT_MAX_BYTES):
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.hits = 0
+        self.misses = 0
+        self.bytes_saved = 0
+        self.evictions = 0
+        self._pdf_hashes = {}
+        # On-disk size as of the last eviction scan plus this process's own writes
+        self._cache_bytes = None
+
+    def make_key(self, pdf_path, system_name, config=None):
+        """Cache key for one (pdf, system, engine version, config) unit"""
+        pdf_path = Path(pdf_path)
+        stat = pdf_path.stat()
+        memo_key = (str(pdf_path.resolve()), stat.st_size, stat.st_mtime_ns)
+        pdf_hash = self._pdf_hashes.get(memo_key)
+        if pdf_hash is None:
+            pdf_hash = self._pdf_hashes[memo_key] = file_sha256(pdf_path)
+
+        key_data = json.dumps({
+            'pdf_sha256': pdf_hash,
+            'system': system_name,
+            'engine_version': engine_version(system_name),
+            'config': config or {},
+        }, sort_keys=True)
+        return hashlib.sha256(key_data.encode('utf-8')).hexdigest()
+
+    def _entry_path(self, key):
+        return self.cache_dir / key[:2] / f"{key}.json"
+
+    def get(self, pdf_path, system_name, config=None):
+        """Return cached (text, metadata) or None on a miss"""
+        entry_path = self._entry_path(self.make_key(pdf_path, system_name, config))
+        try:
+            with open(entry_path, 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            self.misses += 1
+            return None
+
+        # Touch the entry so eviction sees it as recently used
+        try:
+            os.utime(entry_path)
+        except OSError:
+            pass  # evicted by another process since it was read
+        self.hits += 1
+        self.bytes_saved += len(entry['text'].encode('utf-8'))
+
+        metadata = dict(entry['metadata'], cache_hit=True)
+        return entry['text'], metadata
+
+    def put(self, pdf_path, system_name, text, metadata, config=None):
+        """Store an extraction result and evict old entries if over the limit
+
+        The cache directory is only scanned on the first put and when the
+        running size estimate goes over max_bytes, not on every insert.
+        """
+        entry_path = self._entry_path(self.make_key(pdf_path, system_name, config))
+        entry_path.parent.mkdir(parents=True, exist_ok=True)
+
+        entry = {
+            'system': system_name,
+            'pdf': Path(pdf_path).name,
+            'created': time.time(),
+            'text': text,
+            'metadata': {k: v for k, v in metadata.items() if k != 'cache_hit'},
+        }
+        # Write to a temp file and rename so concurrent readers never see partial entries
+        fd, tmp_path = tempfile.mkstemp(dir=entry_path.parent, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(entry, f, ensure_ascii=False)
+            added = os.path.getsize(tmp_path)
+            try:
+                added -= entry_path.stat().st_size  # replacing an existing entry
+            except OSError:
+                pass
+            os.replace(tmp_path, entry_path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+        if self._cache_bytes is None or self._cache_bytes + added > self.max_bytes:
+            self.evict()
+        else:
+            self._cache_bytes += added
+
+    def evict(self):
+        """Remove least-recently-used entries until the cache is EVICTION_HEADROOM below max_bytes"""
+        target = self.max_bytes * (1 - EVICTION_HEADROOM)
+        entries = []
+        total = 0
+        for entry_path in self.cache_dir.glob('*/*.json'):
+            try:
+                stat = entry_path.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, entry_path))
+            total += stat.st_size
+
+        entries.sort()
+        for _, size, entry_path in entries:
+            if total <= target:
+                break
+            try:
+                entry_path.unlink()
+            except OSError:
+                continue
+            total -= size
+            self.evictions += 1
+        self._cache_bytes = total
+        return total
+
+    def record(self, metadata, text):
+        """Count a lookup that happened in another process (e.g. a pool worker)"""
+        if metadata.get('cache_hit'):
+            self.hits += 1
+            self.bytes_saved += len(text.encode('utf-8'))
+        else:
+            self.misses += 1
+
+    def stats(self):
+        """Hit/miss counters and current on-disk size"""
+        size = 0
+        for entry_path in self.cache_dir.glob('*/*.json'):
+            try:
+                size += entry_path.stat().st_size
+            except OSError:
+                continue  # evicted by another process since the glob
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'bytes_saved': self.bytes_saved,
+            'evictions': self.evictions,
+            'cache_bytes': size,
+            'max_bytes': self.max_bytes,
+        }
+
+    def report(self):
+        """Print cache statistics"""
+        stats = self.stats()
+        print(f"\n🗄️  EXTRACTION CACHE ({self.cache_dir})")
+        print(f"   Hits: {stats['hits']}  Misses: {stats['misses']}  "
+              f"Hit rate: {stats['hit_rate']:.1%}")
+        print(f"   Bytes saved: {stats['bytes_saved'] / 1e6:.2f} MB  "
+              f"Evictions: {stats['evictions']}")
+        print(f"   Size: {stats['cache_bytes'] / 1e6:.2f} / {stats['max_bytes'] / 1e6:.0f} MB")
+        return stats
@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+"""
+Fast Text Metrics
+
+Accuracy metrics that scale close to linearly with document length, so
+every document of a large corpus can be scored. The benchmark reports them
+in their own columns (Token_*, Char_NGram_Jaccard and the Sparse_*
+accuracy/CER/WER) next to the exact Levenshtein columns, which are only
+computed on request (``calculate_text_metrics(..., exact=True)``,
+``--exact``).
+
+- Bag-of-words precision/recall/F1: multiset overlap of the token IDs.
+- Character n-gram Jaccard, estimated from bottom-k MinHash sketches of
+  each text's n-gram set. Sketches are cached on the NormalizedText, so a
+  baseline is sketched once however many systems it is compared against.
+- CER/WER from a sparse alignment: a patience diff pairs the words that
+  occur exactly once in both texts (recursing into the gaps between
+  them), and only the gaps go through the exact Levenshtein kernel. The
+  result is an upper bound on the exact distance and equals it whenever
+  the anchors lie on an optimal alignment. Gaps without anchors that are
+  too large for the kernel are charged their longer length. Text moved to
+  another place (e.g. Markdown reordering floats) costs a deletion plus an
+  insertion, where the exact DP offsets part of it with chance character
+  matches, so the sparse rates read higher on reordered documents.
+
+All functions take NormalizedText pairs sharing one vocabulary (see
+``normalized_text.normalize_pair``). ``python -m benchmarks.fast_metrics``
+reports their agreement with the exact metrics on the shipped corpus.
+"""
+
+import zlib
+from collections import Counter
+from heapq import nsmallest
+
+try:
+    from scripts.edit_distance import _common_affix, levenshtein
+    from scripts.normalized_text import NormalizedText
+    from scripts.page_scoring import _longest_increasing
+except ImportError:  # run directly from the scripts directory
+    from edit_distance import _common_affix, levenshtein
+    from normalized_text import NormalizedText
+    from page_scoring import _longest_increasing
+
+MINHASH_NGRAM = 5
+MINHASH_SIZE = 256
+# Gaps whose DP table would exceed this many cells are not aligned exactly
+MAX_GAP_CELLS = 1 << 22
+# Windows this small are aligned exactly rather than split at anchors
+EXACT_WINDOW_CELLS = 1 << 16
+
+
+def bag_of_words_scores(reference, candidate):
+    """Precision, recall and F1 of the candidate's words against the reference's (as multisets)"""
+    ref_ids, cand_ids = reference.token_ids, candidate.token_ids
+    overlap = sum((Counter(ref_ids) & Counter(cand_ids)).values())
+    precision = overlap / len(cand_ids) if cand_ids else float(not ref_ids)
+    recall = overlap / len(ref_ids) if ref_ids else float(not cand_ids)
+    f1 = 2 * precision * recall / (precision + recall) if precision + recall else 0.0
+    return {'token_precision': precision, 'token_recall': recall, 'token_f1': f1}
+
+
+def char_ngrams(text, n=MINHASH_NGRAM):
+    """Set of character n-grams of text (a shorter non-empty text is its own n-gram)"""
+    if len(text) < n:
+        return {text} if text else set()
+    return {text[i:i + n] for i in range(len(text) - n + 1)}
+
+
+def minhash_sketch(text, n=MINHASH_NGRAM, size=MINHASH_SIZE):
+    """Bottom-k MinHash sketch: the ``size`` smallest hashes of the n-grams of the collapsed text, sorted"""
+    if isinstance(text, NormalizedText):
+        sketch = text.sketches.get((n, size))
+        if sketch is None:
+            sketch = text.sketches[(n, size)] = minhash_sketch(text.collapsed, n, size)
+        return sketch
+    # CRC-32 is stable across processes, unlike hash() of a str, and runs in C
+    return nsmallest(size, map(zlib.crc32, map(str.encode, char_ngrams(text, n))))
+
+
+def sketch_jaccard(a, b, size=MINHASH_SIZE):
+    """Jaccard similarity of two n-gram sets estimated from their sketches.
+
+    A sketch shorter than ``size`` holds its whole set, so two such
+    sketches give the exact Jaccard similarity. Otherwise, below the
+    smaller of the two largest sketched hashes both sketches hold every
+    hash of their set, and the estimate is the Jaccard similarity of that
+    slice (bottom-k).
+    """
+    if not a or not b:
+        return float(not a and not b)
+    if len(a) < size and len(b) < size:
+        set_a, set_b = set(a), set(b)
+        return len(set_a & set_b) / len(set_a | set_b)
+    threshold = min(a[-1], b[-1])
+    slice_a = {h for h in a if h <= threshold}
+    slice_b = {h for h in b if h <= threshold}
+    return len(slice_a & slice_b) / len(slice_a | slice_b)
+
+
+def _unique_positions(seq, lo, hi):
+    """{item: index} of the items occurring exactly once in seq[lo:hi]"""
+    counts = Counter(seq[lo:hi])
+    return {item: idx for idx, item in enumerate(seq[lo:hi], lo) if counts[item] == 1}
+
+
+def patience_anchors(a, b, small_window=None):
+    """Matched (i, j) index pairs of a patience diff of two sequences, increasing in both.
+
+    Each window's common prefix and suffix are matched, then the items
+    unique to both sides of the window are chained (longest increasing
+    subsequence) and the windows between chained items are diffed the
+    same way. Windows for which ``small_window(a_lo, a_hi, b_lo, b_hi)``
+    is true are left without anchors (for an exact alignment instead).
+    """
+    anchors = []
+    windows = [(0, len(a), 0, len(b))]
+    while windows:
+        a_lo, a_hi, b_lo, b_hi = windows.pop()
+        prefix, suffix = _common_affix(a[a_lo:a_hi], b[b_lo:b_hi])
+        anchors.extend((a_lo + k, b_lo + k) for k in range(prefix))
+        anchors.extend((a_hi - k, b_hi - k) for k in range(1, suffix + 1))
+        a_lo, b_lo = a_lo + prefix, b_lo + prefix
+        a_hi, b_hi = a_hi - suffix, b_hi - suffix
+        if a_lo == a_hi or b_lo == b_hi or (small_window and small_window(a_lo, a_hi, b_lo, b_hi)):
+            continue
+
+        unique_a = _unique_positions(a, a_lo, a_hi)
+        unique_b = _unique_positions(b, b_lo, b_hi)
+        chain = _longest_increasing(sorted(
+            (i, unique_b[item]) for item, i in unique_a.items() if item in unique_b
+        ))
+        anchors.extend(chain)
+        starts = [(a_lo, b_lo)] + [(i + 1, j + 1) for i, j in chain]
+        ends = chain + [(a_hi, b_hi)]
+        if chain:
+            windows.extend((start_a, end_a, start_b, end_b)
+                           for (start_a, start_b), (end_a, end_b) in zip(starts, ends)
+                           if start_a < end_a and start_b < end_b)
+    anchors.sort()
+    return anchors
+
+
+def _runs(anchors, len_a, len_b):
+    """Split the alignment into (gap, run): the unmatched ranges before each run of consecutive anchors.
+
+    Yields ((a_lo, a_hi, b_lo, b_hi), (i, j, length)); the final item has
+    a run of length 0 at the ends of both sequences.
+    """
+    a_pos = b_pos = 0
+    idx = 0
+    while idx <= len(anchors):
+        if idx == len(anchors):
+            i, j, length = len_a, len_b, 0
+        else:
+            i, j = anchors[idx]
+            length = 1
+            while (idx + length < len(anchors)
+                   and anchors[idx + length] == (i + length, j + length)):
+                length += 1
+        yield (a_pos, i, b_pos, j), (i, j, length)
+        a_pos, b_pos = i + length, j + length
+        idx += max(length, 1)
+
+
+def _gap_distance(a, b, max_cells):
+    if len(a) * len(b) > max_cells:
+        return max(len(a), len(b))
+    return levenshtein(a, b)
+
+
+def _segment(text, lo, hi):
+    """Characters of words lo..hi-1 of collapsed text, each followed by its separating space"""
+    offsets = text.word_offsets
+    segment = text.collapsed[offsets[lo]:offsets[hi]]
+    # Both sides gain the same trailing space, which leaves distances unchanged
+    return segment + ' ' if lo < hi and offsets[hi] > len(text.collapsed) else segment
+
+
+def sparse_distances(reference, candidate, max_cells=MAX_GAP_CELLS, exact_cells=EXACT_WINDOW_CELLS):
+    """(character, word) edit distances of two NormalizedTexts through their patience anchors.
+
+    Anchors are matched lower-cased words: a run of them costs nothing at
+    the word level and, at the character level, only whatever case
+    differences it contains. Character distances are on the collapsed
+    text, as in character_accuracy. Windows of at most ``exact_cells``
+    character pairs are aligned exactly instead of split further.
+    """
+    a, b = reference.token_ids, candidate.token_ids
+    ref_offsets, cand_offsets = reference.word_offsets, candidate.word_offsets
+
+    def small_window(a_lo, a_hi, b_lo, b_hi):
+        return ((ref_offsets[a_hi] - ref_offsets[a_lo]) * (cand_offsets[b_hi] - cand_offsets[b_lo])
+                <= exact_cells)
+
+    char_distance = word_distance = 0
+    anchors = patience_anchors(a, b, small_window)
+    for (a_lo, a_hi, b_lo, b_hi), (i, j, length) in _runs(anchors, len(a), len(b)):
+        if a_lo < a_hi or b_lo < b_hi:
+            word_distance += _gap_distance(a[a_lo:a_hi], b[b_lo:b_hi], max_cells)
+            char_distance += _gap_distance(_segment(reference, a_lo, a_hi),
+                                           _segment(candidate, b_lo, b_hi), max_cells)
+        if length and _segment(reference, i, i + length) != _segment(candidate, j, j + length):
+            char_distance += sum(levenshtein(_segment(reference, i + k, i + k + 1),
+                                             _segment(candidate, j + k, j + k + 1))
+                                 for k in range(length))
+    return char_distance, word_distance
+
+
+def error_rate(distance, reference_length):
+    """Edit distance per reference unit (CER/WER); may exceed 1 for long insertions"""
+    return distance / reference_length if reference_length else float(distance > 0)
+
+
+def fast_text_metrics(reference, candidate, max_cells=MAX_GAP_CELLS):
+    """All fast metrics of a NormalizedText pair, with sparse-alignment CER/WER"""
+    char_distance, word_distance = sparse_distances(reference, candidate, max_cells)
+    return {
+        **bag_of_words_scores(reference, candidate),
+        'char_ngram_jaccard': sketch_jaccard(minhash_sketch(reference), minhash_sketch(candidate)),
+        'cer': error_rate(char_distance, len(reference.collapsed)),
+        'wer': error_rate(word_distance, reference.word_count),
+    }
@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+Ground-Truth Corpus
+
+Pairs PDFs with reference transcriptions, so accuracy is measured against
+ground truth instead of the PyMuPDF baseline. A corpus is either
+
+- a directory of PDFs, each with a reference named after it
+  (``<stem>.txt``, ``<stem>.md`` or ``<stem>.json``) beside it or in a
+  separate reference directory; or
+- a manifest, JSON Lines (one object per line) or CSV, with a ``pdf`` and
+  a ``reference`` path per document and optionally a ``format``
+  (``text``, ``markdown`` or ``structure``; otherwise taken from the
+  reference's suffix). Relative paths resolve against the manifest's
+  directory.
+
+Structure references are JSON as ``structure_parser.py`` writes it; their
+text is the document elements in order (title, authors, abstract, each
+section's title, paragraphs and subsections, then equations, tables,
+figures, captions and references). Text and Markdown references are
+compared as written.
+
+Records are produced lazily: the directory is listed by name only and the
+manifest is read one line at a time, and a reference is read from disk
+only when ``reference_text()`` is called. ``chunks(n)`` groups records so
+the benchmark (``--ground-truth``) extracts and scores n documents at a
+time and never holds more than one chunk of texts in memory.
+
+Usage: python -m scripts.ground_truth CORPUS [--reference-dir DIR]
+"""
+
+import csv
+import json
+import os
+from itertools import islice
+from pathlib import Path
+
+REFERENCE_FORMATS = {'.txt': 'text', '.md': 'markdown', '.markdown': 'markdown', '.json': 'structure'}
+MANIFEST_SUFFIXES = ('.jsonl', '.csv')
+
+
+def _strings(value):
+    """Every string in a JSON value, depth first in document order"""
+    if isinstance(value, str):
+        if value.strip():
+            yield value
+    elif isinstance(value, dict):
+        for item in value.values():
+            yield from _strings(item)
+    elif isinstance(value, list):
+        for item in value:
+            yield from _strings(item)
+
+
+def structure_text(structure):
+    """Reference text of a structure JSON (its document_elements, or a top-level 'text')"""
+    if 'document_elements' in structure:
+        return '\n'.join(_strings(structure['document_elements']))
+    if isinstance(structure.get('text'), str):
+        return structure['text']
+    return '\n'.join(_strings(structure))
+
+
+class GroundTruthRecord:
+    """One PDF and its reference; the reference is read on demand"""
+
+    __slots__ = ('doc_id', 'pdf_path', 'reference_path', 'format')
+
+    def __init__(self, pdf_path, reference_path, format=None):
+        self.pdf_path = Path(pdf_path)
+        self.reference_path = Path(reference_path)
+        self.format = format or REFERENCE_FORMATS.get(self.reference_path.suffix.lower(), 'text')
+        if self.format not in REFERENCE_FORMATS.values():
+            raise ValueError(f"Unknown reference format {self.format!r} for {self.reference_path}")
+        self.doc_id = self.pdf_path.stem
+
+    def __repr__(self):
+        return f"GroundTruthRecord({self.doc_id!r}, {self.format})"
+
+    def reference_text(self):
+        if self.format == 'structure':
+            with open(self.reference_path, encoding='utf-8') as f:
+                return structure_text(json.load(f))
+        return self.reference_path.read_text(encoding='utf-8')
+
+
+class GroundTruthCorpus:
+    """Lazily iterated (PDF, reference) records from a directory or a manifest.
+
+    Documents are identified by their PDF stem, which also names their
+    extraction artifacts; records whose PDF or reference is missing, and
+    later records repeating a stem, are skipped and counted in
+    ``skipped``.
+    """
+
+    def __init__(self, source, reference_dir=None):
+        self.source = Path(source)
+        self.reference_dir = Path(reference_dir) if reference_dir else None
+        self.skipped = {}
+        if not self.source.exists():
+            raise FileNotFoundError(f"Ground-truth corpus not found: {self.source}")
+        if not self.source.is_dir() and self.source.suffix.lower() not in MANIFEST_SUFFIXES:
+            raise ValueError(f"Expected a directory or a {'/'.join(MANIFEST_SUFFIXES)} manifest, got {self.source}")
+
+    def __iter__(self):
+        self.skipped = {}
+        seen = set()
+        records = self._directory_records() if self.source.is_dir() else self._manifest_records()
+        for record in records:
+            if record.doc_id in seen:
+                self._skip('duplicate id')
+            elif not record.pdf_path.is_file():
+                self._skip('missing pdf')
+            elif not record.reference_path.is_file():
+                self._skip('missing reference')
+            else:
+                seen.add(record.doc_id)
+                yield record
+
+    def chunks(self, size):
+        """Lists of up to ``size`` records, read as they are needed"""
+        records = iter(self)
+        while True:
+            chunk = list(islice(records, size))
+            if not chunk:
+                return
+            yield chunk
+
+    def _skip(self, reason):
+        self.skipped[reason] = self.skipped.get(reason, 0) + 1
+
+    def _directory_records(self):
+        reference_dir = self.reference_dir or self.source
+        with os.scandir(self.source) as entries:
+            names = sorted(entry.name for entry in entries
+                           if entry.name.lower().endswith('.pdf') and entry.is_file())
+        for name in names:
+            pdf_path = self.source / name
+            for suffix in REFERENCE_FORMATS:
+                reference_path = reference_dir / f"{pdf_path.stem}{suffix}"
+                if reference_path.is_file():
+                    yield GroundTruthRecord(pdf_path, reference_path)
+                    break
+            else:
+                self._skip('missing reference')
+
+    def _manifest_records(self):
+        base = self.source.parent
+        with open(self.source, encoding='utf-8', newline='') as f:
+            if self.source.suffix.lower() == '.csv':
+                rows = csv.DictReader(f)
+            else:
+                rows = (json.loads(line) for line in f if line.strip())
+            for row in rows:
+                if not row.get('pdf') or not row.get('reference'):
+                    self._skip('incomplete entry')
+                    continue
+                yield GroundTruthRecord(base / row['pdf'], base / row['reference'], row.get('format') or None)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Check a ground-truth corpus without loading it")
+    parser.add_argument('corpus', help="directory of PDFs and references, or a .jsonl/.csv manifest")
+    parser.add_argument('--reference-dir', default=None,
+                        help="references for a PDF directory, if not beside the PDFs")
+    args = parser.parse_args()
+
+    corpus = GroundTruthCorpus(args.corpus, args.reference_dir)
+    formats = {}
+    for record in corpus:
+        formats[record.format] = formats.get(record.format, 0) + 1
+    print(f"📚 {sum(formats.values())} documents in {args.corpus}: "
+          f"{', '.join(f'{fmt}: {n}' for fmt, n in sorted(formats.items())) or 'none'}")
+    if corpus.skipped:
+        print(f"⚠️  Skipped: {', '.join(f'{reason}: {n}' for reason, n in sorted(corpus.skipped.items()))}")
@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+"""
+Warm Model Server
+
+Keeps Docling/Marker converters loaded in one long-lived process and serves
+extraction jobs over a local Unix socket, so each benchmark invocation pays
+inference only instead of ``create_model_dict()`` / ``DocumentConverter()``
+every time. Requests and replies are pickled Python objects
+(``multiprocessing.connection``); the socket file is created mode 0600, so
+only the user who started the server can submit jobs.
+
+Each connection is served on its own thread. Extractions for one system are
+serialized unless its backend declares itself thread-safe; different
+systems run concurrently.
+
+Reply metadata carries the server's own profile of the extraction (CPU
+time, peak RSS, I/O, pages; see scripts/profiling.py), which clients
+report instead of their own mostly idle process. A client whose
+connection breaks (e.g. the server was restarted) reconnects once and
+resends the request before giving up.
+
+Usage:
+    python -m scripts.model_server --systems Docling Marker [--socket PATH]
+    python -m scripts.ocr_benchmark_gpu_optimized --model-server PATH
+    python -m scripts.model_server --stop
+"""
+
+import contextlib
+import os
+import tempfile
+import threading
+import time
+from multiprocessing.connection import Client, Listener
+from pathlib import Path
+
+try:
+    from scripts.ocr_backends import THREAD_SAFE
+except ImportError:  # run directly from the scripts directory
+    from ocr_backends import THREAD_SAFE
+
+DEFAULT_SOCKET_PATH = Path(tempfile.gettempdir()) / f"ocr-model-server-{os.getuid()}.sock"
+SERVED_SYSTEMS = ['Docling', 'Marker']
+
+
+class ModelClient:
+    """Connection to a running ModelServer (one per process)"""
+
+    def __init__(self, address=DEFAULT_SOCKET_PATH):
+        self.address = str(address)
+        self._conn = None
+
+    def _send(self, request):
+        if self._conn is None:
+            self._conn = Client(self.address, family='AF_UNIX')
+        self._conn.send(request)
+        return self._conn.recv()
+
+    def _request(self, **request):
+        try:
+            reply = self._send(request)
+        except (EOFError, OSError):
+            # Broken connection (server restarted or dropped us): reconnect once
+            self.close()
+            reply = self._send(request)
+        if reply.get('status') != 'ok':
+            raise RuntimeError(f"Model server: {reply.get('error')}")
+        return reply
+
+    def ping(self):
+        """Server info: pid, served systems and their model load times"""
+        return self._request(op='ping')
+
+    def extract(self, system_name, pdf_path):
+        """(text, metadata) of one extraction on the server's warm system, profiled by the server"""
+        reply = self._request(op='extract', system=system_name, pdf_path=str(Path(pdf_path).resolve()))
+        return reply['text'], reply['metadata']
+
+    def shutdown(self):
+        self._request(op='shutdown')
+        self.close()
+
+    def close(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+
+def server_running(address=DEFAULT_SOCKET_PATH):
+    """Whether a model server answers on address"""
+    client = ModelClient(address)
+    try:
+        client.ping()
+        return True
+    except (OSError, EOFError, RuntimeError):
+        return False
+    finally:
+        client.close()
+
+
+def wait_for_server(address=DEFAULT_SOCKET_PATH, timeout=600.0, process=None):
+    """Block until a server answers on address (model loading can take minutes).
+
+    With the server's subprocess.Popen, fails as soon as the server exits.
+    """
+    deadline = time.monotonic() + timeout
+    while not server_running(address):
+        if process is not None and process.poll() is not None:
+            raise RuntimeError(f"Model server exited with code {process.returncode}")
+        if time.monotonic() > deadline:
+            raise TimeoutError(f"No model server on {address} after {timeout:.0f}s")
+        time.sleep(0.2)
+
+
+class ModelServer:
+    """Loads OCR systems once and serves extract requests on a Unix socket"""
+
+    def __init__(self, system_names=SERVED_SYSTEMS, address=DEFAULT_SOCKET_PATH, device_info=None):
+        self.system_names = list(system_names)
+        self.address = Path(address)
+        self.device_info = device_info
+        self.systems = {}
+        self.load_times = {}
+        self._locks = {}
+        self._stopping = False
+
+    def load(self):
+        """Initialize every served system (the cost clients no longer pay)"""
+        try:
+            from scripts.ocr_benchmark_gpu_optimized import GPUOptimizedOCRSystem
+        except ImportError:  # run directly from the scripts directory
+            from ocr_benchmark_gpu_optimized import GPUOptimizedOCRSystem
+
+        for name in self.system_names:
+            system = GPUOptimizedOCRSystem(name, self.device_info)
+            start = time.perf_counter()
+            system.initialize()
+            self.load_times[name] = time.perf_counter() - start
+            self.systems[name] = system
+            # Thread-safe backends serve concurrent requests on one instance
+            self._locks[name] = (contextlib.nullcontext() if THREAD_SAFE in system.backend.capabilities
+                                 else threading.Lock())
+            print(f"🔥 {name} warm ({self.load_times[name]:.1f}s to load)")
+
+    def _handle(self, request):
+        op = request.get('op')
+        if op == 'ping':
+            return {'status': 'ok', 'pid': os.getpid(), 'systems': list(self.systems),
+                    'load_times': dict(self.load_times)}
+        if op == 'extract':
+            name = request.get('system')
+            if name not in self.systems:
+                return {'status': 'error', 'error': f"system {name!r} not served (serving {list(self.systems)})"}
+            with self._locks[name]:
+                text, metadata = self.systems[name].extract_text(request['pdf_path'])
+            return {'status': 'ok', 'text': text, 'metadata': metadata}
+        if op == 'shutdown':
+            self._stopping = True
+            return {'status': 'ok'}
+        return {'status': 'error', 'error': f"unknown op {op!r}"}
+
+    def _serve_connection(self, conn):
+        with conn:
+            while True:
+                try:
+                    request = conn.recv()
+                except (EOFError, OSError):
+                    return
+                try:
+                    reply = self._handle(request)
+                except Exception as e:
+                    reply = {'status': 'error', 'error': str(e)}
+                conn.send(reply)
+                if self._stopping:
+                    # Wake the accept loop so it can exit
+                    try:
+                        Client(str(self.address), family='AF_UNIX').close()
+                    except OSError:
+                        pass
+                    return
+
+    def serve_forever(self):
+        """Accept connections until a client sends shutdown"""
+        if self.address.exists():
+            if server_running(self.address):
+                raise RuntimeError(f"A model server is already running on {self.address}")
+            self.address.unlink()  # stale socket of a crashed server
+
+        old_umask = os.umask(0o177)
+        try:
+            listener = Listener(str(self.address), family='AF_UNIX')
+        finally:
+            os.umask(old_umask)
+
+        print(f"📡 Model server listening on {self.address} (pid {os.getpid()})")
+        with listener:
+            while not self._stopping:
+                try:
+                    conn = listener.accept()
+                except OSError:
+                    continue
+                threading.Thread(target=self._serve_connection, args=(conn,), daemon=True).start()
+        print("🛑 Model server stopped")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description=__doc__.strip().split('\n')[0])
+    parser.add_argument('--systems', nargs='+', default=SERVED_SYSTEMS,
+                        help="OCR systems to keep warm (default: Docling Marker)")
+    parser.add_argument('--socket', default=os.environ.get('OCR_MODEL_SERVER', str(DEFAULT_SOCKET_PATH)))
+    parser.add_argument('--stop', action='store_true', help="Shut down the server on --socket")
+    args = parser.parse_args()
+
+    if args.stop:
+        ModelClient(args.socket).shutdown()
+        print(f"🛑 Sent shutdown to {args.socket}")
+    else:
+        server = ModelServer(args.systems, args.socket)
+        server.load()
+        server.serve_forever()
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Normalized Text for Accuracy Metrics
+
+Every metric compares the same few derived forms of an extraction: the
+whitespace-collapsed string (character accuracy), its lower-cased words
+(word accuracy and word counts), its lines and its ``=== Page N ===``
+pages. ``NormalizedText`` computes them once per extraction, so a baseline
+compared against many systems is collapsed, split and scanned for page
+markers once instead of once per comparison.
+
+Words are stored as token IDs in an ``array('l')``, interned in a
+vocabulary dict shared by every text that will be compared (IDs from
+different vocabularies are not comparable). Line and page offsets are
+``array('q')`` character offsets into the original text; word offsets
+(computed on first use) index the collapsed string instead.
+"""
+
+import re
+from array import array
+from itertools import accumulate
+
+try:
+    from scripts.edit_distance import tokenize_ids
+    from scripts.page_scoring import PAGE_MARKER
+except ImportError:  # run directly from the scripts directory
+    from edit_distance import tokenize_ids
+    from page_scoring import PAGE_MARKER
+
+_NEWLINE = re.compile('\n')
+
+
+class NormalizedText:
+    """Derived forms of one extraction, computed once and shared by all metrics"""
+
+    __slots__ = ('text', 'collapsed', 'token_ids', 'vocabulary', '_word_offsets', 'line_offsets',
+                 'page_numbers', 'marker_starts', 'page_starts', 'sketches')
+
+    def __init__(self, text, vocabulary=None):
+        self.text = text
+        self.vocabulary = vocabulary if vocabulary is not None else {}
+        # str.split() and re's \s agree on what whitespace is
+        self.collapsed = ' '.join(text.split())
+        self.token_ids = tokenize_ids(self.collapsed.lower().split(), self.vocabulary)
+        self._word_offsets = None
+        self.sketches = {}  # MinHash sketches by (n, size), filled by fast_metrics
+        self.line_offsets = array('q', [0])
+        self.line_offsets.extend(match.end() for match in _NEWLINE.finditer(text))
+
+        self.page_numbers = array('l')
+        self.marker_starts = array('q')
+        self.page_starts = array('q')
+        for match in PAGE_MARKER.finditer(text):
+            self.page_numbers.append(int(match.group(1)))
+            self.marker_starts.append(match.start())
+            self.page_starts.append(match.end())
+
+    def __len__(self):
+        return len(self.text)
+
+    @property
+    def word_count(self):
+        return len(self.token_ids)
+
+    @property
+    def word_offsets(self):
+        """Start of every word in collapsed, plus one past the end (as if collapsed ended with a space)"""
+        if self._word_offsets is None:
+            self._word_offsets = array('q', [0])
+            self._word_offsets.extend(accumulate(len(word) + 1 for word in self.collapsed.split()))
+        return self._word_offsets
+
+    @property
+    def line_count(self):
+        """Lines as text.split('\\n') counts them"""
+        return len(self.line_offsets)
+
+    @property
+    def has_markers(self):
+        return bool(self.page_numbers)
+
+    def pages(self):
+        """(page_number, page_text) as page_scoring.split_pages returns them, without a regex pass"""
+        if not self.page_numbers:
+            return [(1, self.text)]
+        ends = list(self.marker_starts[1:]) + [len(self.text)]
+        pages = [(number, self.text[start:end])
+                 for number, start, end in zip(self.page_numbers, self.page_starts, ends)]
+        # Text before the first marker belongs to the first page
+        pages[0] = (pages[0][0], self.text[:self.marker_starts[0]] + pages[0][1])
+        return pages
+
+
+def normalize_pair(reference, candidate):
+    """NormalizedText for both sides of a comparison, sharing one vocabulary.
+
+    Either side may already be a NormalizedText (e.g. a baseline reused
+    across systems); plain strings are normalized into its vocabulary.
+    """
+    vocabulary = next((text.vocabulary for text in (reference, candidate)
+                       if isinstance(text, NormalizedText)), {})
+    if not isinstance(reference, NormalizedText):
+        reference = NormalizedText(reference, vocabulary)
+    if not isinstance(candidate, NormalizedText):
+        candidate = NormalizedText(candidate, vocabulary)
+    if reference.vocabulary is not candidate.vocabulary:
+        raise ValueError("Texts were interned in different vocabularies; their token IDs cannot be compared")
+    return reference, candidate
@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+"""
+OCR Backend Registry
+
+Every extraction engine is a registered OCRBackend subclass with a common
+interface: lazy model loading (``load``), whole-document extraction
+(``extract``), page streaming (``iter_pages``), batch extraction
+(``extract_batch``) and the name of the DocumentStructureParser method that
+reads its output. Backends declare capabilities so callers can choose the
+fastest safe way to run them:
+
+- ``batch``: ``extract_batch`` uses an engine batch interface instead of a loop
+- ``page_streaming``: ``iter_pages`` yields pages as they are read
+- ``thread_safe``: one loaded instance may serve several threads at once
+- ``process_safe``: independent instances may run in parallel processes
+
+Adding an engine means adding one class here; the benchmark, the structure
+parser, the extraction cache and the model server find it by name.
+"""
+
+import os
+import time
+
+try:
+    from scripts.page_scoring import split_pages
+    from scripts.page_sharding import extract_pages_sharded
+except ImportError:  # run directly from the scripts directory
+    from page_scoring import split_pages
+    from page_sharding import extract_pages_sharded
+
+BATCH = 'batch'
+PAGE_STREAMING = 'page_streaming'
+THREAD_SAFE = 'thread_safe'
+PROCESS_SAFE = 'process_safe'
+
+BACKENDS = {}
+
+
+def register_backend(cls):
+    """Class decorator adding a backend to the registry under its name"""
+    BACKENDS[cls.name] = cls
+    return cls
+
+
+def get_backend(name):
+    """Registered backend class for a system name"""
+    try:
+        return BACKENDS[name]
+    except KeyError:
+        raise ValueError(f"Unknown OCR system: {name} (registered: {', '.join(BACKENDS)})") from None
+
+
+def execution_mode(name, workers=1):
+    """Fastest safe way to run several extractions of one system.
+
+    'process' when independent instances may run in a process pool,
+    'thread' when one instance may be shared by threads, else 'sequential'.
+    """
+    capabilities = get_backend(name).capabilities
+    if workers > 1 and PROCESS_SAFE in capabilities:
+        return 'process'
+    if workers > 1 and THREAD_SAFE in capabilities:
+        return 'thread'
+    return 'sequential'
+
+
+def format_page(page_number, text):
+    """Render one page record in the PyMuPDF baseline layout"""
+    return f"\n=== Page {page_number} ===\n{text}\n"
+
+
+def pdf_page_count(pdf_path):
+    """Number of pages in a PDF"""
+    import fitz  # PyMuPDF
+
+    with fitz.open(str(pdf_path)) as doc:
+        return len(doc)
+
+
+def iter_pymupdf_pages(pdf_path):
+    """Yield (page_number, text) for each page as PyMuPDF reads it"""
+    import fitz  # PyMuPDF
+
+    doc = fitz.open(str(pdf_path))
+    try:
+        for page_num in range(len(doc)):
+            yield page_num + 1, doc.load_page(page_num).get_text()
+    finally:
+        doc.close()
+
+
+class OCRBackend:
+    """Base class of an extraction engine"""
+
+    name = None
+    package = None  # distribution whose version determines the output
+    capabilities = frozenset()
+    structure_parser = 'parse_pymupdf_structure'
+
+    def __init__(self, device_info, page_workers=1):
+        self.device_info = device_info
+        self.page_workers = page_workers
+
+    @property
+    def gpu(self):
+        return bool(self.device_info.get('cuda_available'))
+
+    def load(self):
+        """Load models; called once before the first extraction"""
+
+    def extract(self, pdf_path, on_page=None):
+        """Text of one PDF. on_page(number, start, end) receives page spans if known."""
+        raise NotImplementedError
+
+    def iter_pages(self, pdf_path):
+        """Yield (page_number, text); whole-document engines split on page markers"""
+        yield from split_pages(self.extract(pdf_path))
+
+    def extract_batch(self, pdf_paths):
+        """Yield (pdf_path, text, error) for several PDFs in order, each as it completes.
+
+        Engines without a batch interface loop over extract(); a failed
+        document yields its exception instead of stopping the batch.
+        """
+        for pdf_path in pdf_paths:
+            try:
+                yield pdf_path, self.extract(pdf_path), None
+            except Exception as e:
+                yield pdf_path, None, e
+
+
+@register_backend
+class DoclingBackend(OCRBackend):
+    """Docling; batches go through DocumentConverter.convert_all"""
+
+    name = 'Docling'
+    package = 'docling'
+    capabilities = frozenset({BATCH, PROCESS_SAFE})
+    structure_parser = 'parse_docling_structure'
+
+    def load(self):
+        from docling.document_converter import DocumentConverter
+
+        self.converter = DocumentConverter()
+        print(f"✅ {self.name} initialized {'with GPU acceleration' if self.gpu else '(CPU mode)'}")
+
+    def extract(self, pdf_path, on_page=None):
+        result = self.converter.convert(str(pdf_path))
+        return result.document.export_to_markdown()
+
+    def extract_batch(self, pdf_paths):
+        from docling.datamodel.base_models import ConversionStatus
+
+        results = self.converter.convert_all([str(p) for p in pdf_paths], raises_on_error=False)
+        for pdf_path, result in zip(pdf_paths, results):
+            if result.status in (ConversionStatus.SUCCESS, ConversionStatus.PARTIAL_SUCCESS):
+                yield pdf_path, result.document.export_to_markdown(), None
+            else:
+                errors = '; '.join(error.error_message for error in result.errors)
+                yield pdf_path, None, RuntimeError(errors or f"conversion {result.status}")
+
+
+@register_backend
+class MarkerBackend(OCRBackend):
+    name = 'Marker'
+    package = 'marker-pdf'
+    capabilities = frozenset({PROCESS_SAFE})
+    structure_parser = 'parse_marker_structure'
+
+    def load(self):
+        from marker.converters.pdf import PdfConverter
+        from marker.models import create_model_dict
+
+        if self.gpu:
+            # Force GPU usage for Marker models
+            os.environ['CUDA_VISIBLE_DEVICES'] = '0'
+        self.converter = PdfConverter(
+            artifact_dict=create_model_dict(),
+            processor_list=None,
+            renderer=None
+        )
+        print(f"✅ {self.name} initialized {'with GPU acceleration' if self.gpu else '(CPU mode)'}")
+
+    def extract(self, pdf_path, on_page=None):
+        document = self.converter(str(pdf_path))
+        # Handle different Marker API versions
+        if hasattr(document, 'render'):
+            return document.render()
+        elif hasattr(document, 'markdown'):
+            return document.markdown
+        return str(document)
+
+
+@register_backend
+class PyMuPDFBackend(OCRBackend):
+    """Plain-text baseline; pages stream as they are read"""
+
+    name = 'PyMuPDF'
+    package = 'pymupdf'
+    capabilities = frozenset({PROCESS_SAFE, PAGE_STREAMING})
+
+    def load(self):
+        print(f"✅ {self.name} initialized (CPU-based)")
+
+    def extract(self, pdf_path, on_page=None):
+        if self.page_workers > 1:
+            pages = extract_pages_sharded(pdf_path, self.page_workers)
+        else:
+            pages = self._timed_pages(pdf_path, on_page)
+        return ''.join(format_page(number, page_text) for number, page_text in pages)
+
+    def _timed_pages(self, pdf_path, on_page):
+        """iter_pages, reporting each page's (number, start, end) to on_page"""
+        page_start = time.perf_counter()
+        for number, page_text in self.iter_pages(pdf_path):
+            yield number, page_text
+            if on_page is not None:
+                page_end = time.perf_counter()
+                on_page(number, page_start, page_end)
+                page_start = page_end
+
+    def iter_pages(self, pdf_path):
+        yield from iter_pymupdf_pages(pdf_path)
+
+
+@register_backend
+class PyMuPDF4LLMBackend(OCRBackend):
+    """Markdown with TOC/font-size headings from the ocr_text pipeline (no OCR)"""
+
+    name = 'PyMuPDF4LLM'
+    package = 'pymupdf4llm'
+    capabilities = frozenset({PROCESS_SAFE})
+    structure_parser = 'parse_marker_structure'
+
+    def load(self):
+        try:
+            from scripts.ocr_text import extract_markdown_with_hierarchy
+        except ImportError:  # run directly from the scripts directory
+            from ocr_text import extract_markdown_with_hierarchy
+
+        self._to_markdown = extract_markdown_with_hierarchy
+        print(f"✅ {self.name} initialized (CPU-based)")
+
+    def extract(self, pdf_path, on_page=None):
+        return self._to_markdown(pdf_path, workers=self.page_workers)
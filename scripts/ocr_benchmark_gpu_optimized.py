@@ -2,32 +2,67 @@
 # Author: Priyankesh
 # 
 # This script compares 3 OCR systems with GPU acceleration when available
-# Usage: python ocr_benchmark_gpu_optimized.py
+# Usage: python -m scripts.ocr_benchmark_gpu_optimized [--workers N] [--no-cache] [--resume]
+#
+# Importing the module has no side effects: torch, PyMuPDF, pandas and the
+# Docling/Marker models are only loaded when first needed, and the benchmark
+# itself runs from main().
 
 #%% Cell 1: Setup and GPU Detection
 import os
 import time
-import pandas as pd
-import numpy as np
 from pathlib import Path
-import fitz  # PyMuPDF
-import textdistance
 import re
 from datetime import datetime
-import matplotlib.pyplot as plt
-import seaborn as sns
-import torch
+
+try:
+    from scripts.edit_distance import levenshtein
+    from scripts.extraction_cache import ExtractionCache
+    from scripts.fast_metrics import bag_of_words_scores, error_rate, minhash_sketch, sketch_jaccard, sparse_distances
+    from scripts.ground_truth import GroundTruthCorpus
+    from scripts.model_server import ModelClient
+    from scripts.normalized_text import NormalizedText, normalize_pair
+    from scripts.ocr_backends import BACKENDS, BATCH, PAGE_STREAMING, execution_mode, get_backend, pdf_page_count
+    from scripts.page_scoring import score_page_aligned, split_pages, strip_page_markers
+    from scripts.profiling import ChromeTrace, ExtractionProfiler
+    from scripts.results_store import DEFAULT_STORE_DIR, SUMMARY_AGGREGATIONS, append_results, make_run_metadata
+    from scripts.run_manifest import DEFAULT_MANIFEST_PATH, RunManifest
+    from scripts.text_artifacts import write_artifact
+except ImportError:  # run directly as python scripts/ocr_benchmark_gpu_optimized.py
+    from edit_distance import levenshtein
+    from extraction_cache import ExtractionCache
+    from fast_metrics import bag_of_words_scores, error_rate, minhash_sketch, sketch_jaccard, sparse_distances
+    from ground_truth import GroundTruthCorpus
+    from model_server import ModelClient
+    from normalized_text import NormalizedText, normalize_pair
+    from ocr_backends import BACKENDS, BATCH, PAGE_STREAMING, execution_mode, get_backend, pdf_page_count
+    from page_scoring import score_page_aligned, split_pages, strip_page_markers
+    from profiling import ChromeTrace, ExtractionProfiler
+    from results_store import DEFAULT_STORE_DIR, SUMMARY_AGGREGATIONS, append_results, make_run_metadata
+    from run_manifest import DEFAULT_MANIFEST_PATH, RunManifest
+    from text_artifacts import write_artifact
 
 # GPU Detection and Setup
 def setup_gpu_environment():
     """Setup GPU environment and return device configuration"""
     device_info = {
-        'cuda_available': torch.cuda.is_available(),
+        'cuda_available': False,
         'device_count': 0,
         'device_name': 'CPU',
-        'device': 'cpu'
+        'device': 'cpu',
+        'torch_version': None
     }
     
+    try:
+        import torch
+    except ImportError:
+        print("⚠️  PyTorch not installed - using CPU")
+        return device_info
+    
+    # A plain str: TorchVersion would make every worker that unpickles device_info import torch
+    device_info['torch_version'] = str(torch.__version__)
+    device_info['cuda_available'] = torch.cuda.is_available()
+    
     if torch.cuda.is_available():
         device_info.update({
             'device_count': torch.cuda.device_count(),
@@ -53,181 +88,402 @@ def setup_gpu_environment():
     
     return device_info
 
-# Initialize GPU environment
-device_info = setup_gpu_environment()
+_device_info = None
+
+def get_device_info():
+    """Detect the compute device on first use and reuse the result afterwards"""
+    global _device_info
+    if _device_info is None:
+        _device_info = setup_gpu_environment()
+    return _device_info
+
+def _cuda_memory_allocated():
+    """Allocated CUDA memory in GB (only called when CUDA is available)"""
+    import torch
+    return torch.cuda.memory_allocated(0) / 1e9
 
-print("🚀 OCR BENCHMARK FOR SCIENTIFIC LITERATURE - GPU OPTIMIZED")
-print("=" * 70)
-print("Comparing 3 OCR Systems: Docling, Marker, PyMuPDF")
-print("Dataset: Scientific papers from ./pdfs directory")
-print(f"Compute Device: {device_info['device_name']}")
-print("=" * 70)
+def _cuda_empty_cache():
+    """Release cached CUDA memory (only called when CUDA is available)"""
+    import torch
+    torch.cuda.empty_cache()
 
 #%% Cell 2: GPU-Optimized OCR System Classes
 class GPUOptimizedOCRSystem:
-    """GPU-optimized OCR system with automatic device detection"""
-    def __init__(self, name, device_info):
+    """GPU-optimized OCR system with automatic device detection
+    
+    The engine itself is the registered backend of the same name (see
+    scripts/ocr_backends.py); this class adds caching, profiling, GPU memory
+    housekeeping and the model server client around it.
+    
+    Models are loaded on the first extraction that needs them (a cache miss
+    when an ExtractionCache is attached), not at construction. page_workers > 1
+    splits PyMuPDF extraction of each document across page-range processes.
+    Every extraction is profiled (see scripts/profiling.py); the summary is
+    merged into the metadata and the spans are kept in last_trace_events.
+    With model_server set to a running server's socket (scripts/model_server.py),
+    systems the server keeps warm are extracted there instead of loading
+    models in this process; their CPU time, peak RSS, I/O and page figures
+    are the server's measurements.
+    """
+    def __init__(self, name, device_info=None, cache=None, page_workers=1, model_server=None):
         self.name = name
+        self.page_workers = page_workers
+        self.model_server = model_server
+        self.client = None
         self.processing_time = 0
-        self.device_info = device_info
-        self.device = device_info['device']
-        self.initialize()
+        self.last_trace_events = []
+        self.device_info = device_info if device_info is not None else get_device_info()
+        self.device = self.device_info['device']
+        self.backend = get_backend(name)(self.device_info, page_workers)
+        self.cache = cache
+        self.initialized = False
     
     def initialize(self):
         """Initialize the OCR system with GPU optimization"""
-        if self.name == "Docling":
-            from docling.document_converter import DocumentConverter
-            
-            # GPU-optimized Docling configuration
-            if self.device_info['cuda_available']:
-                # Configure for GPU if available
-                self.converter = DocumentConverter()
-                print(f"✅ {self.name} initialized with GPU acceleration")
-            else:
-                self.converter = DocumentConverter()
-                print(f"✅ {self.name} initialized (CPU mode)")
-        
-        elif self.name == "Marker":
-            from marker.converters.pdf import PdfConverter
-            from marker.models import create_model_dict
-            
-            # GPU-optimized Marker configuration
-            if self.device_info['cuda_available']:
-                # Force GPU usage for Marker models
-                os.environ['CUDA_VISIBLE_DEVICES'] = '0'
-                model_dict = create_model_dict()
-                self.converter = PdfConverter(
-                    artifact_dict=model_dict,
-                    processor_list=None,
-                    renderer=None
-                )
-                print(f"✅ {self.name} initialized with GPU acceleration")
-            else:
-                model_dict = create_model_dict()
-                self.converter = PdfConverter(
-                    artifact_dict=model_dict,
-                    processor_list=None,
-                    renderer=None
-                )
-                print(f"✅ {self.name} initialized (CPU mode)")
+        if self.model_server is not None and self._connect_model_server():
+            self.initialized = True
+            return
         
-        elif self.name == "PyMuPDF":
-            print(f"✅ {self.name} initialized (CPU-based)")
+        self.backend.load()
+        self.initialized = True
+    
+    def _connect_model_server(self):
+        """Use the warm model server if it serves this system"""
+        client = ModelClient(self.model_server)
+        try:
+            served = client.ping()['systems']
+        except (OSError, EOFError, RuntimeError) as e:
+            client.close()
+            print(f"⚠️  Model server {self.model_server} unavailable ({e}); loading {self.name} locally")
+            return False
+        if self.name not in served:
+            client.close()
+            return False
+        self.client = client
+        print(f"✅ {self.name} connected to warm model server ({self.model_server})")
+        return True
+    
+    def cache_config(self):
+        """Extraction settings that change the output and so belong in the cache key"""
+        return {'device': self.device}
     
     def extract_text(self, pdf_path):
         """Extract text from PDF with GPU optimization"""
-        start_time = time.time()
+        if self.cache is not None:
+            cached = self.cache.get(pdf_path, self.name, self.cache_config())
+            if cached is not None:
+                return cached
         
-        # Clear GPU cache before processing
-        if self.device_info['cuda_available']:
-            torch.cuda.empty_cache()
+        profiler = ExtractionProfiler(self.name, Path(pdf_path).stem).start()
+        start_time = time.time()
         
         try:
-            if self.name == "Docling":
-                result = self.converter.convert(str(pdf_path))
-                text = result.document.export_to_markdown()
-                
-            elif self.name == "Marker":
-                document = self.converter(str(pdf_path))
-                # Handle different Marker API versions
-                if hasattr(document, 'render'):
-                    text = document.render()
-                elif hasattr(document, 'markdown'):
-                    text = document.markdown
-                else:
-                    text = str(document)
-                    
-            elif self.name == "PyMuPDF":
-                doc = fitz.open(str(pdf_path))
-                text = ""
-                for page_num in range(len(doc)):
-                    page = doc.load_page(page_num)
-                    text += f"\n=== Page {page_num + 1} ===\n{page.get_text()}\n"
-                doc.close()
+            # Load models on first use; processing time excludes model loading
+            if not self.initialized:
+                with profiler.stage('model_load'):
+                    self.initialize()
+                start_time = time.time()
+            
+            # Clear GPU cache before processing
+            if self.device_info['cuda_available']:
+                _cuda_empty_cache()
+            
+            with profiler.stage('inference'):
+                text = self._run_engine(pdf_path, profiler)
+            if not profiler.page_latencies:
+                profiler.set_page_count(pdf_page_count(pdf_path))
             
             self.processing_time = time.time() - start_time
             
             # Log GPU memory usage if available
             if self.device_info['cuda_available']:
-                memory_used = torch.cuda.memory_allocated(0) / 1e9
+                memory_used = _cuda_memory_allocated()
                 print(f"    🔥 GPU Memory Used: {memory_used:.2f} GB")
             
-            return text, {
+            metadata = {
                 'status': 'success', 
                 'processing_time': self.processing_time,
                 'device': self.device,
-                'gpu_memory_used': torch.cuda.memory_allocated(0) / 1e9 if self.device_info['cuda_available'] else 0
+                'gpu_memory_used': _cuda_memory_allocated() if self.device_info['cuda_available'] else 0
             }
+            if self.client is not None:
+                metadata['model_server'] = str(self.model_server)
+            metadata.update(profiler.finish())
+            self.last_trace_events = profiler.events
+            
+            if self.cache is not None:
+                self.cache.put(pdf_path, self.name, text, metadata, self.cache_config())
+                metadata['cache_hit'] = False
+            
+            return text, metadata
             
         except Exception as e:
             self.processing_time = time.time() - start_time
             print(f"    ❌ {self.name} error: {str(e)}")
-            return f"Error: {str(e)}", {
-                'status': 'error', 
+            metadata = {
+                'status': 'oom' if isinstance(e, MemoryError) else 'error',
                 'processing_time': self.processing_time,
                 'device': self.device,
                 'error': str(e)
             }
+            metadata.update(profiler.finish())
+            self.last_trace_events = profiler.events
+            return f"Error: {str(e)}", metadata
         finally:
             # Clean up GPU memory
             if self.device_info['cuda_available']:
-                torch.cuda.empty_cache()
+                _cuda_empty_cache()
+    
+    def _run_engine(self, pdf_path, profiler):
+        """Run this system's converter on one PDF and return its text"""
+        if self.client is not None:
+            text, metadata = self.client.extract(self.name, pdf_path)
+            if metadata['status'] != 'success':
+                raise RuntimeError(metadata.get('error'))
+            # CPU, memory and I/O were spent in the server, not here
+            profiler.set_remote(metadata)
+            return text
+        
+        return self.backend.extract(pdf_path, on_page=profiler.page)
+    
+    def extract_batch(self, pdf_paths):
+        """Extract several PDFs together; returns [(text, metadata)] in input order
+        
+        Backends with the batch capability (Docling's convert_all) get all
+        uncached documents in one submission; others, and model server
+        clients, fall back to one extract_text call per document. Each
+        document's processing_time and inference_time is the time until its
+        result arrived after the previous one; model load time, CPU time, peak
+        RSS and I/O are measured over the whole batch and repeated on every
+        document.
+        """
+        if BATCH not in self.backend.capabilities or self.model_server is not None:
+            extracted = []
+            events = []
+            for pdf_path in pdf_paths:
+                extracted.append(self.extract_text(pdf_path))
+                if not extracted[-1][1].get('cache_hit'):
+                    events.extend(self.last_trace_events)
+            self.last_trace_events = events
+            return extracted
+        
+        results = {}
+        pending = []
+        for pdf_path in pdf_paths:
+            cached = self.cache.get(pdf_path, self.name, self.cache_config()) if self.cache is not None else None
+            if cached is not None:
+                results[pdf_path] = cached
+            else:
+                pending.append(pdf_path)
+        if not pending:
+            self.last_trace_events = []
+            return [results[pdf_path] for pdf_path in pdf_paths]
+        
+        profiler = ExtractionProfiler(self.name, f"batch of {len(pending)}").start()
+        documents = []
+        try:
+            if not self.initialized:
+                with profiler.stage('model_load'):
+                    self.initialize()
+            if self.device_info['cuda_available']:
+                _cuda_empty_cache()
+            
+            with profiler.stage('inference'):
+                doc_start = time.perf_counter()
+                for pdf_path, text, error in self.backend.extract_batch(pending):
+                    doc_end = time.perf_counter()
+                    profiler.span(Path(pdf_path).stem, doc_start, doc_end)
+                    documents.append((pdf_path, text, error, doc_end - doc_start))
+                    doc_start = doc_end
+        except Exception as e:
+            # The engine gave up (e.g. models could not be loaded): fail the rest
+            finished = {document[0] for document in documents}
+            documents += [(pdf_path, None, e, 0.0) for pdf_path in pending if pdf_path not in finished]
+        summary = profiler.finish()
+        self.last_trace_events = profiler.events
+        
+        for pdf_path, text, error, seconds in documents:
+            metadata = {
+                'status': 'success' if error is None else 'error',
+                'processing_time': seconds,
+                'device': self.device,
+                'gpu_memory_used': _cuda_memory_allocated() if self.device_info['cuda_available'] else 0,
+                'batch_size': len(pending)
+            }
+            metadata.update(summary)
+            pages = pdf_page_count(pdf_path) if error is None else None
+            metadata.update({
+                'inference_time': seconds,
+                'pages': pages,
+                'page_latency_mean': seconds / pages if pages else None,
+                'page_latency_p95': seconds / pages if pages else None
+            })
+            if error is not None:
+                print(f"    ❌ {self.name} error: {str(error)}")
+                metadata['error'] = str(error)
+                results[pdf_path] = (f"Error: {str(error)}", metadata)
+                continue
+            if self.cache is not None:
+                self.cache.put(pdf_path, self.name, text, metadata, self.cache_config())
+                metadata['cache_hit'] = False
+            results[pdf_path] = (text, metadata)
+        
+        if self.device_info['cuda_available']:
+            _cuda_empty_cache()
+        return [results[pdf_path] for pdf_path in pdf_paths]
+    
+    def iter_pages(self, pdf_path):
+        """Yield (page_number, text) records for a PDF
+        
+        Page-streaming backends (PyMuPDF) yield pages as they are read, so
+        memory stays flat however long the document is. Docling and Marker
+        only produce whole documents; their output is extracted once and
+        split on page markers if present.
+        """
+        if PAGE_STREAMING in self.backend.capabilities and self.client is None:
+            yield from self.backend.iter_pages(pdf_path)
+            return
+        
+        text, metadata = self.extract_text(pdf_path)
+        if metadata['status'] != 'success':
+            raise RuntimeError(f"{self.name} extraction failed: {metadata.get('error')}")
+        yield from split_pages(text)
 
 #%% Cell 3: Enhanced Evaluation Metrics
-def calculate_text_metrics(reference_text, candidate_text):
-    """Calculate comprehensive text comparison metrics"""
+def calculate_text_metrics(reference_text, candidate_text, page_aligned=False, min_page_accuracy=None,
+                           exact=False, strip_markers=False):
+    """Calculate comprehensive text comparison metrics
+    
+    Character/word accuracy and CER/WER are exact Levenshtein scores and are
+    only computed with exact=True or page_aligned=True (aggregated over
+    page-aligned chunks, see page_scoring.score_page_aligned; pages that
+    cannot reach min_page_accuracy skip the exact edit distance); otherwise
+    they are NaN. The sparse_* scores are the same metrics from the sparse
+    patience-diff alignment of scripts/fast_metrics.py, which scales close
+    to linearly but only bounds the distances from above. They, the
+    bag-of-words precision/recall/F1 and the MinHash character n-gram
+    Jaccard are always computed.
+    strip_markers=True (scoring against a ground-truth reference) drops the
+    candidate's ``=== Page N ===`` lines, which are not extracted text,
+    from every metric; page alignment still uses them.
+    Either text may be a NormalizedText (scripts/normalized_text.py) so a
+    baseline compared against several systems is only normalized once;
+    plain strings are normalized here.
+    """
     if not reference_text or not candidate_text:
+        scored = page_aligned or exact
         return {
-            'character_accuracy': 0.0,
-            'word_accuracy': 0.0, 
+            'character_accuracy': 0.0 if scored else float('nan'),
+            'word_accuracy': 0.0 if scored else float('nan'),
             'length_ratio': 0.0,
             'word_count_ratio': 0.0,
-            'line_count_ratio': 0.0
+            'line_count_ratio': 0.0,
+            'cer': 1.0 if scored else float('nan'),
+            'wer': 1.0 if scored else float('nan'),
+            'sparse_character_accuracy': 0.0,
+            'sparse_word_accuracy': 0.0,
+            'sparse_cer': 1.0,
+            'sparse_wer': 1.0,
+            'token_precision': 0.0,
+            'token_recall': 0.0,
+            'token_f1': 0.0,
+            'char_ngram_jaccard': 0.0
         }
     
-    # Clean texts
-    ref_clean = re.sub(r'\s+', ' ', reference_text.strip())
-    cand_clean = re.sub(r'\s+', ' ', candidate_text.strip())
+    reference, candidate = normalize_pair(reference_text, candidate_text)
+    paged_candidate = candidate
+    if strip_markers and candidate.has_markers:
+        candidate = NormalizedText(strip_page_markers(candidate.text), candidate.vocabulary)
+    max_chars = max(len(reference.collapsed), len(candidate.collapsed))
+    max_words = max(reference.word_count, candidate.word_count)
     
-    # Character-level accuracy using Levenshtein distance
-    char_distance = textdistance.levenshtein(ref_clean, cand_clean)
-    max_len = max(len(ref_clean), len(cand_clean))
-    char_accuracy = 1 - (char_distance / max_len) if max_len > 0 else 1.0
+    char_accuracy = word_acc = cer = wer = float('nan')
+    if page_aligned:
+        page_scores = score_page_aligned(reference, paged_candidate, min_page_accuracy)
+        char_accuracy = max(0.0, page_scores['character_accuracy'])
+        word_acc = max(0.0, page_scores['word_accuracy'])
+        cer = error_rate(page_scores['character_distance'], page_scores['reference_characters'])
+        wer = error_rate(page_scores['word_distance'], page_scores['reference_words'])
+    elif exact:
+        # Bit-parallel Levenshtein over the collapsed text and the interned token IDs
+        char_distance = levenshtein(reference.collapsed, candidate.collapsed)
+        word_distance = levenshtein(reference.token_ids, candidate.token_ids)
+        char_accuracy = max(0.0, 1 - char_distance / max_chars if max_chars else 1.0)
+        word_acc = max(0.0, 1 - word_distance / max_words if max_words else 1.0)
+        cer = error_rate(char_distance, len(reference.collapsed))
+        wer = error_rate(word_distance, reference.word_count)
     
-    # Word-level accuracy
-    ref_words = reference_text.lower().split()
-    cand_words = candidate_text.lower().split()
-    
-    if ref_words:
-        word_distance = textdistance.levenshtein(ref_words, cand_words)
-        word_accuracy = 1 - (word_distance / max(len(ref_words), len(cand_words)))
-    else:
-        word_accuracy = 1.0 if not cand_words else 0.0
+    sparse_char, sparse_word = sparse_distances(reference, candidate)
     
     # Additional metrics
-    length_ratio = len(candidate_text) / len(reference_text) if len(reference_text) > 0 else 0.0
-    word_count_ratio = len(cand_words) / len(ref_words) if len(ref_words) > 0 else 0.0
-    
-    ref_lines = len(reference_text.split('\n'))
-    cand_lines = len(candidate_text.split('\n'))
-    line_count_ratio = cand_lines / ref_lines if ref_lines > 0 else 0.0
+    length_ratio = len(candidate) / len(reference) if len(reference) > 0 else 0.0
+    word_count_ratio = candidate.word_count / reference.word_count if reference.word_count > 0 else 0.0
+    line_count_ratio = candidate.line_count / reference.line_count
     
     return {
-        'character_accuracy': max(0.0, char_accuracy),
-        'word_accuracy': max(0.0, word_accuracy),
+        'character_accuracy': char_accuracy,
+        'word_accuracy': word_acc,
         'length_ratio': length_ratio,
         'word_count_ratio': word_count_ratio,
-        'line_count_ratio': line_count_ratio
+        'line_count_ratio': line_count_ratio,
+        'cer': cer,
+        'wer': wer,
+        'sparse_character_accuracy': max(0.0, 1 - sparse_char / max_chars if max_chars else 1.0),
+        'sparse_word_accuracy': max(0.0, 1 - sparse_word / max_words if max_words else 1.0),
+        'sparse_cer': error_rate(sparse_char, len(reference.collapsed)),
+        'sparse_wer': error_rate(sparse_word, reference.word_count),
+        **bag_of_words_scores(reference, candidate),
+        'char_ngram_jaccard': sketch_jaccard(minhash_sketch(reference), minhash_sketch(candidate))
     }
 
+# Scientific content patterns, each counted as its own non-overlapping
+# findall; the literal triggers gate scans that cannot match
+_EQUATION_PATTERN = re.compile(r'\$.*?\$|\\\(.*?\\\)|\\\[.*?\\\]|\\begin\{equation\}.*?\\end\{equation\}', re.DOTALL)
+_CITATION_PATTERN = re.compile(r'\[[\d,\s-]+\]|\(\w+\s+et\s+al\.?,?\s+\d{4}\)|\(\w+,?\s+\d{4}\)')
+_FIGURE_PATTERN = re.compile(r'[Ff]igure\s+\d+|[Ff]ig\.?\s+\d+|Figure\s+[A-Z]')
+_TABLE_PATTERN = re.compile(r'[Tt]able\s+\d+|Table\s+[A-Z]')
+_FORMULA_RHS = re.compile(r'\s*[A-Za-z0-9\+\-\*/\(\)]+')
+SCIENTIFIC_COLUMNS = ['equations_count', 'citations_count', 'figures_count', 'tables_count',
+                      'formulas_count', 'total_scientific_elements']
+
+def _count(pattern, text, *triggers):
+    if not any(trigger in text for trigger in triggers):
+        return 0
+    return sum(1 for _ in pattern.finditer(text))
+
+def _count_formulas(text):
+    r"""Matches of [A-Za-z]+\s*=\s*[A-Za-z0-9+\-*/()]+ as re.findall counts them
+    
+    Every match contains exactly one '=', so the scan jumps between '='
+    signs and checks the letters before and the operand after each one,
+    instead of trying the regex at every letter of the text.
+    """
+    count = 0
+    match_end = 0
+    position = text.find('=')
+    while position != -1:
+        if position >= match_end:
+            left = position
+            while left > match_end and text[left - 1].isspace():
+                left -= 1
+            letters = left
+            while letters > match_end and ('a' <= text[letters - 1] <= 'z' or 'A' <= text[letters - 1] <= 'Z'):
+                letters -= 1
+            if letters < left:
+                operand = _FORMULA_RHS.match(text, position + 1)
+                if operand:
+                    count += 1
+                    match_end = operand.end()
+        position = text.find('=', position + 1)
+    return count
+
 def analyze_scientific_content(text):
     """Analyze scientific content preservation with enhanced patterns"""
-    # Enhanced patterns for scientific content
-    equations = len(re.findall(r'\$.*?\$|\\\(.*?\\\)|\\\[.*?\\\]|\\begin\{equation\}.*?\\end\{equation\}', text, re.DOTALL))
-    citations = len(re.findall(r'\[[\d,\s-]+\]|\(\w+\s+et\s+al\.?,?\s+\d{4}\)|\(\w+,?\s+\d{4}\)', text))
-    figures = len(re.findall(r'[Ff]igure\s+\d+|[Ff]ig\.?\s+\d+|Figure\s+[A-Z]', text))
-    tables = len(re.findall(r'[Tt]able\s+\d+|Table\s+[A-Z]', text))
-    formulas = len(re.findall(r'[A-Za-z]+\s*=\s*[A-Za-z0-9\+\-\*/\(\)]+', text))
+    equations = _count(_EQUATION_PATTERN, text, '$', '\\')
+    citations = _count(_CITATION_PATTERN, text, '[', '(')
+    figures = _count(_FIGURE_PATTERN, text, 'ig')
+    tables = _count(_TABLE_PATTERN, text, 'able')
+    formulas = _count_formulas(text)
     
     return {
         'equations_count': equations,
@@ -238,16 +494,186 @@ def analyze_scientific_content(text):
         'total_scientific_elements': equations + citations + figures + tables + formulas
     }
 
+def _scientific_counts_row(text):
+    counts = analyze_scientific_content(text)
+    return [counts[column] for column in SCIENTIFIC_COLUMNS]
+
+def analyze_scientific_batch(texts, workers=1, index=None):
+    """Scientific content counts of many documents as a DataFrame
+    
+    One row per text (columns SCIENTIFIC_COLUMNS, integer dtype), in input
+    order. With workers > 1 the documents are analyzed on a process pool.
+    """
+    import numpy as np
+    import pandas as pd
+    
+    texts = list(texts)
+    if workers > 1 and len(texts) > 1:
+        import multiprocessing
+        
+        with multiprocessing.Pool(min(workers, len(texts))) as pool:
+            rows = pool.map(_scientific_counts_row, texts, chunksize=max(1, len(texts) // (4 * workers)))
+    else:
+        rows = [_scientific_counts_row(text) for text in texts]
+    counts = np.array(rows, dtype=np.int64).reshape(len(rows), len(SCIENTIFIC_COLUMNS))
+    return pd.DataFrame(counts, columns=SCIENTIFIC_COLUMNS, index=index)
+
 #%% Cell 4: GPU-Optimized Benchmark Runner
-def run_gpu_optimized_benchmark():
-    """Run the complete OCR benchmark with GPU optimization"""
+SYSTEM_NAMES = ['Docling', 'Marker', 'PyMuPDF']
+
+# Per-process state for parallel extraction workers
+_worker_device_info = None
+_worker_cache = None
+_worker_model_server = None
+_worker_systems = {}
+
+def _init_extraction_worker(worker_device_info, cache=None, model_server=None):
+    """Process-pool initializer: remember the device config for lazy system loading"""
+    global _worker_device_info, _worker_cache, _worker_model_server
+    _worker_device_info = worker_device_info
+    _worker_cache = cache
+    _worker_model_server = model_server
+    _worker_systems.clear()
+
+def _extract_in_worker(task):
+    """Extract one (pdf, system) unit, loading each system once per worker"""
+    pdf_path, system_name = task
+    system = _worker_systems.get(system_name)
+    if system is None:
+        system = GPUOptimizedOCRSystem(system_name, _worker_device_info, cache=_worker_cache,
+                                       model_server=_worker_model_server)
+        _worker_systems[system_name] = system
+    text, metadata = system.extract_text(pdf_path)
+    return pdf_path, system_name, text, metadata, system.last_trace_events
+
+def save_extraction(output_dir, pdf_name, system_name, text, metadata):
+    """Write extracted text as a TextArtifact (UTF-8 blob + page index sidecar) and return its path"""
+    output_file = output_dir / f"{pdf_name}_{system_name}.txt"
+    return write_artifact(output_file, text, dict(metadata, ocr_system=system_name, pdf=pdf_name))
+
+def _run_parallel_extractions(pdf_files, system_names, output_dir, workers, device_info, cache=None, manifest=None,
+                              trace=None, model_server=None):
+    """Extract every (pdf, system) unit on a CPU process pool.
     
-    # Initialize GPU-optimized OCR systems
-    systems = {
-        'Docling': GPUOptimizedOCRSystem('Docling', device_info),
-        'Marker': GPUOptimizedOCRSystem('Marker', device_info), 
-        'PyMuPDF': GPUOptimizedOCRSystem('PyMuPDF', device_info)
+    Workers pull units from the pool's shared task queue and load each OCR
+    system the first time they need it. Results stream back as they finish
+    and are reassembled in the sequential (pdf, system) order. Units the
+    manifest already holds as complete are not resubmitted. Systems whose
+    backend is not process-safe run in this process, one unit at a time,
+    while the pool works.
+    """
+    import multiprocessing
+    
+    cpu_device_info = dict(device_info, cuda_available=False, device='cpu', device_name='CPU')
+    results = {}
+    tasks = []
+    local_tasks = []
+    for pdf_path in pdf_files:
+        for system_name in system_names:
+            done = manifest.completed(pdf_path, system_name) if manifest else None
+            if done:
+                results[(pdf_path, system_name)] = {'text': done[0], 'metadata': done[1]}
+            elif execution_mode(system_name, workers) == 'process':
+                tasks.append((pdf_path, system_name))
+            else:
+                local_tasks.append((pdf_path, system_name))
+    
+    print(f"\n⚙️  Parallel extraction: {len(tasks)} units on {workers} CPU workers"
+          + (f", {len(local_tasks)} in-process" if local_tasks else ""))
+    
+    def finish(pdf_path, system_name, text, metadata, events):
+        if cache is not None:
+            cache.record(metadata, text)
+        if trace is not None:
+            trace.extend(events)
+        output_file = save_extraction(output_dir, pdf_path.stem, system_name, text, metadata)
+        if manifest is not None:
+            manifest.record(pdf_path, system_name, output_file, text, metadata)
+        results[(pdf_path, system_name)] = {'text': text, 'metadata': metadata}
+        print(f"  ✅ {pdf_path.stem} / {system_name}: "
+              f"{metadata.get('processing_time', 0):.2f}s, {len(text):,} chars -> {output_file.name}")
+    
+    with multiprocessing.Pool(workers, initializer=_init_extraction_worker, initargs=(cpu_device_info, cache, model_server)) as pool:
+        pooled = pool.imap_unordered(_extract_in_worker, tasks)
+        if local_tasks:
+            local_systems = {}
+            for pdf_path, system_name in local_tasks:
+                if system_name not in local_systems:
+                    local_systems[system_name] = GPUOptimizedOCRSystem(
+                        system_name, cpu_device_info, cache=cache, model_server=model_server)
+                system = local_systems[system_name]
+                text, metadata = system.extract_text(pdf_path)
+                finish(pdf_path, system_name, text, metadata, system.last_trace_events)
+        for unit in pooled:
+            finish(*unit)
+    
+    all_extractions = {}
+    for pdf_path in pdf_files:
+        all_extractions[pdf_path.stem] = {
+            system_name: results[(pdf_path, system_name)] for system_name in system_names
+        }
+    return all_extractions
+
+def _run_batched_extractions(pdf_files, systems, output_dir, batch_size, manifest=None, trace=None):
+    """Extract each system's documents batch_size at a time with extract_batch"""
+    results = {}
+    for system_name, system in systems.items():
+        pending = []
+        for pdf_path in pdf_files:
+            done = manifest.completed(pdf_path, system_name) if manifest else None
+            if done:
+                results[(pdf_path, system_name)] = {'text': done[0], 'metadata': done[1]}
+            else:
+                pending.append(pdf_path)
+        
+        for start in range(0, len(pending), batch_size):
+            batch = pending[start:start + batch_size]
+            print(f"\n🔄 {system_name}: batch of {len(batch)} documents")
+            extracted = system.extract_batch(batch)
+            if trace is not None:
+                trace.extend(system.last_trace_events)
+            for pdf_path, (text, metadata) in zip(batch, extracted):
+                output_file = save_extraction(output_dir, pdf_path.stem, system_name, text, metadata)
+                if manifest is not None:
+                    manifest.record(pdf_path, system_name, output_file, text, metadata)
+                results[(pdf_path, system_name)] = {'text': text, 'metadata': metadata}
+                print(f"  ✅ {pdf_path.stem}: {metadata.get('processing_time', 0):.2f}s, "
+                      f"{len(text):,} chars -> {output_file.name}")
+    
+    return {
+        pdf_path.stem: {system_name: results[(pdf_path, system_name)] for system_name in systems}
+        for pdf_path in pdf_files
     }
+
+def run_gpu_optimized_benchmark(workers=1, cache=None, device_info=None, page_workers=1,
+                                manifest=None, resume=False, trace=None, model_server=None,
+                                system_names=SYSTEM_NAMES, batch_size=1, use_async=False, engine_limits=None,
+                                job_timeout=None, memory_limit_mb=None, address_space_limit_mb=None):
+    """Run the complete OCR benchmark with GPU optimization
+    
+    With workers > 1, extraction runs on a CPU-only process pool instead of
+    the sequential loop; the returned extractions are in the same order.
+    An ExtractionCache skips re-extracting unchanged PDFs. page_workers > 1
+    shards each PyMuPDF extraction by page range (sequential mode only, as
+    pool workers cannot start processes of their own).
+    Every finished unit is recorded in the RunManifest; with resume=True the
+    previous run directory is continued and only new, changed or failed
+    units are extracted. A ChromeTrace collects the profiler spans of every
+    extraction that ran. model_server points every system at a warm model
+    server (scripts/model_server.py) for the engines it serves.
+    system_names selects registered backends (the PyMuPDF baseline is
+    needed for the metrics). batch_size > 1 submits each system's documents
+    in batches (GPUOptimizedOCRSystem.extract_batch; sequential mode only).
+    use_async runs every unit on the asyncio orchestrator
+    (scripts/async_orchestrator.py) with per-engine worker limits
+    (engine_limits, default: workers, one for Docling/Marker). Each unit
+    then runs in a supervised worker process: one still running after
+    job_timeout seconds, or whose worker goes over memory_limit_mb of RSS
+    or address_space_limit_mb of address space, is killed and recorded
+    with status 'timeout' or 'oom', and its worker is restarted.
+    """
+    if device_info is None:
+        device_info = get_device_info()
     
     # Find PDFs
     pdf_dir = Path('./pdfs')
@@ -261,10 +687,30 @@ def run_gpu_optimized_benchmark():
     for pdf in pdf_files:
         print(f"  • {pdf.name}")
     
-    # Create output directory in results folder
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    output_dir = Path(f"./results/gpu_benchmark_{timestamp}")
-    output_dir.mkdir(parents=True, exist_ok=True)
+    output_dir = prepare_output_dir(device_info, workers, manifest, resume)
+    all_extractions = extract_documents(
+        pdf_files, system_names, output_dir, workers=workers, cache=cache, device_info=device_info,
+        page_workers=page_workers, manifest=manifest, trace=trace, model_server=model_server,
+        batch_size=batch_size, use_async=use_async, engine_limits=engine_limits, job_timeout=job_timeout,
+        memory_limit_mb=memory_limit_mb, address_space_limit_mb=address_space_limit_mb
+    )
+    if cache is not None:
+        cache.report()
+    
+    return all_extractions, output_dir
+
+def prepare_output_dir(device_info, workers=1, manifest=None, resume=False):
+    """Create the run directory (or continue the previous run) and log the system information"""
+    # Create output directory in results folder (or continue the previous run)
+    if resume and manifest is not None and manifest.run_dir and manifest.run_dir.is_dir():
+        output_dir = manifest.run_dir
+        print(f"\n⏯️  Resuming run in {output_dir}")
+    else:
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        output_dir = Path(f"./results/gpu_benchmark_{timestamp}")
+        output_dir.mkdir(parents=True, exist_ok=True)
+    if manifest is not None:
+        manifest.start_run(output_dir, resume=resume)
 
     # Also ensure main results directory exists
     Path("./results").mkdir(exist_ok=True)
@@ -280,7 +726,51 @@ def run_gpu_optimized_benchmark():
         if device_info['cuda_available']:
             f.write(f"CUDA Version: {device_info['cuda_version']}\n")
             f.write(f"GPU Memory: {device_info['memory_total']:.1f} GB\n")
-        f.write(f"PyTorch Version: {torch.__version__}\n")
+        f.write(f"PyTorch Version: {device_info.get('torch_version') or 'not installed'}\n")
+        f.write(f"Extraction Workers: {workers}\n")
+    
+    return output_dir
+
+def extract_documents(pdf_files, system_names, output_dir, workers=1, cache=None, device_info=None,
+                      page_workers=1, manifest=None, trace=None, model_server=None, batch_size=1,
+                      use_async=False, engine_limits=None, job_timeout=None, memory_limit_mb=None,
+                      address_space_limit_mb=None, systems=None):
+    """Extract every (pdf, system) unit of pdf_files into output_dir
+    
+    Runs on the asyncio orchestrator, the process pool, in batches or in the
+    sequential loop as described in run_gpu_optimized_benchmark, and
+    returns {pdf_stem: {system_name: {'text', 'metadata'}}}. For the
+    sequential and batched modes, pass the same systems dict to calls on
+    successive chunks of documents to keep their models loaded.
+    """
+    if device_info is None:
+        device_info = get_device_info()
+    
+    if use_async or job_timeout or memory_limit_mb or address_space_limit_mb:
+        try:
+            from scripts.async_orchestrator import run_async_extractions
+        except ImportError:  # run directly from the scripts directory
+            from async_orchestrator import run_async_extractions
+        
+        return run_async_extractions(pdf_files, system_names, output_dir, workers, device_info, cache,
+                                     manifest, trace, model_server, engine_limits, job_timeout,
+                                     memory_limit_mb, address_space_limit_mb)
+    
+    if workers > 1:
+        return _run_parallel_extractions(pdf_files, system_names, output_dir, workers, device_info,
+                                         cache, manifest, trace, model_server)
+    
+    # Initialize GPU-optimized OCR systems
+    if systems is None:
+        systems = {}
+    for name in system_names:
+        if name not in systems:
+            systems[name] = GPUOptimizedOCRSystem(name, device_info, cache=cache, page_workers=page_workers,
+                                                  model_server=model_server)
+    systems = {name: systems[name] for name in system_names}
+    
+    if batch_size > 1:
+        return _run_batched_extractions(pdf_files, systems, output_dir, batch_size, manifest, trace)
     
     # Run extractions with GPU monitoring
     all_extractions = {}
@@ -295,24 +785,25 @@ def run_gpu_optimized_benchmark():
         for system_name, system in systems.items():
             print(f"🔄 {system_name}...")
             
+            done = manifest.completed(pdf_path, system_name) if manifest else None
+            if done:
+                extractions[system_name] = {'text': done[0], 'metadata': done[1]}
+                print("    ⏭️  Already complete in run manifest")
+                continue
+            
             # Monitor GPU memory before processing
             if device_info['cuda_available']:
-                memory_before = torch.cuda.memory_allocated(0) / 1e9
+                memory_before = _cuda_memory_allocated()
                 print(f"    📊 GPU Memory Before: {memory_before:.2f} GB")
             
             text, metadata = system.extract_text(pdf_path)
+            if trace is not None and not metadata.get('cache_hit'):
+                trace.extend(system.last_trace_events)
             
             # Save extracted text with metadata
-            output_file = output_dir / f"{pdf_name}_{system_name}.txt"
-            with open(output_file, 'w', encoding='utf-8') as f:
-                f.write(f"OCR System: {system_name}\n")
-                f.write(f"PDF: {pdf_name}\n")
-                f.write(f"Processing Time: {metadata.get('processing_time', 0):.2f}s\n")
-                f.write(f"Device: {metadata.get('device', 'unknown')}\n")
-                f.write(f"GPU Memory Used: {metadata.get('gpu_memory_used', 0):.2f} GB\n")
-                f.write(f"Status: {metadata.get('status', 'unknown')}\n")
-                f.write("=" * 60 + "\n\n")
-                f.write(text)
+            output_file = save_extraction(output_dir, pdf_name, system_name, text, metadata)
+            if manifest is not None:
+                manifest.record(pdf_path, system_name, output_file, text, metadata)
             
             extractions[system_name] = {
                 'text': text,
@@ -325,43 +816,97 @@ def run_gpu_optimized_benchmark():
         
         all_extractions[pdf_name] = extractions
     
-    return all_extractions, output_dir
+    return all_extractions
+
+#%% Cell 5: Enhanced Metrics Calculation
+# Part of the manifest's metrics key; bump when the metric columns change meaning
+METRIC_COLUMNS_VERSION = 3
 
-# Run the GPU-optimized benchmark
-print("\n🚀 Starting GPU-Optimized OCR Benchmark...")
-extractions, output_dir = run_gpu_optimized_benchmark()
+# Scientific content counts and their result columns
+SCIENTIFIC_RESULT_COLUMNS = {
+    'Equations_Found': 'equations_count',
+    'Citations_Found': 'citations_count',
+    'Figures_Found': 'figures_count',
+    'Tables_Found': 'tables_count',
+    'Formulas_Found': 'formulas_count',
+    'Scientific_Elements_Total': 'total_scientific_elements',
+}
 
-if extractions:
-    print(f"\n✅ Benchmark completed!")
-    print(f"📁 Results saved to: {output_dir}")
-else:
-    print("❌ Benchmark failed!")
+# Profiler fields from the extraction metadata and their result columns
+PROFILE_COLUMNS = {
+    'Model_Load_Time': 'model_load_time',
+    'Inference_Time': 'inference_time',
+    'Pages': 'pages',
+    'Page_Latency_Mean': 'page_latency_mean',
+    'Page_Latency_P95': 'page_latency_p95',
+    'CPU_Time': 'cpu_time',
+    'Peak_RSS_MB': 'peak_rss_mb',
+    'IO_Read_MB': 'io_read_mb',
+    'IO_Write_MB': 'io_write_mb',
+}
 
-#%% Cell 5: Enhanced Metrics Calculation
-def calculate_enhanced_metrics(extractions):
-    """Calculate enhanced comparison metrics with GPU performance data"""
+def calculate_enhanced_metrics(extractions, page_aligned=False, min_page_accuracy=None, manifest=None,
+                               workers=1, exact=False, references=None):
+    """Calculate enhanced comparison metrics with GPU performance data
+    
+    With a RunManifest, rows whose baseline text, candidate text, timing
+    metadata and scoring options are unchanged are reused from the manifest
+    and only the affected rows are recomputed. Scientific content of all
+    recomputed rows is counted in one analyze_scientific_batch call.
+    Each baseline is normalized once (NormalizedText) and shared by all
+    systems compared against it. Character_Accuracy, Word_Accuracy, CER
+    and WER are exact and only filled with exact=True or page_aligned=True
+    (NaN otherwise); the Sparse_* columns always hold the sparse-alignment
+    scores.
+    With references ({pdf_name: reference text}, e.g. from a ground-truth
+    corpus) every system, PyMuPDF included, is scored against the
+    reference instead of the PyMuPDF baseline.
+    """
+    import pandas as pd
     
     results = []
+    options = {'page_aligned': page_aligned, 'min_page_accuracy': min_page_accuracy, 'exact': exact,
+               'columns': METRIC_COLUMNS_VERSION}
+    computed = []
+    candidate_texts = []
+    vocabulary = {}
     
     for pdf_name, pdf_extractions in extractions.items():
-        if 'PyMuPDF' not in pdf_extractions:
+        if references is not None:
+            if pdf_name not in references:
+                continue
+            baseline_text = references[pdf_name]
+            baseline_system = None
+        elif 'PyMuPDF' in pdf_extractions:
+            baseline_text = pdf_extractions['PyMuPDF']['text']
+            baseline_system = 'PyMuPDF'
+        else:
             continue
-            
-        baseline_text = pdf_extractions['PyMuPDF']['text']
-        baseline_scientific = analyze_scientific_content(baseline_text)
+        baseline = None
         
         for system_name, extraction in pdf_extractions.items():
-            if system_name == 'PyMuPDF':
+            if system_name == baseline_system:
                 continue  # Skip baseline comparison with itself
                 
             if extraction['metadata']['status'] != 'success':
                 continue
+            
+            if manifest is not None:
+                input_key = manifest.metrics_key({'text': baseline_text}, extraction, options)
+                cached_row = manifest.metrics_row(pdf_name, system_name, input_key)
+                if cached_row is not None:
+                    manifest.metrics_reused += 1
+                    results.append(cached_row)
+                    continue
                 
             # Text comparison metrics
-            text_metrics = calculate_text_metrics(baseline_text, extraction['text'])
-            
-            # Scientific content analysis
-            scientific_metrics = analyze_scientific_content(extraction['text'])
+            if baseline is None:
+                baseline = NormalizedText(baseline_text, vocabulary)
+            text_metrics = calculate_text_metrics(
+                baseline, NormalizedText(extraction['text'], vocabulary),
+                page_aligned=page_aligned, min_page_accuracy=min_page_accuracy, exact=exact,
+                strip_markers=baseline_system is None
+            )
             
             result = {
                 'PDF': pdf_name,
@@ -370,54 +915,130 @@ def calculate_enhanced_metrics(extractions):
                 'Word_Accuracy': text_metrics['word_accuracy'],
                 'Length_Ratio': text_metrics['length_ratio'],
                 'Word_Count_Ratio': text_metrics['word_count_ratio'],
+                'CER': text_metrics['cer'],
+                'WER': text_metrics['wer'],
+                'Sparse_Char_Accuracy': text_metrics['sparse_character_accuracy'],
+                'Sparse_Word_Accuracy': text_metrics['sparse_word_accuracy'],
+                'Sparse_CER': text_metrics['sparse_cer'],
+                'Sparse_WER': text_metrics['sparse_wer'],
+                'Token_Precision': text_metrics['token_precision'],
+                'Token_Recall': text_metrics['token_recall'],
+                'Token_F1': text_metrics['token_f1'],
+                'Char_NGram_Jaccard': text_metrics['char_ngram_jaccard'],
                 'Processing_Time': extraction['metadata']['processing_time'],
                 'Text_Length': len(extraction['text']),
                 'Device': extraction['metadata'].get('device', 'unknown'),
                 'GPU_Memory_Used': extraction['metadata'].get('gpu_memory_used', 0),
-                'Equations_Found': scientific_metrics['equations_count'],
-                'Citations_Found': scientific_metrics['citations_count'],
-                'Figures_Found': scientific_metrics['figures_count'],
-                'Tables_Found': scientific_metrics['tables_count'],
-                'Formulas_Found': scientific_metrics['formulas_count'],
-                'Scientific_Elements_Total': scientific_metrics['total_scientific_elements'],
+                **dict.fromkeys(SCIENTIFIC_RESULT_COLUMNS),  # filled in by the batch below
                 'Status': extraction['metadata']['status']
             }
+            result.update({
+                column: extraction['metadata'].get(key)
+                for column, key in PROFILE_COLUMNS.items()
+            })
             
             results.append(result)
+            computed.append((input_key if manifest is not None else None, result))
+            candidate_texts.append(extraction['text'])
+    
+    # Scientific content analysis
+    scientific = analyze_scientific_batch(candidate_texts, workers)
+    for (_, result), counts in zip(computed, scientific.itertuples(index=False)):
+        for column, metric in SCIENTIFIC_RESULT_COLUMNS.items():
+            result[column] = int(getattr(counts, metric))
+    
+    if manifest is not None:
+        manifest.metrics_computed += len(computed)
+        manifest.store_metrics(computed)
     
     return pd.DataFrame(results)
 
-# Calculate enhanced metrics
-if extractions:
-    results_df = calculate_enhanced_metrics(extractions)
+def run_ground_truth_benchmark(corpus, chunk_size=64, workers=1, cache=None, device_info=None, page_workers=1,
+                               manifest=None, resume=False, trace=None, model_server=None,
+                               system_names=SYSTEM_NAMES, batch_size=1, use_async=False, engine_limits=None,
+                               job_timeout=None, memory_limit_mb=None, address_space_limit_mb=None,
+                               page_aligned=False, min_page_accuracy=None, exact=False):
+    """Score every system against a ground-truth corpus, chunk_size documents at a time
+    
+    corpus is a GroundTruthCorpus (scripts/ground_truth.py). Each chunk of
+    records is extracted (extract_documents, with the options of
+    run_gpu_optimized_benchmark), scored against its references
+    (calculate_enhanced_metrics with references) and appended to the
+    results CSV before the next chunk is read, so only one chunk of texts
+    is in memory at a time. Sequential systems keep their models loaded
+    across chunks. Returns (results_df, output_dir).
+    """
+    import pandas as pd
+    
+    if device_info is None:
+        device_info = get_device_info()
+    
+    output_dir = prepare_output_dir(device_info, workers, manifest, resume)
+    results_file = output_dir / 'gpu_benchmark_results.csv'
+    results_file.unlink(missing_ok=True)  # rows of a resumed run are rescored (or reused from the manifest)
+    systems = {}
+    columns = None
+    documents = 0
+    
+    for chunk in corpus.chunks(chunk_size):
+        print(f"\n📦 Ground-truth chunk: documents {documents + 1}-{documents + len(chunk)}")
+        extractions = extract_documents(
+            [record.pdf_path for record in chunk], system_names, output_dir, workers=workers, cache=cache,
+            device_info=device_info, page_workers=page_workers, manifest=manifest, trace=trace,
+            model_server=model_server, batch_size=batch_size, use_async=use_async, engine_limits=engine_limits,
+            job_timeout=job_timeout, memory_limit_mb=memory_limit_mb,
+            address_space_limit_mb=address_space_limit_mb, systems=systems
+        )
+        references = {record.doc_id: record.reference_text() for record in chunk}
+        chunk_df = calculate_enhanced_metrics(
+            extractions, page_aligned=page_aligned, min_page_accuracy=min_page_accuracy, manifest=manifest,
+            workers=workers, exact=exact, references=references
+        )
+        documents += len(chunk)
+        if chunk_df.empty:
+            continue
+        if columns is None:
+            columns = list(chunk_df.columns)
+        chunk_df.reindex(columns=columns).to_csv(results_file, mode='a', header=not results_file.exists(),
+                                                 index=False)
+    
+    print(f"\n📚 Ground truth: {documents} documents scored")
+    if corpus.skipped:
+        print(f"⚠️  Skipped: {', '.join(f'{reason}: {n}' for reason, n in sorted(corpus.skipped.items()))}")
+    if cache is not None:
+        cache.report()
+    
+    results_df = pd.read_csv(results_file) if results_file.exists() else pd.DataFrame()
+    return results_df, output_dir
+
+# Rows of the detailed results printed to the console (all of them are saved)
+MAX_PRINTED_ROWS = 100
+
+def save_benchmark_results(results_df, output_dir):
+    """Write detailed and summary CSVs and copy them to ./results/latest_*"""
+    import shutil
     
     # Save results
     results_file = output_dir / 'gpu_benchmark_results.csv'
     results_df.to_csv(results_file, index=False)
     
     # Create enhanced summary with GPU metrics
-    summary_df = results_df.groupby('System').agg({
-        'Character_Accuracy': ['mean', 'std'],
-        'Word_Accuracy': ['mean', 'std'], 
-        'Processing_Time': ['mean', 'std'],
-        'Text_Length': 'mean',
-        'GPU_Memory_Used': 'mean',
-        'Scientific_Elements_Total': 'mean'
-    }).round(3)
+    summary_df = results_df.groupby('System').agg(SUMMARY_AGGREGATIONS).round(3)
     
     summary_file = output_dir / 'gpu_benchmark_summary.csv'
     summary_df.to_csv(summary_file)
     
     print("\n📊 GPU-OPTIMIZED BENCHMARK RESULTS")
     print("=" * 70)
-    print(results_df.to_string(index=False))
+    print(results_df.head(MAX_PRINTED_ROWS).to_string(index=False))
+    if len(results_df) > MAX_PRINTED_ROWS:
+        print(f"... {len(results_df) - MAX_PRINTED_ROWS:,} more rows in {results_file}")
     
     print(f"\n📈 SUMMARY STATISTICS")
     print("=" * 70)
     print(summary_df)
     
     # Copy latest results to main results folder for easy access
-    import shutil
     main_results_dir = Path("./results")
     shutil.copy2(results_file, main_results_dir / "latest_benchmark_results.csv")
     shutil.copy2(summary_file, main_results_dir / "latest_benchmark_summary.csv")
@@ -427,9 +1048,166 @@ if extractions:
     print(f"  📊 Summary: {summary_file}")
     print(f"  🖥️  System info: {output_dir / 'system_info.txt'}")
     print(f"  📋 Latest results also copied to: ./results/latest_benchmark_*.csv")
+    
+    return summary_df
+
+#%% Cell 6: Command-Line Entry Point
+def main(argv=None):
+    """Run the benchmark from the command line"""
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="OCR benchmark for scientific literature")
+    parser.add_argument('--workers', type=int, default=int(os.environ.get('OCR_BENCHMARK_WORKERS', '1')),
+                        help="CPU worker processes for extraction (default: 1, sequential)")
+    parser.add_argument('--page-workers', type=int, default=1,
+                        help="Processes per document for page-sharded PyMuPDF extraction")
+    parser.add_argument('--cache-dir', default=os.environ.get('OCR_BENCHMARK_CACHE', './.extraction_cache'),
+                        help="Extraction cache directory (default: ./.extraction_cache)")
+    parser.add_argument('--no-cache', action='store_true', help="Disable the extraction cache")
+    parser.add_argument('--page-aligned', action='store_true',
+                        help="Score accuracy over page-aligned chunks")
+    parser.add_argument('--min-page-accuracy', type=float, default=None,
+                        help="Skip exact scoring of pages that cannot reach this accuracy")
+    parser.add_argument('--exact', action='store_true',
+                        help="Compute the exact Levenshtein accuracy/CER/WER columns (NaN without it)")
+    parser.add_argument('--manifest', default=str(DEFAULT_MANIFEST_PATH),
+                        help="Run manifest database (default: ./results/run_manifest.sqlite)")
+    parser.add_argument('--resume', action='store_true',
+                        help="Continue the last run: skip completed units, retry failed ones")
+    parser.add_argument('--trace', default=None, metavar='PATH',
+                        help="Write a Chrome trace JSON of all extraction stages to PATH")
+    parser.add_argument('--systems', nargs='+', choices=list(BACKENDS), default=SYSTEM_NAMES,
+                        help="OCR systems to compare (the PyMuPDF baseline is always included)")
+    parser.add_argument('--batch-size', type=int, default=1,
+                        help="Documents per engine submission (uses batch interfaces such as Docling's convert_all)")
+    parser.add_argument('--model-server', default=os.environ.get('OCR_MODEL_SERVER'), metavar='SOCKET',
+                        help="Extract Docling/Marker on a warm model server (python -m scripts.model_server)")
+    parser.add_argument('--async', dest='use_async', action='store_true',
+                        help="Run extractions on the asyncio orchestrator (per-engine worker pools, timeouts)")
+    parser.add_argument('--engine-limit', action='append', default=[], metavar='SYSTEM=N',
+                        help="Concurrent jobs for one system with --async (repeatable)")
+    parser.add_argument('--job-timeout', type=float, default=None, metavar='SECONDS',
+                        help="Kill extractions still running after SECONDS (status 'timeout'; implies --async)")
+    parser.add_argument('--memory-limit', type=float, default=None, metavar='MB',
+                        help="Kill extractions whose worker RSS exceeds MB (status 'oom'; implies --async)")
+    parser.add_argument('--address-space-limit', type=float, default=None, metavar='MB',
+                        help="RLIMIT_AS of each extraction worker; allocations past it fail as 'oom' (implies --async)")
+    parser.add_argument('--ground-truth', default=None, metavar='PATH',
+                        help="Score against references instead of PyMuPDF: a directory of PDFs with "
+                             "<stem>.txt/.md/.json references, or a .jsonl/.csv manifest")
+    parser.add_argument('--reference-dir', default=None,
+                        help="References for a --ground-truth PDF directory, if not beside the PDFs")
+    parser.add_argument('--chunk-size', type=int, default=64,
+                        help="Documents extracted and scored at a time with --ground-truth")
+    parser.add_argument('--store-dir', default=os.environ.get('OCR_BENCHMARK_STORE', str(DEFAULT_STORE_DIR)),
+                        help="Parquet results store appended after each run (empty disables it)")
+    args = parser.parse_args(argv)
+    # The PyMuPDF baseline is only needed when there is no ground truth
+    system_names = list(dict.fromkeys(args.systems + ([] if args.ground_truth else ['PyMuPDF'])))
+    engine_limits = {}
+    for limit in args.engine_limit:
+        name, _, count = limit.partition('=')
+        if name not in BACKENDS or not count.isdigit() or int(count) < 1:
+            parser.error(f"--engine-limit expects SYSTEM=N with a registered system, got {limit!r}")
+        engine_limits[name] = int(count)
+    
+    if args.chunk_size < 1:
+        parser.error("--chunk-size must be at least 1")
+    corpus = None
+    if args.ground_truth:
+        try:
+            corpus = GroundTruthCorpus(args.ground_truth, args.reference_dir)
+        except (FileNotFoundError, ValueError) as e:
+            parser.error(str(e))
+    
+    device_info = get_device_info()
+    
+    print("🚀 OCR BENCHMARK FOR SCIENTIFIC LITERATURE - GPU OPTIMIZED")
+    print("=" * 70)
+    print(f"Comparing {len(system_names)} OCR Systems: {', '.join(system_names)}")
+    if corpus is not None:
+        print(f"Dataset: ground truth from {args.ground_truth}")
+    else:
+        print("Dataset: Scientific papers from ./pdfs directory")
+    print(f"Compute Device: {device_info['device_name']}")
+    print("=" * 70)
+    
+    # Run the GPU-optimized benchmark
+    print("\n🚀 Starting GPU-Optimized OCR Benchmark...")
+    use_cache = args.cache_dir and not args.no_cache
+    manifest = RunManifest(args.manifest)
+    trace = ChromeTrace() if args.trace else None
+    run_options = dict(
+        workers=args.workers,
+        cache=ExtractionCache(args.cache_dir) if use_cache else None,
+        device_info=device_info,
+        page_workers=args.page_workers,
+        manifest=manifest,
+        resume=args.resume,
+        trace=trace,
+        model_server=args.model_server,
+        system_names=system_names,
+        batch_size=args.batch_size,
+        use_async=args.use_async,
+        engine_limits=engine_limits,
+        job_timeout=args.job_timeout,
+        memory_limit_mb=args.memory_limit,
+        address_space_limit_mb=args.address_space_limit
+    )
+    
+    if corpus is not None:
+        # Extract and score the corpus chunk by chunk against its references
+        results_df, output_dir = run_ground_truth_benchmark(
+            corpus, chunk_size=args.chunk_size, page_aligned=args.page_aligned,
+            min_page_accuracy=args.min_page_accuracy, exact=args.exact, **run_options
+        )
+        if trace is not None:
+            print(f"🧭 Trace written: {trace.write(args.trace)} (open in chrome://tracing or ui.perfetto.dev)")
+        manifest.report()
+        if results_df.empty:
+            print("❌ No successful extractions to compare against the ground truth")
+            return 1
+    else:
+        extractions, output_dir = run_gpu_optimized_benchmark(**run_options)
+        if trace is not None:
+            print(f"🧭 Trace written: {trace.write(args.trace)} (open in chrome://tracing or ui.perfetto.dev)")
+        
+        if extractions:
+            print(f"\n✅ Benchmark completed!")
+            print(f"📁 Results saved to: {output_dir}")
+        else:
+            print("❌ Benchmark failed!")
+            return 1
+        
+        # Calculate enhanced metrics
+        results_df = calculate_enhanced_metrics(
+            extractions, page_aligned=args.page_aligned, min_page_accuracy=args.min_page_accuracy,
+            manifest=manifest, workers=args.workers, exact=args.exact
+        )
+        manifest.report()
+        if results_df.empty:
+            print("❌ No successful extractions to compare against the PyMuPDF baseline")
+            return 1
+    save_benchmark_results(results_df, output_dir)
+    
+    if args.store_dir:
+        run_metadata = make_run_metadata(
+            output_dir, device_info, workers=args.workers, page_workers=args.page_workers,
+            page_aligned=args.page_aligned, min_page_accuracy=args.min_page_accuracy,
+            exact_metrics=args.exact, reference=args.ground_truth or 'PyMuPDF'
+        )
+        try:
+            rows = append_results(results_df, run_metadata, args.store_dir)
+            print(f"🗃️  Appended {rows} rows to results store: {args.store_dir}")
+        except ImportError:
+            print("⚠️  pyarrow not installed: results store not updated (pip install pyarrow)")
+    
+    print("\n" + "="*70)
+    print("🎯 GPU-OPTIMIZED BENCHMARK READY!")
+    print("Copy each cell (marked with #%% Cell X) to Google Colab")
+    print("Or run this entire script with: python -m scripts.ocr_benchmark_gpu_optimized")
+    print("="*70)
+    return 0
 
-print("\n" + "="*70)
-print("🎯 GPU-OPTIMIZED BENCHMARK READY!")
-print("Copy each cell (marked with #%% Cell X) to Google Colab")
-print("Or run this entire script with: python ocr_benchmark_gpu_optimized.py")
-print("="*70)
+if __name__ == "__main__":
+    raise SystemExit(main())
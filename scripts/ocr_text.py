@@ -2,12 +2,25 @@ import os
 import fitz  # PyMuPDF
 import ocrmypdf
 import shutil
+import tempfile
 from pathlib import Path
 import pymupdf4llm
 from collections import Counter
 import re
 import pandas as pd
 
+try:
+    from scripts.page_sharding import map_page_shards, markdown_sharded
+except ImportError:  # imported from inside the scripts directory
+    from page_sharding import map_page_shards, markdown_sharded
+
+# Per-page OCR thresholds: pages with fewer embedded glyphs than this that are
+# mostly covered by images, and whose text blocks cover little of the page,
+# are treated as scanned
+MIN_PAGE_GLYPHS = 50
+MIN_SCAN_IMAGE_RATIO = 0.3
+MAX_SCAN_TEXT_COVERAGE = 0.05
+
 def is_scanned_pdf(pdf_path):
     """
     Returns True if the PDF likely lacks embedded text, False if born-digital/text-PDF.
@@ -26,6 +39,107 @@ def is_scanned_pdf(pdf_path):
         return None
 
 
+def classify_page(page, min_glyphs: int = MIN_PAGE_GLYPHS, min_image_ratio: float = MIN_SCAN_IMAGE_RATIO,
+                  max_text_coverage: float = MAX_SCAN_TEXT_COVERAGE) -> dict:
+    """
+    Measures embedded glyphs, text-block coverage and image area on one page
+    and decides whether it needs OCR: almost no embedded text, text blocks
+    covering at most max_text_coverage of the page, and a page that is
+    largely an image. An image page whose few glyphs are spread over a real
+    text layer (e.g. a title over a full-page figure) is not OCR'd, nor is
+    a blank page. Image area is only measured on pages short of text
+    (image_ratio is None otherwise), since it cannot change the decision
+    on text-rich pages.
+    """
+    page_rect = page.rect
+    page_area = abs(page_rect) or 1.0
+
+    glyphs = 0
+    text_area = 0.0
+    for block in page.get_text("blocks"):
+        if block[6] == 0:  # text block
+            glyphs += len(block[4]) - sum(map(block[4].count, " \n\t"))
+            text_area += abs(fitz.Rect(block[:4]) & page_rect)
+
+    text_coverage = round(min(1.0, text_area / page_area), 4)
+    image_ratio = None
+    if glyphs < min_glyphs and text_coverage <= max_text_coverage:
+        image_area = sum(
+            abs(fitz.Rect(info["bbox"]) & page_rect)
+            for info in page.get_image_info()
+        )
+        image_ratio = round(min(1.0, image_area / page_area), 4)
+
+    return {
+        "page": page.number + 1,
+        "glyphs": glyphs,
+        "text_coverage": text_coverage,
+        "image_ratio": image_ratio,
+        "needs_ocr": image_ratio is not None and image_ratio >= min_image_ratio,
+    }
+
+
+def _classify_shard(pdf_path, start, stop, min_glyphs, min_image_ratio, max_text_coverage):
+    with fitz.open(pdf_path) as doc:
+        return [classify_page(doc[i], min_glyphs, min_image_ratio, max_text_coverage) for i in range(start, stop)]
+
+
+def classify_pages(pdf_path, workers: int = 1, min_glyphs: int = MIN_PAGE_GLYPHS,
+                   min_image_ratio: float = MIN_SCAN_IMAGE_RATIO,
+                   max_text_coverage: float = MAX_SCAN_TEXT_COVERAGE) -> list:
+    """
+    Classifies every page of a PDF as scanned or born-digital (see classify_page).
+    With workers > 1 the pages are inspected in parallel page ranges.
+    """
+    pages = []
+    for shard in map_page_shards(pdf_path, _classify_shard, workers,
+                                 (min_glyphs, min_image_ratio, max_text_coverage)):
+        pages.extend(shard)
+    return pages
+
+
+def run_selective_ocr(pdf_path: Path, output_path: Path, ocr_pages: list, temp_dir: Path) -> Path:
+    """
+    OCRs only the given 1-based pages and splices them back between the
+    untouched born-digital pages, keeping the original page order and TOC.
+    """
+    pdf_path = Path(pdf_path)
+    ocr_pages = sorted(ocr_pages)
+    subset_path = temp_dir / f"{pdf_path.stem}_ocr_pages.pdf"
+    subset_ocr_path = temp_dir / f"{pdf_path.stem}_ocr_pages_ocr.pdf"
+
+    with fitz.open(pdf_path) as src:
+        with fitz.open() as subset:
+            for page_number in ocr_pages:
+                subset.insert_pdf(src, from_page=page_number - 1, to_page=page_number - 1)
+            subset.save(subset_path)
+
+        run_ocr(subset_path, subset_ocr_path)
+
+        ocr_index = {page_number - 1: idx for idx, page_number in enumerate(ocr_pages)}
+        with fitz.open(subset_ocr_path) as ocred, fitz.open() as spliced:
+            # Copy contiguous runs of pages from the same source in one call
+            page_num = 0
+            while page_num < len(src):
+                from_ocr = page_num in ocr_index
+                run_end = page_num
+                while run_end + 1 < len(src) and (run_end + 1 in ocr_index) == from_ocr:
+                    run_end += 1
+                if from_ocr:
+                    spliced.insert_pdf(ocred, from_page=ocr_index[page_num], to_page=ocr_index[run_end])
+                else:
+                    spliced.insert_pdf(src, from_page=page_num, to_page=run_end)
+                page_num = run_end + 1
+
+            spliced.set_toc(src.get_toc())
+            spliced.save(output_path, garbage=3, deflate=True)
+
+        page_count = len(src)
+
+    print(f"✅ Selective OCR complete: {len(ocr_pages)}/{page_count} pages -> {output_path}", end='\r')
+    return Path(output_path)
+
+
 def normalize_heading_hierarchy(md_text):
     lines = md_text.split('\n')
     updated_lines = []
@@ -43,7 +157,12 @@ def normalize_heading_hierarchy(md_text):
         updated_lines.append(line)
     return '\n'.join(updated_lines)
 
-def extract_markdown_with_hierarchy(pdf_path: Path, md_output_path: Path=None)->str:
+def extract_markdown_with_hierarchy(pdf_path: Path, md_output_path: Path=None, workers: int=1)->str:
+    """
+    Converts a PDF to Markdown with header levels from the TOC (or font sizes).
+    With workers > 1 the pages are converted in parallel page ranges; header
+    detection still runs once over the whole document so the output matches.
+    """
     doc = fitz.open(pdf_path)
     toc = doc.get_toc()
     
@@ -53,25 +172,28 @@ def extract_markdown_with_hierarchy(pdf_path: Path, md_output_path: Path=None)->
     
     if toc:
         # Use table of contents for header detection    
-        toc_headers = pymupdf4llm.TocHeaders(doc)
-        md_text = pymupdf4llm.to_markdown(
-            doc, 
-            hdr_info=toc_headers,
-            margins=default_margins
-        )
-        print(f"📋 Used TocHeaders with {len(toc)} TOC entries and margins {default_margins}", end='\r')
+        hdr_info = pymupdf4llm.TocHeaders(doc)
     else:
         # Generate header info with custom settings when no TOC exists
-        my_headers = pymupdf4llm.IdentifyHeaders(
+        hdr_info = pymupdf4llm.IdentifyHeaders(
             doc, 
             max_levels=3,  # Limit to 3 header levels
             body_limit=11  # Font size limit for body text
         )
+    
+    if workers > 1:
+        doc.close()
+        md_text = markdown_sharded(pdf_path, hdr_info, default_margins, workers)
+    else:
         md_text = pymupdf4llm.to_markdown(
             doc, 
-            hdr_info=my_headers,
+            hdr_info=hdr_info,
             margins=default_margins
         )
+    
+    if toc:
+        print(f"📋 Used TocHeaders with {len(toc)} TOC entries and margins {default_margins}", end='\r')
+    else:
         print("🔍 Used IdentifyHeaders with custom settings and margins", end='\r')
     
     if md_output_path:
@@ -82,37 +204,53 @@ def extract_markdown_with_hierarchy(pdf_path: Path, md_output_path: Path=None)->
         
     return md_text
 
-def process_pdf_pipeline(pdf_path: Path, output_dir = Path("temp_ocr"), temp_dir = Path("temp_ocr")) -> str:
+def process_pdf_pipeline(pdf_path: Path, output_dir = Path("temp_ocr"), temp_dir = Path("temp_ocr"), workers: int = 1) -> str:
+    """Detect, OCR and convert one PDF to Markdown; output_dir=None only returns the text"""
     filename = Path(pdf_path).stem
     
-    output_dir.mkdir(parents=True, exist_ok=True)
+    if output_dir is not None:
+        output_dir.mkdir(parents=True, exist_ok=True)
     temp_dir.mkdir(exist_ok=True)
 
-    ocr_path = temp_dir / f"{filename}_ocr.pdf"
-    md_output = output_dir / f"{filename}.md"
+    # OCR intermediates go to a per-call directory so concurrent runs never collide
+    job_dir = Path(tempfile.mkdtemp(prefix=f"{filename[:40]}_", dir=temp_dir))
+    try:
+        md_output = output_dir / f"{filename}.md" if output_dir is not None else None
+        return _process_pdf(pdf_path, md_output, job_dir, workers)
+    finally:
+        shutil.rmtree(job_dir, ignore_errors=True)
+
+def _process_pdf(pdf_path: Path, md_output: Path, temp_dir: Path, workers: int) -> str:
+    ocr_path = temp_dir / f"{Path(pdf_path).stem}_ocr.pdf"
 
     print(f"🔍 Processing PDF: {pdf_path}", end='\r')
-    scanned = is_scanned_pdf(pdf_path)
+    page_info = classify_pages(pdf_path, workers=workers)
+    ocr_pages = [page["page"] for page in page_info if page["needs_ocr"]]
 
-    if scanned:
+    if ocr_pages and len(ocr_pages) == len(page_info):
         print("🧾 Detected scanned PDF", end='\r')
         run_ocr(pdf_path, ocr_path)
         used_pdf = ocr_path
+    elif ocr_pages:
+        print(f"🧩 Detected mixed PDF: {len(ocr_pages)}/{len(page_info)} scanned pages", end='\r')
+        used_pdf = run_selective_ocr(pdf_path, ocr_path, ocr_pages, temp_dir)
     else:
         print("📄 Detected born-digital PDF", end='\r')
         used_pdf = Path(pdf_path)
 
-    return extract_markdown_with_hierarchy(used_pdf, md_output)
+    return extract_markdown_with_hierarchy(used_pdf, md_output, workers=workers)
 
 def run_ocr(input_path: Path, output_path: Path):
     print("🔁 Running OCRmyPDF...", end='\r')
+    # Positional: OCRmyPDF 17 renamed the input_file keyword
     ocrmypdf.ocr(
-        input_file=input_path,
-        output_file=output_path,
+        input_path,
+        output_path,
         rotate_pages=True,
         deskew=True,
-        force_ocr=True,
-        skip_text=True
+        # Only pages classified as scanned get here: rasterize and OCR them
+        # all (OCRmyPDF rejects force_ocr together with skip_text)
+        force_ocr=True
     )
     print(f"✅ OCR complete: {output_path}", end='\r')
 
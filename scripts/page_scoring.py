@@ -0,0 +1,340 @@
+#!/usr/bin/env python3
+"""
+Page-Aligned Accuracy Scoring
+
+Scores a candidate extraction against the baseline page by page instead
+of as one document-sized string. Pages are paired through the
+``=== Page N ===`` markers the PyMuPDF path emits; candidates without
+markers (Markdown from Docling/Marker) are cut at the baseline's page
+boundaries using word n-grams that occur exactly once in both texts as
+anchors, and a reference without markers (a ground-truth transcription)
+is cut at the candidate's page boundaries the same way. Each aligned chunk is scored on its own, so a missing page only
+costs its own characters and the DP tables stay page-sized.
+"""
+
+import re
+from bisect import bisect_right
+from collections import Counter
+
+try:
+    from scripts.edit_distance import levenshtein, tokenize_ids
+except ImportError:  # run directly from the scripts directory
+    from edit_distance import levenshtein, tokenize_ids
+
+PAGE_MARKER = re.compile(r'^=== Page (\d+) ===$', re.MULTILINE)
+_ANCHOR_STRIP = re.compile(r'[^\w]+')
+
+
+def split_pages(text):
+    """Split text on page markers into a list of (page_number, page_text).
+
+    Text without markers is returned as a single page numbered 1. Anything
+    before the first marker is attached to that first page.
+    """
+    markers = list(PAGE_MARKER.finditer(text))
+    if not markers:
+        return [(1, text)]
+
+    pages = []
+    for idx, match in enumerate(markers):
+        end = markers[idx + 1].start() if idx + 1 < len(markers) else len(text)
+        page_text = text[match.end():end]
+        if idx == 0:
+            page_text = text[:match.start()] + page_text
+        pages.append((int(match.group(1)), page_text))
+    return pages
+
+
+def _pages_of(text):
+    """split_pages of a string, or the precomputed pages of a NormalizedText"""
+    return split_pages(text) if isinstance(text, str) else text.pages()
+
+
+def _anchor_key(word):
+    """Normalize a word for anchor matching (drops Markdown/punctuation)"""
+    return _ANCHOR_STRIP.sub('', word).lower()
+
+
+def _unique_ngrams(keys, n):
+    """Map each n-gram occurring exactly once in ``keys`` to its start index"""
+    seen = {}
+    duplicates = set()
+    for i in range(len(keys) - n + 1):
+        gram = tuple(keys[i:i + n])
+        if gram in seen:
+            duplicates.add(gram)
+        else:
+            seen[gram] = i
+    for gram in duplicates:
+        del seen[gram]
+    return seen
+
+
+def _longest_increasing(pairs):
+    """Longest chain of pairs increasing in both coordinates (patience sort).
+
+    ``pairs`` must already be sorted by their first element.
+    """
+    tails = []  # second coordinate of the smallest tail for each chain length
+    tail_idx = []
+    previous = [-1] * len(pairs)
+    for idx, (_, second) in enumerate(pairs):
+        pos = bisect_right(tails, second)
+        if pos > 0 and tails[pos - 1] == second:
+            continue
+        if pos > 0:
+            previous[idx] = tail_idx[pos - 1]
+        if pos == len(tails):
+            tails.append(second)
+            tail_idx.append(idx)
+        else:
+            tails[pos] = second
+            tail_idx[pos] = idx
+
+    chain = []
+    idx = tail_idx[-1] if tail_idx else -1
+    while idx != -1:
+        chain.append(pairs[idx])
+        idx = previous[idx]
+    chain.reverse()
+    return chain
+
+
+def anchor_pairs(ref_words, cand_words, anchor_size=4):
+    """Monotonic (ref_index, cand_index) word anchors shared by both texts"""
+    ref_keys = [_anchor_key(w) for w in ref_words]
+    cand_keys = [_anchor_key(w) for w in cand_words]
+    ref_grams = _unique_ngrams(ref_keys, anchor_size)
+    cand_grams = _unique_ngrams(cand_keys, anchor_size)
+
+    pairs = sorted(
+        (ref_idx, cand_grams[gram])
+        for gram, ref_idx in ref_grams.items()
+        if gram in cand_grams and any(gram)
+    )
+    return _longest_increasing(pairs)
+
+
+def _has_markers(text, pages):
+    if len(pages) > 1:
+        return True
+    if isinstance(text, str):
+        return PAGE_MARKER.search(text) is not None
+    return text.has_markers
+
+
+def _words_of(text):
+    return text.split() if isinstance(text, str) else text.collapsed.split()
+
+
+def strip_page_markers(text):
+    """text without its ``=== Page N ===`` marker lines"""
+    return PAGE_MARKER.sub('', text)
+
+
+def _project_pages(pages, other_words, anchor_size):
+    """Cut other_words at the boundaries of pages; [(page_number, page_chunk, other_chunk)]"""
+    words = []
+    page_starts = []
+    for _, text in pages:
+        page_starts.append(len(words))
+        words.extend(text.split())
+
+    anchors = anchor_pairs(words, other_words, anchor_size)
+    anchor_starts = [idx for idx, _ in anchors]
+
+    cuts = []
+    for start in page_starts:
+        pos = bisect_right(anchor_starts, start) - 1
+        if pos >= 0:
+            idx, other_idx = anchors[pos]
+            cut = other_idx + (start - idx)
+        elif words:
+            cut = round(start * len(other_words) / len(words))
+        else:
+            cut = 0
+        lower = cuts[-1] if cuts else 0
+        cuts.append(min(max(cut, lower), len(other_words)))
+    cuts[0] = 0
+
+    aligned = []
+    bounds = page_starts + [len(words)]
+    other_bounds = cuts + [len(other_words)]
+    for idx, (number, _) in enumerate(pages):
+        chunk = ' '.join(words[bounds[idx]:bounds[idx + 1]])
+        other_chunk = ' '.join(other_words[other_bounds[idx]:other_bounds[idx + 1]])
+        aligned.append((number, chunk, other_chunk))
+    return aligned
+
+
+def align_pages(reference_text, candidate_text, anchor_size=4):
+    """Pair baseline pages with candidate chunks.
+
+    Either text may be a string or a NormalizedText, whose page offsets
+    and collapsed words are reused. When both texts carry page markers the
+    pages are paired by number; when only one does (a Markdown candidate,
+    or a ground-truth reference without markers), its page boundaries are
+    projected onto the other text through shared word n-grams. Marker
+    lines are never part of a chunk. Returns a list of (page_number,
+    reference_chunk, candidate_chunk) with whitespace collapsed in both
+    chunks.
+    """
+    ref_pages = _pages_of(reference_text)
+    cand_pages = _pages_of(candidate_text)
+    ref_marked = _has_markers(reference_text, ref_pages)
+    cand_marked = _has_markers(candidate_text, cand_pages)
+
+    if ref_marked and cand_marked:
+        cand_by_number = {}
+        for number, text in cand_pages:
+            cand_by_number[number] = ' '.join(text.split())
+        aligned = []
+        for number, text in ref_pages:
+            aligned.append((number, ' '.join(text.split()), cand_by_number.pop(number, '')))
+        for number, text in sorted(cand_by_number.items()):
+            aligned.append((number, '', text))
+        return aligned
+
+    if cand_marked:
+        # Unmarked reference: cut it at the candidate's page boundaries
+        return [(number, ref_chunk, cand_chunk) for number, cand_chunk, ref_chunk
+                in _project_pages(cand_pages, _words_of(reference_text), anchor_size)]
+
+    # No markers in the candidate: project baseline page boundaries onto it
+    return _project_pages(ref_pages, _words_of(candidate_text), anchor_size)
+
+
+def distance_bounds(a, b):
+    """Cheap (lower, upper) bounds on the Levenshtein distance of two strings.
+
+    The lower bound is the larger one-sided difference of the character
+    histograms (every edit fixes at most one surplus character); the upper
+    bound is the longer length.
+    """
+    surplus_a = Counter(a)
+    surplus_a.subtract(b)
+    extra = sum(v for v in surplus_a.values() if v > 0)
+    missing = -sum(v for v in surplus_a.values() if v < 0)
+    return max(extra, missing), max(len(a), len(b))
+
+
+def _score_chunk(ref_chunk, cand_chunk, min_accuracy):
+    """Edit distance for one chunk, or None when the bounds rule it out"""
+    max_len = max(len(ref_chunk), len(cand_chunk))
+    if min_accuracy is None or max_len == 0:
+        return levenshtein(ref_chunk, cand_chunk)
+
+    allowed = int((1 - min_accuracy) * max_len)
+    lower, _ = distance_bounds(ref_chunk, cand_chunk)
+    if lower > allowed:
+        return None
+    distance = levenshtein(ref_chunk, cand_chunk, max_distance=allowed)
+    return None if distance > allowed else distance
+
+
+def score_page_aligned(reference_text, candidate_text, min_page_accuracy=None, anchor_size=4):
+    """Character/word accuracy aggregated over page-aligned chunks.
+
+    Character distances and lengths are summed across chunks before
+    normalizing, so the totals are comparable with whole-document scores.
+    With ``min_page_accuracy`` set, pages whose character accuracy cannot
+    reach it (by the histogram bound or an early-exit DP) skip the exact
+    computation and are scored as fully wrong.
+    """
+    return _score_aligned(align_pages(reference_text, candidate_text, anchor_size), min_page_accuracy)
+
+
+def score_artifact_pages(reference, candidate, page_numbers=None, min_page_accuracy=None, anchor_size=4):
+    """score_page_aligned over two TextArtifacts, optionally for some pages only.
+
+    When the candidate carries its own page markers the requested pages are
+    sliced from both memory-mapped files and nothing else is read. Without
+    markers the candidate must be aligned against the whole baseline, so
+    both documents are read and the result is filtered to the pages asked for.
+    """
+    if not candidate.has_markers:
+        aligned = align_pages(reference.text(), candidate.text(), anchor_size)
+        if page_numbers is not None:
+            aligned = [chunk for chunk in aligned if chunk[0] in set(page_numbers)]
+        return _score_aligned(aligned, min_page_accuracy)
+
+    numbers = page_numbers if page_numbers is not None else reference.page_numbers
+    aligned = [(number,
+                ' '.join(reference.page(number).split()) if number in reference else '',
+                ' '.join(candidate.page(number).split()) if number in candidate else '')
+               for number in numbers]
+    if page_numbers is None:
+        # Candidate-only pages, as align_pages appends them
+        aligned += [(number, '', ' '.join(candidate.page(number).split()))
+                    for number in sorted(set(candidate.page_numbers) - set(numbers))]
+    return _score_aligned(aligned, min_page_accuracy)
+
+
+def _score_aligned(aligned, min_page_accuracy):
+    char_distance = char_total = reference_characters = 0
+    word_distance = word_total = reference_words = 0
+    pages = []
+    vocabulary = {}
+
+    for number, ref_chunk, cand_chunk in aligned:
+        max_len = max(len(ref_chunk), len(cand_chunk))
+        ref_words = ref_chunk.lower().split()
+        cand_words = cand_chunk.lower().split()
+        max_words = max(len(ref_words), len(cand_words))
+
+        distance = _score_chunk(ref_chunk, cand_chunk, min_page_accuracy)
+        skipped = distance is None
+        if skipped:
+            distance = max_len
+            words = max_words
+        else:
+            words = levenshtein(tokenize_ids(ref_words, vocabulary),
+                                tokenize_ids(cand_words, vocabulary))
+
+        char_distance += distance
+        char_total += max_len
+        reference_characters += len(ref_chunk)
+        word_distance += words
+        word_total += max_words
+        reference_words += len(ref_words)
+        pages.append({
+            'page': number,
+            'character_accuracy': 1 - distance / max_len if max_len else 1.0,
+            'word_accuracy': 1 - words / max_words if max_words else 1.0,
+            'skipped': skipped,
+        })
+
+    return {
+        'character_accuracy': 1 - char_distance / char_total if char_total else 1.0,
+        'word_accuracy': 1 - word_distance / word_total if word_total else 1.0,
+        'character_distance': char_distance,
+        'word_distance': word_distance,
+        'reference_characters': reference_characters,
+        'reference_words': reference_words,
+        'pages_scored': sum(1 for page in pages if not page['skipped']),
+        'pages_skipped': sum(1 for page in pages if page['skipped']),
+        'pages': pages,
+    }
+
+
+if __name__ == "__main__":
+    import argparse
+
+    try:
+        from scripts.text_artifacts import TextArtifact
+    except ImportError:  # run directly from the scripts directory
+        from text_artifacts import TextArtifact
+
+    parser = argparse.ArgumentParser(description="Re-score saved extractions page by page")
+    parser.add_argument('baseline', help="baseline extraction (e.g. results/<run>/<pdf>_PyMuPDF.txt)")
+    parser.add_argument('candidate', help="candidate extraction of the same PDF")
+    parser.add_argument('--pages', type=int, nargs='+', help="only these page numbers")
+    parser.add_argument('--min-page-accuracy', type=float, default=None)
+    args = parser.parse_args()
+
+    with TextArtifact(args.baseline) as baseline, TextArtifact(args.candidate) as candidate:
+        scores = score_artifact_pages(baseline, candidate, args.pages, args.min_page_accuracy)
+    for page in scores['pages']:
+        print(f"  page {page['page']:>4}: char {page['character_accuracy']:.3f}  "
+              f"word {page['word_accuracy']:.3f}{'  (skipped)' if page['skipped'] else ''}")
+    print(f"  total: char {scores['character_accuracy']:.3f}  word {scores['word_accuracy']:.3f}")
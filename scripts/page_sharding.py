@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Page-Sharded Extraction for Large PDFs
+
+Splits one document into contiguous page ranges and processes each range
+in its own process, each with its own ``fitz`` document, then merges the
+results back in page order. Anything that depends on the whole document
+(header detection for Markdown) is computed once in the parent and handed
+to every shard so the merged output matches a single-process run.
+"""
+
+import os
+from multiprocessing import Pool
+
+
+def page_ranges(page_count, shards):
+    """Split ``page_count`` pages into at most ``shards`` contiguous (start, stop) ranges"""
+    shards = max(1, min(shards, page_count))
+    base, extra = divmod(page_count, shards)
+    ranges = []
+    start = 0
+    for idx in range(shards):
+        stop = start + base + (1 if idx < extra else 0)
+        ranges.append((start, stop))
+        start = stop
+    return ranges
+
+
+def default_workers():
+    """Worker count used when none is given: the number of usable cores"""
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+def map_page_shards(pdf_path, shard_func, workers=None, extra_args=()):
+    """Run ``shard_func(pdf_path, start, stop, *extra_args)`` over page ranges.
+
+    Returns the per-shard results in page order. With one worker or a
+    single-page document everything runs in-process.
+    """
+    import fitz  # PyMuPDF
+
+    with fitz.open(str(pdf_path)) as doc:
+        page_count = len(doc)
+
+    workers = workers or default_workers()
+    tasks = [(str(pdf_path), start, stop, *extra_args)
+             for start, stop in page_ranges(page_count, workers)]
+    if len(tasks) <= 1:
+        return [shard_func(*task) for task in tasks]
+
+    with Pool(len(tasks)) as pool:
+        return pool.starmap(shard_func, tasks)
+
+
+def _text_shard(pdf_path, start, stop):
+    """Plain text for pages [start, stop) as (page_number, text) pairs"""
+    import fitz  # PyMuPDF
+
+    with fitz.open(pdf_path) as doc:
+        return [(page_num + 1, doc.load_page(page_num).get_text())
+                for page_num in range(start, stop)]
+
+
+def _markdown_shard(pdf_path, start, stop, hdr_info, margins):
+    """Markdown for pages [start, stop) using header info from the whole document"""
+    import fitz  # PyMuPDF
+    import pymupdf4llm
+
+    with fitz.open(pdf_path) as doc:
+        return pymupdf4llm.to_markdown(
+            doc,
+            pages=list(range(start, stop)),
+            hdr_info=hdr_info,
+            margins=margins
+        )
+
+
+def extract_pages_sharded(pdf_path, workers=None):
+    """(page_number, text) for every page, extracted across page shards"""
+    pages = []
+    for shard in map_page_shards(pdf_path, _text_shard, workers):
+        pages.extend(shard)
+    return pages
+
+
+def markdown_sharded(pdf_path, hdr_info, margins, workers=None):
+    """pymupdf4llm Markdown for the whole document, converted across page shards"""
+    return ''.join(map_page_shards(pdf_path, _markdown_shard, workers, (hdr_info, margins)))
@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+"""
+Per-Extraction Profiling
+
+Instruments one (pdf, system) extraction: model loading and inference are
+timed as separate stages, pages as their own spans where the engine
+exposes them, and the process's CPU time, peak RSS and I/O bytes are
+measured around the whole extraction. The summary goes into the
+extraction metadata (and from there into the results dataframe); the
+spans can be written as a Chrome trace (chrome://tracing or Perfetto).
+
+Resource figures come from /proc on Linux and fall back to
+``resource.getrusage`` elsewhere (where peak RSS is the process lifetime
+peak rather than the extraction's own and I/O bytes are unavailable).
+They are process-wide: when profiled extractions overlap in one process
+(thread mode, the model server), none of them can be told apart, so every
+overlapping extraction reports them as None instead of its neighbours'
+usage. An extraction alone in its process (worker processes, sequential
+runs) always gets them.
+"""
+
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+def _cpu_time():
+    """User + system CPU seconds of this process and its finished children"""
+    if resource is None:
+        times = os.times()
+        return times.user + times.system
+    total = 0.0
+    for who in (resource.RUSAGE_SELF, resource.RUSAGE_CHILDREN):
+        usage = resource.getrusage(who)
+        total += usage.ru_utime + usage.ru_stime
+    return total
+
+
+def _io_bytes():
+    """(read, written) bytes of this process's read/write calls, or (None, None)"""
+    try:
+        with open('/proc/self/io') as f:
+            fields = dict(line.split(':', 1) for line in f if ':' in line)
+        return int(fields['rchar']), int(fields['wchar'])
+    except (OSError, KeyError, ValueError):
+        return None, None
+
+
+def _reset_peak_rss():
+    """Reset the kernel's RSS high-water mark so the next peak is this extraction's"""
+    try:
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')
+        return True
+    except OSError:
+        return False
+
+
+def _peak_rss_mb():
+    """Peak resident set size in MB since the last reset (or process start)"""
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    if resource is not None:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    return None
+
+
+# Figures measured by the process that runs the engine, taken from a
+# remote profile (the model server's reply metadata) when there is one
+REMOTE_FIELDS = ('pages', 'page_latency_mean', 'page_latency_p95', 'cpu_time', 'peak_rss_mb',
+                 'io_read_mb', 'io_write_mb')
+
+# Profilers started and not yet finished in this process
+_active = set()
+_active_lock = threading.Lock()
+
+
+def _percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+class ExtractionProfiler:
+    """Stage spans and resource usage for one extraction"""
+
+    def __init__(self, system_name, pdf_name):
+        self.system_name = system_name
+        self.pdf_name = pdf_name
+        self.events = []
+        self.stage_times = {}
+        self.page_latencies = []
+        self.page_count = None
+        self._pid = os.getpid()
+        self._tid = threading.get_ident() % 2 ** 31
+        self._overlapped = False
+        self._remote = None
+
+    def start(self):
+        with _active_lock:
+            if _active:
+                # Another extraction is running: neither can own the process counters
+                self._overlapped = True
+                for profiler in _active:
+                    profiler._overlapped = True
+            else:
+                _reset_peak_rss()
+            _active.add(self)
+        self._cpu_start = _cpu_time()
+        self._io_start = _io_bytes()
+        self._wall_start = time.perf_counter()
+        return self
+
+    def _add_event(self, name, start, end, **args):
+        self.events.append({
+            'name': name,
+            'cat': self.system_name,
+            'ph': 'X',
+            'ts': start * 1e6,
+            'dur': (end - start) * 1e6,
+            'pid': self._pid,
+            'tid': self._tid,
+            'args': dict(args, pdf=self.pdf_name),
+        })
+
+    @contextmanager
+    def stage(self, name):
+        """Time a named stage (e.g. model_load, inference)"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            end = time.perf_counter()
+            self.stage_times[name] = self.stage_times.get(name, 0.0) + end - start
+            self._add_event(name, start, end)
+
+    def page(self, number, start, end):
+        """Record one page span measured by the caller with time.perf_counter()"""
+        self.page_latencies.append(end - start)
+        self._add_event(f"page {number}", start, end, page=number)
+
+    def span(self, name, start, end, **args):
+        """Record any other span measured by the caller (e.g. one document of a batch)"""
+        self._add_event(name, start, end, **args)
+
+    def set_page_count(self, pages):
+        """Page count for engines that only report whole documents"""
+        self.page_count = pages
+
+    def set_remote(self, metadata):
+        """Report the profile of the process that ran the engine (e.g. the model server's reply metadata)"""
+        self._remote = {field: metadata.get(field) for field in REMOTE_FIELDS}
+
+    def finish(self):
+        """Summary fields for the extraction metadata (process counters None if it overlapped another)"""
+        wall_end = time.perf_counter()
+        self._add_event(f"{self.system_name}: {self.pdf_name}", self._wall_start, wall_end)
+
+        cpu_end = _cpu_time()
+        io_end = _io_bytes()
+        peak_rss = _peak_rss_mb()
+        with _active_lock:
+            _active.discard(self)
+            overlapped = self._overlapped
+
+        cpu_time = io_read = io_write = None
+        if not overlapped:
+            cpu_time = cpu_end - self._cpu_start
+            if None not in self._io_start and None not in io_end:
+                io_read = (io_end[0] - self._io_start[0]) / 1e6
+                io_write = (io_end[1] - self._io_start[1]) / 1e6
+        else:
+            peak_rss = None
+
+        inference = self.stage_times.get('inference', 0.0)
+        pages = len(self.page_latencies) or self.page_count
+        if self.page_latencies:
+            latency_mean = sum(self.page_latencies) / len(self.page_latencies)
+            latency_p95 = _percentile(self.page_latencies, 0.95)
+        else:
+            # Whole-document engines: only the average is known
+            latency_mean = latency_p95 = inference / pages if pages else None
+
+        summary = {
+            'model_load_time': self.stage_times.get('model_load', 0.0),
+            'inference_time': inference,
+            'pages': pages,
+            'page_latency_mean': latency_mean,
+            'page_latency_p95': latency_p95,
+            'cpu_time': cpu_time,
+            'peak_rss_mb': peak_rss,
+            'io_read_mb': io_read,
+            'io_write_mb': io_write,
+        }
+        if self._remote is not None:
+            summary.update(self._remote)
+        return summary
+
+
+class ChromeTrace:
+    """Collects profiler events from all extractions into one trace file"""
+
+    def __init__(self):
+        self.events = []
+
+    def extend(self, events):
+        self.events.extend(events or [])
+
+    def write(self, path):
+        """Write the Chrome trace-event JSON (open in chrome://tracing or ui.perfetto.dev)"""
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({'traceEvents': self.events, 'displayTimeUnit': 'ms'}, f)
+        return path
@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+"""
+Columnar Results Store
+
+Appends the per-(pdf, system) rows of every benchmark run to one Parquet
+dataset partitioned by run date and OCR system
+(``run_date=YYYY-MM-DD/System=<name>/``). Run metadata (device, versions,
+worker counts, scoring options) is stored in typed columns next to the
+metrics, so trends across runs are a single filtered scan instead of
+globbing and re-parsing every run's CSVs. Queries only open the
+partitions and columns they need.
+
+Requires pyarrow (``pip install pyarrow``).
+
+Usage: python -m scripts.results_store [--since YYYY-MM-DD] [--system Marker] [--by-date]
+"""
+
+import platform
+from datetime import datetime
+from pathlib import Path
+
+DEFAULT_STORE_DIR = Path("./results/store")
+PARTITION_COLUMNS = ['run_date', 'System']
+
+# Aggregations of the per-run summary CSV (save_benchmark_results)
+SUMMARY_AGGREGATIONS = {
+    'Character_Accuracy': ['mean', 'std'],
+    'Word_Accuracy': ['mean', 'std'],
+    'CER': 'mean',
+    'WER': 'mean',
+    'Sparse_Char_Accuracy': ['mean', 'std'],
+    'Sparse_CER': 'mean',
+    'Sparse_WER': 'mean',
+    'Token_F1': ['mean', 'std'],
+    'Char_NGram_Jaccard': 'mean',
+    'Processing_Time': ['mean', 'std'],
+    'Text_Length': 'mean',
+    'GPU_Memory_Used': 'mean',
+    'Scientific_Elements_Total': 'mean'
+}
+
+# Run columns that change what the accuracy columns mean, with the value
+# of runs stored before the column existed (all of them scored exactly,
+# against PyMuPDF); None keeps missing values as their own group
+SCORING_MODE_DEFAULTS = {'page_aligned': False, 'min_page_accuracy': None, 'exact_metrics': True,
+                         'reference': 'PyMuPDF'}
+
+
+def _run_schema():
+    import pyarrow as pa
+
+    return pa.schema([
+        ('run_id', pa.string()),
+        ('run_timestamp', pa.timestamp('s')),
+        ('host', pa.string()),
+        ('device', pa.string()),
+        ('device_name', pa.string()),
+        ('cuda_available', pa.bool_()),
+        ('cuda_version', pa.string()),
+        ('gpu_memory_total', pa.float64()),
+        ('torch_version', pa.string()),
+        ('workers', pa.int32()),
+        ('page_workers', pa.int32()),
+        ('page_aligned', pa.bool_()),
+        ('min_page_accuracy', pa.float64()),
+        ('exact_metrics', pa.bool_()),
+        ('reference', pa.string()),
+    ])
+
+
+def _partitioning():
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+
+    return ds.partitioning(pa.schema([('run_date', pa.string()), ('System', pa.string())]),
+                           flavor='hive')
+
+
+def run_timestamp_for(output_dir):
+    """Start time of a run, from its gpu_benchmark_YYYYmmdd_HHMMSS directory name"""
+    try:
+        return datetime.strptime(Path(output_dir).name[-15:], "%Y%m%d_%H%M%S")
+    except ValueError:
+        return datetime.now().replace(microsecond=0)
+
+
+def make_run_metadata(output_dir, device_info, workers=1, page_workers=1,
+                      page_aligned=False, min_page_accuracy=None, exact_metrics=False, reference='PyMuPDF'):
+    """Typed run-metadata record for append_results"""
+    return {
+        'run_id': Path(output_dir).name,
+        'run_timestamp': run_timestamp_for(output_dir),
+        'host': platform.node(),
+        'device': device_info.get('device'),
+        'device_name': device_info.get('device_name'),
+        'cuda_available': bool(device_info.get('cuda_available')),
+        'cuda_version': device_info.get('cuda_version'),
+        'gpu_memory_total': device_info.get('memory_total'),
+        'torch_version': device_info.get('torch_version'),
+        'workers': workers,
+        'page_workers': page_workers,
+        'page_aligned': page_aligned,
+        'min_page_accuracy': min_page_accuracy,
+        'exact_metrics': exact_metrics,
+        'reference': str(reference),
+    }
+
+
+def append_results(results_df, run_metadata, store_dir=DEFAULT_STORE_DIR):
+    """Append one run's metric rows to the partitioned dataset.
+
+    Files are named after the run, so appending the same run again (e.g.
+    after --resume) replaces its earlier rows instead of duplicating them.
+    Returns the number of rows written.
+    """
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+
+    if results_df.empty:
+        return 0
+
+    table = pa.Table.from_pandas(results_df.reset_index(drop=True), preserve_index=False)
+    run_schema = _run_schema()
+    for field in run_schema:
+        value = run_metadata.get(field.name)
+        table = table.append_column(field, pa.array([value] * table.num_rows, type=field.type))
+    run_date = run_metadata['run_timestamp'].strftime('%Y-%m-%d')
+    table = table.append_column('run_date', pa.array([run_date] * table.num_rows, type=pa.string()))
+
+    ds.write_dataset(
+        table,
+        Path(store_dir),
+        format='parquet',
+        partitioning=_partitioning(),
+        basename_template=f"{run_metadata['run_id']}-{{i}}.parquet",
+        existing_data_behavior='overwrite_or_ignore',
+    )
+    return table.num_rows
+
+
+def open_dataset(store_dir=DEFAULT_STORE_DIR):
+    """The results dataset with one schema unified over all runs.
+
+    Runs written by different versions of the benchmark may carry different
+    metric columns; only the Parquet footers are read to merge them.
+    """
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+
+    dataset = ds.dataset(Path(store_dir), format='parquet', partitioning=_partitioning())
+    schemas = [fragment.physical_schema for fragment in dataset.get_fragments()]
+    if len({schema.to_string() for schema in schemas}) > 1:
+        schema = pa.unify_schemas(schemas + [dataset.partitioning.schema])
+        dataset = ds.dataset(Path(store_dir), format='parquet',
+                             partitioning=_partitioning(), schema=schema)
+    return dataset
+
+
+def _partition_filter(systems=None, since=None, until=None):
+    import pyarrow.dataset as ds
+
+    expression = None
+    conditions = []
+    if systems:
+        conditions.append(ds.field('System').isin(list(systems)))
+    if since:
+        conditions.append(ds.field('run_date') >= str(since))
+    if until:
+        conditions.append(ds.field('run_date') <= str(until))
+    for condition in conditions:
+        expression = condition if expression is None else expression & condition
+    return expression
+
+
+def load_history(columns=None, systems=None, since=None, until=None, store_dir=DEFAULT_STORE_DIR):
+    """Rows of the store as a DataFrame, reading only the given columns and partitions"""
+    dataset = open_dataset(store_dir)
+    if columns is not None:
+        columns = [c for c in dict.fromkeys(columns) if c in dataset.schema.names]
+    table = dataset.to_table(columns=columns, filter=_partition_filter(systems, since, until))
+    return table.to_pandas()
+
+
+def summarize(systems=None, since=None, until=None, by_date=False, store_dir=DEFAULT_STORE_DIR):
+    """The benchmark summary (save_benchmark_results' groupby) over stored runs.
+
+    Only the aggregated columns and the partitions matching the system and
+    date filters are read. Rows are grouped by their scoring mode and
+    reference as well as their system, so runs scored exactly, with the
+    sparse alignment or page by page, against PyMuPDF or against a
+    ground-truth corpus, are never averaged together. With by_date the summary is
+    also split per run date for trend comparisons.
+    """
+    group_by = (['run_date', 'System'] if by_date else ['System']) + list(SCORING_MODE_DEFAULTS)
+    history = load_history(group_by + list(SUMMARY_AGGREGATIONS), systems, since, until, store_dir)
+    if history.empty:
+        return history
+    for column, default in SCORING_MODE_DEFAULTS.items():
+        if column not in history:
+            history[column] = default
+        elif default is not None:
+            history[column] = history[column].fillna(default)
+    aggregations = {column: agg for column, agg in SUMMARY_AGGREGATIONS.items() if column in history}
+    return history.groupby(group_by, dropna=False).agg(aggregations).round(3)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description=__doc__.strip().split('\n')[0])
+    parser.add_argument('--store-dir', default=str(DEFAULT_STORE_DIR))
+    parser.add_argument('--system', action='append', dest='systems')
+    parser.add_argument('--since', help="first run date (YYYY-MM-DD)")
+    parser.add_argument('--until', help="last run date (YYYY-MM-DD)")
+    parser.add_argument('--by-date', action='store_true', help="one summary row per run date and system")
+    args = parser.parse_args()
+
+    summary = summarize(args.systems, args.since, args.until, args.by_date, args.store_dir)
+    if summary.empty:
+        print(f"❌ No stored results match in {args.store_dir}")
+    else:
+        print(summary.to_string())
@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""
+Run Manifest for Incremental Benchmark Runs
+
+Records every (pdf, system) extraction unit of a benchmark run in a SQLite
+database: PDF hash, engine version, status, output path and the hash of
+the extracted text. A resumed run skips units that completed against the
+same PDF bytes and engine version and retries failed ones, so a crashed
+run or a single new PDF only costs the missing work. Metric rows are
+stored under a key built from the inputs they were computed from and are
+recomputed only when one of those inputs changes.
+"""
+
+import hashlib
+import json
+import sqlite3
+import time
+from pathlib import Path
+
+try:
+    from scripts.extraction_cache import engine_version, file_sha256
+    from scripts.text_artifacts import read_text
+except ImportError:  # run directly from the scripts directory
+    from extraction_cache import engine_version, file_sha256
+    from text_artifacts import read_text
+
+DEFAULT_MANIFEST_PATH = Path("./results/run_manifest.sqlite")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+CREATE TABLE IF NOT EXISTS units (
+    pdf TEXT NOT NULL,
+    system TEXT NOT NULL,
+    pdf_sha256 TEXT NOT NULL,
+    engine_version TEXT NOT NULL,
+    status TEXT NOT NULL,
+    output_path TEXT,
+    text_sha256 TEXT,
+    metadata TEXT,
+    updated REAL NOT NULL,
+    PRIMARY KEY (pdf, system)
+);
+CREATE TABLE IF NOT EXISTS metrics (
+    pdf TEXT NOT NULL,
+    system TEXT NOT NULL,
+    input_key TEXT NOT NULL,
+    row TEXT NOT NULL,
+    PRIMARY KEY (pdf, system)
+);
+"""
+
+
+def text_sha256(text):
+    """SHA-256 hex digest of a text's UTF-8 bytes"""
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+def load_extraction_text(output_file):
+    """Text of a file written by ``save_extraction`` (artifact or legacy header format)"""
+    return read_text(output_file)
+
+
+class RunManifest:
+    """SQLite record of completed extraction units and computed metric rows"""
+
+    def __init__(self, path=DEFAULT_MANIFEST_PATH):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # Writes may come from another thread (the async orchestrator's I/O
+        # thread), one at a time
+        self.conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self.conn.executescript(_SCHEMA)
+        self._pdf_hashes = {}
+        self._engine_versions = {}
+        self.skipped = 0
+        self.metrics_reused = 0
+        self.metrics_computed = 0
+
+    def close(self):
+        self.conn.close()
+
+    # Run directory ------------------------------------------------------
+
+    @property
+    def run_dir(self):
+        row = self.conn.execute("SELECT value FROM meta WHERE key = 'run_dir'").fetchone()
+        return Path(row[0]) if row else None
+
+    def start_run(self, run_dir, resume=False):
+        """Begin a run in ``run_dir``; without ``resume`` all units are forgotten"""
+        with self.conn:
+            if not resume:
+                self.conn.execute("DELETE FROM units")
+            self.conn.execute("INSERT OR REPLACE INTO meta VALUES ('run_dir', ?)", (str(run_dir),))
+
+    # Extraction units ---------------------------------------------------
+
+    def pdf_hash(self, pdf_path):
+        pdf_path = Path(pdf_path)
+        stat = pdf_path.stat()
+        memo_key = (str(pdf_path.resolve()), stat.st_size, stat.st_mtime_ns)
+        if memo_key not in self._pdf_hashes:
+            self._pdf_hashes[memo_key] = file_sha256(pdf_path)
+        return self._pdf_hashes[memo_key]
+
+    def _engine_version(self, system_name):
+        if system_name not in self._engine_versions:
+            self._engine_versions[system_name] = engine_version(system_name)
+        return self._engine_versions[system_name]
+
+    def completed(self, pdf_path, system_name):
+        """Stored (text, metadata) for a unit that can be skipped, else None.
+
+        A unit is complete when it succeeded on the same PDF bytes and engine
+        version and its output file still holds the recorded text.
+        """
+        row = self.conn.execute(
+            "SELECT pdf_sha256, engine_version, status, output_path, text_sha256, metadata "
+            "FROM units WHERE pdf = ? AND system = ?",
+            (Path(pdf_path).stem, system_name)
+        ).fetchone()
+        if row is None:
+            return None
+
+        pdf_hash, version, status, output_path, text_hash, metadata = row
+        if (status != 'success' or pdf_hash != self.pdf_hash(pdf_path)
+                or version != self._engine_version(system_name)):
+            return None
+        try:
+            text = load_extraction_text(output_path)
+        except OSError:
+            return None
+        if text_sha256(text) != text_hash:
+            return None
+
+        self.skipped += 1
+        return text, dict(json.loads(metadata), resumed=True)
+
+    def record(self, pdf_path, system_name, output_path, text, metadata):
+        """Record a finished unit (committed immediately so a crash keeps it)"""
+        status = metadata.get('status')
+        if status not in ('success', 'timeout', 'oom'):
+            status = 'failed'
+        stored = {k: v for k, v in metadata.items() if k not in ('cache_hit', 'resumed')}
+        with self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO units VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (Path(pdf_path).stem, system_name, self.pdf_hash(pdf_path),
+                 self._engine_version(system_name), status, str(output_path),
+                 text_sha256(text), json.dumps(stored, default=str), time.time())
+            )
+
+    def status_counts(self):
+        return dict(self.conn.execute("SELECT status, COUNT(*) FROM units GROUP BY status"))
+
+    # Metric rows --------------------------------------------------------
+
+    @staticmethod
+    def metrics_key(baseline, candidate, options):
+        """Key of everything a metric row depends on"""
+        metadata = candidate['metadata']
+        key_data = json.dumps({
+            'baseline': text_sha256(baseline['text']),
+            'candidate': text_sha256(candidate['text']),
+            'metadata': {k: metadata.get(k) for k in
+                         ('status', 'processing_time', 'device', 'gpu_memory_used')},
+            'options': options,
+        }, sort_keys=True, default=str)
+        return hashlib.sha256(key_data.encode('utf-8')).hexdigest()
+
+    def metrics_row(self, pdf_name, system_name, input_key):
+        row = self.conn.execute(
+            "SELECT row FROM metrics WHERE pdf = ? AND system = ? AND input_key = ?",
+            (pdf_name, system_name, input_key)
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def store_metrics(self, rows_with_keys):
+        with self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO metrics VALUES (?, ?, ?, ?)",
+                [(row['PDF'], row['System'], key, json.dumps(row))
+                 for key, row in rows_with_keys]
+            )
+
+    def report(self):
+        counts = self.status_counts()
+        print(f"\n🗂️  RUN MANIFEST ({self.path})")
+        print(f"   Units: {sum(counts.values())} "
+              f"({', '.join(f'{status}: {n}' for status, n in sorted(counts.items())) or 'none'})")
+        print(f"   Skipped as complete: {self.skipped}")
+        print(f"   Metric rows reused: {self.metrics_reused}  recomputed: {self.metrics_computed}")
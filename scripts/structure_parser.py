@@ -8,10 +8,60 @@ to evaluate how well they preserve document structure and layout.
 
 import json
 import re
+from multiprocessing import Pool
 from pathlib import Path
 from datetime import datetime
 import pandas as pd
 
+try:
+    from scripts.ocr_backends import BACKENDS, get_backend
+    from scripts.page_sharding import default_workers
+    from scripts.text_artifacts import TextArtifact, is_artifact, read_text
+except ImportError:  # run as python scripts/structure_parser.py
+    from ocr_backends import BACKENDS, get_backend
+    from page_sharding import default_workers
+    from text_artifacts import TextArtifact, is_artifact, read_text
+
+# Precompiled Marker line rules. Each content rule also has literal
+# triggers: a line containing none of them cannot match, so the regex only
+# runs on candidate lines (most paragraph lines skip every search).
+_AUTHORS_PATTERN = re.compile(r'[A-Z][a-z]+ [A-Z][a-z]+')
+_EQUATION_PATTERN = re.compile(r'\$.*\$|\\[a-zA-Z]+|=.*[+\-*/]')
+_FIGURE_PATTERN = re.compile(r'[Ff]igure\s+\d+|[Ff]ig\.?\s+\d+')
+_REFERENCE_PATTERN = re.compile(r'^\[\d+\]|\(\d{4}\)|et\s+al\.')
+_TABLE_CELL_SPLIT = re.compile(r'(?<!\\)\|')
+_TABLE_SEPARATOR = re.compile(r'^\|?\s*:?-+:?\s*(?:\|\s*:?-+:?\s*)*\|?$')
+
+
+def classify_marker_line(line, title_open=True, authors_open=True):
+    """Element type of a stripped, non-empty Marker line, or None to skip it.
+    
+    Rules are applied in priority order (title, section, subsection,
+    authors, equation, table, figure, reference, paragraph); title and
+    authors only while they have not been found yet.
+    """
+    if line[0] == '#':
+        if line.startswith('# '):
+            if title_open:
+                return 'title'
+        elif line.startswith('## '):
+            return 'section'
+        elif line.startswith('### '):
+            return 'subsection'
+    if authors_open and _AUTHORS_PATTERN.search(line) and len(line.split()) < 20:
+        return 'authors'
+    if ('$' in line or '\\' in line or '=' in line) and _EQUATION_PATTERN.search(line):
+        return 'equation'
+    if line.count('|') >= 2:
+        return 'table'
+    if 'ig' in line and _FIGURE_PATTERN.search(line):
+        return 'figure'
+    if ('al' in line or '(' in line or line[0] == '[') and _REFERENCE_PATTERN.search(line):
+        return 'reference'
+    if len(line) > 50:
+        return 'paragraph'
+    return None
+
 class DocumentStructureParser:
     """Parse document structure from OCR outputs"""
     
@@ -21,7 +71,11 @@ class DocumentStructureParser:
         self.examples_dir.mkdir(parents=True, exist_ok=True)
     
     def parse_marker_structure(self, text):
-        """Parse Marker OCR output (Markdown format)"""
+        """Parse Marker OCR output (Markdown format)
+        
+        Each line is classified once by classify_marker_line, which only
+        runs a rule's precompiled regex when the line contains its triggers.
+        """
         structure = {
             "ocr_system": "Marker",
             "format": "markdown",
@@ -48,20 +102,28 @@ class DocumentStructureParser:
         lines = text.split('\n')
         current_section = None
         in_abstract = False
+        elements = structure["document_elements"]
+        table_end = 0
         
         for i, line in enumerate(lines):
+            if i < table_end:
+                continue  # row of a table that has already been collected
             line = line.strip()
             if not line:
                 continue
             
+            kind = classify_marker_line(line, not elements["title"], not elements["authors"])
+            if kind is None:
+                continue
+            
             # Title detection (usually first large heading)
-            if line.startswith('# ') and not structure["document_elements"]["title"]:
+            if kind == 'title':
                 title = line[2:].strip()
                 structure["document_elements"]["title"] = title
                 structure["reading_order"].append({"type": "title", "content": title, "line": i})
             
             # Section headers
-            elif line.startswith('## '):
+            elif kind == 'section':
                 section_title = line[3:].strip()
                 current_section = {
                     "title": section_title,
@@ -77,7 +139,7 @@ class DocumentStructureParser:
                     in_abstract = True
             
             # Subsection headers
-            elif line.startswith('### '):
+            elif kind == 'subsection':
                 subsection_title = line[4:].strip()
                 if current_section:
                     current_section["subsections"].append({
@@ -87,38 +149,38 @@ class DocumentStructureParser:
                 structure["reading_order"].append({"type": "subsection_header", "content": subsection_title, "line": i})
             
             # Authors (often after title, before abstract)
-            elif not structure["document_elements"]["authors"] and self._looks_like_authors(line):
+            elif kind == 'authors':
                 authors = self._extract_authors(line)
                 structure["document_elements"]["authors"] = authors
                 structure["reading_order"].append({"type": "authors", "content": authors, "line": i})
             
             # Equations (LaTeX or mathematical expressions)
-            elif self._is_equation(line):
+            elif kind == 'equation':
                 equation = self._clean_equation(line)
                 structure["document_elements"]["equations"].append(equation)
                 structure["reading_order"].append({"type": "equation", "content": equation, "line": i})
             
             # Tables
-            elif self._is_table_row(line):
-                table_content = self._extract_table_context(lines, i)
-                if table_content:
-                    structure["document_elements"]["tables"].append(table_content)
-                    structure["reading_order"].append({"type": "table", "content": table_content, "line": i})
+            elif kind == 'table':
+                table, table_end = self._extract_table(lines, i)
+                if table:
+                    structure["document_elements"]["tables"].append(table)
+                    structure["reading_order"].append({"type": "table", "content": table, "line": i})
             
             # Figures and captions
-            elif self._is_figure_reference(line):
+            elif kind == 'figure':
                 figure_ref = self._extract_figure_info(line)
                 structure["document_elements"]["figures"].append(figure_ref)
                 structure["reading_order"].append({"type": "figure", "content": figure_ref, "line": i})
             
             # References
-            elif self._is_reference(line):
+            elif kind == 'reference':
                 ref = self._clean_reference(line)
                 structure["document_elements"]["references"].append(ref)
                 structure["reading_order"].append({"type": "reference", "content": ref, "line": i})
             
             # Regular paragraphs
-            elif len(line) > 50:  # Likely paragraph content
+            else:  # Likely paragraph content (longer than 50 characters)
                 if in_abstract and not structure["document_elements"]["abstract"]:
                     structure["document_elements"]["abstract"] = line
                     structure["reading_order"].append({"type": "abstract", "content": line, "line": i})
@@ -188,6 +250,15 @@ class DocumentStructureParser:
     
     def parse_pymupdf_structure(self, text):
         """Parse PyMuPDF output (plain text)"""
+        return self.parse_pymupdf_stream([text])
+    
+    def parse_pymupdf_stream(self, chunks):
+        """Parse PyMuPDF output consumed incrementally from text chunks
+        
+        Accepts any iterable of strings, e.g. page records streamed from
+        GPUOptimizedOCRSystem.iter_pages, so the whole document never has to
+        be held in memory. Line numbers match those of the joined text.
+        """
         structure = {
             "ocr_system": "PyMuPDF",
             "format": "plain_text",
@@ -212,9 +283,7 @@ class DocumentStructureParser:
         }
         
         # PyMuPDF provides less structure, so we need to infer it
-        lines = text.split('\n')
-        
-        for i, line in enumerate(lines):
+        for i, line in self._iter_stream_lines(chunks):
             line = line.strip()
             if not line:
                 continue
@@ -228,127 +297,167 @@ class DocumentStructureParser:
         
         return structure
     
-    def _looks_like_authors(self, line):
-        """Check if line looks like author names"""
-        # Simple heuristic: contains names with potential affiliations
-        return bool(re.search(r'[A-Z][a-z]+ [A-Z][a-z]+', line)) and len(line.split()) < 20
+    def _iter_stream_lines(self, chunks):
+        """Yield (line_number, line) across chunks as if they were one string"""
+        carry = ''
+        i = 0
+        for chunk in chunks:
+            lines = (carry + chunk).split('\n')
+            carry = lines.pop()
+            for line in lines:
+                yield i, line
+                i += 1
+        yield i, carry
     
     def _extract_authors(self, line):
         """Extract author names from line"""
         # Simple extraction - can be enhanced
         return [name.strip() for name in line.split(',') if name.strip()]
     
-    def _is_equation(self, line):
-        """Check if line contains mathematical equation"""
-        return bool(re.search(r'\$.*\$|\\[a-zA-Z]+|=.*[+\-*/]', line))
-    
     def _clean_equation(self, line):
         """Clean and extract equation"""
         return line.strip()
     
-    def _is_table_row(self, line):
-        """Check if line is part of a table"""
-        return '|' in line and line.count('|') >= 2
-    
-    def _extract_table_context(self, lines, start_idx):
-        """Extract table content around the detected row"""
-        # Simple table extraction
-        table_lines = []
-        for i in range(max(0, start_idx-2), min(len(lines), start_idx+3)):
-            if '|' in lines[i]:
-                table_lines.append(lines[i].strip())
-        return '\n'.join(table_lines) if table_lines else None
+    def _extract_table(self, lines, start_idx):
+        """Collect the contiguous pipe rows starting at start_idx into one table
+        
+        Returns (table, end_idx) where end_idx is the first line after the
+        table. A lone pipe line (e.g. a journal footer) is not a table and
+        yields None.
+        """
+        rows = []
+        separators = []
+        end_idx = start_idx
+        while end_idx < len(lines):
+            row = lines[end_idx].strip()
+            if row.count('|') < 2:
+                break
+            if _TABLE_SEPARATOR.match(row):
+                # A header separator below the first header row starts the next
+                # table when two tables follow each other without a blank line
+                if len(separators) > 1 and not separators[-1]:
+                    end_idx -= 1
+                    rows.pop()
+                    separators.pop()
+                    break
+                separators.append(True)
+            else:
+                separators.append(False)
+                rows.append(row)
+            end_idx += 1
+        
+        if len(separators) < 2:
+            return None, end_idx
+        
+        cells = [self._split_table_row(row) for row in rows]
+        table = {
+            "rows": len(cells),
+            "columns": max((len(row) for row in cells), default=0),
+            "has_header": len(separators) > 1 and separators[1],
+            "cells": cells
+        }
+        return table, end_idx
     
-    def _is_figure_reference(self, line):
-        """Check if line references a figure"""
-        return bool(re.search(r'[Ff]igure\s+\d+|[Ff]ig\.?\s+\d+', line))
+    def _split_table_row(self, row):
+        """Cell texts of one Markdown table row (escaped pipes are kept)"""
+        if row.startswith('|'):
+            row = row[1:]
+        if row.endswith('|') and not row.endswith('\\|'):
+            row = row[:-1]
+        return [cell.strip() for cell in _TABLE_CELL_SPLIT.split(row)]
     
     def _extract_figure_info(self, line):
         """Extract figure information"""
         return line.strip()
     
-    def _is_reference(self, line):
-        """Check if line is a reference"""
-        return bool(re.search(r'^\[\d+\]|\(\d{4}\)|et\s+al\.', line))
-    
     def _clean_reference(self, line):
         """Clean reference text"""
         return line.strip()
     
-    def analyze_all_outputs(self):
-        """Analyze all OCR outputs and create structured JSON files"""
+    def find_output_files(self):
+        """Newest OCR output file for each (pdf, system) pair under results_dir
+        
+        The same pair often appears in several run directories; only the
+        most recently written copy is kept, so each pair is parsed once.
+        Returns ({(pdf_name, system_name): path}, duplicates_skipped).
+        """
+        latest = {}
+        duplicates = 0
+        for file in self.results_dir.glob("**/*_*.txt"):
+            parts = file.stem.split('_')
+            if len(parts) < 2 or parts[-1] not in BACKENDS:
+                continue
+            key = ('_'.join(parts[:-1]), parts[-1])
+            mtime = file.stat().st_mtime
+            if key in latest:
+                duplicates += 1
+                if latest[key][0] >= mtime:
+                    continue
+            latest[key] = (mtime, file)
+        return {key: file for key, (_, file) in latest.items()}, duplicates
+    
+    def analyze_all_outputs(self, workers=None):
+        """Analyze all OCR outputs and create structured JSON files
+        
+        Files are parsed on a process pool and each structure is appended to
+        structure_analysis.jsonl as soon as it completes; the combined JSON is
+        then written from that file by a streaming merge, so no more than one
+        structure is held in memory at a time.
+        """
         
         print("🔍 ANALYZING OCR STRUCTURE OUTPUTS")
         print("=" * 50)
         
         # Find all OCR output files (look in subdirectories too)
-        ocr_files = list(self.results_dir.glob("**/*_*.txt"))
+        output_files, duplicates = self.find_output_files()
         
-        if not ocr_files:
+        if not output_files:
             print("❌ No OCR output files found in results directory")
             return
         
-        # Group files by PDF
-        pdf_groups = {}
-        for file in ocr_files:
-            parts = file.stem.split('_')
-            if len(parts) >= 2:
-                pdf_name = '_'.join(parts[:-1])
-                ocr_system = parts[-1]
-                
-                if pdf_name not in pdf_groups:
-                    pdf_groups[pdf_name] = {}
-                pdf_groups[pdf_name][ocr_system] = file
+        if duplicates:
+            print(f"♻️  Skipping {duplicates} older copies of pdf/system outputs found in several runs")
         
-        # Process each PDF
-        all_analyses = {}
+        tasks = [(pdf_name, system_name, str(file), str(self.examples_dir))
+                 for (pdf_name, system_name), file in sorted(output_files.items())]
+        workers = min(workers or default_workers(), len(tasks))
+        jsonl_file = self.examples_dir / "structure_analysis.jsonl"
+        comparison_data = []
+        index = []  # (pdf, system, byte offset) of each record, for the merge
+        offset = 0
         
-        for pdf_name, systems in pdf_groups.items():
-            print(f"\n📄 Analyzing: {pdf_name}")
-            
-            pdf_analysis = {
-                "pdf_name": pdf_name,
-                "timestamp": datetime.now().isoformat(),
-                "ocr_systems": {}
-            }
-            
-            for system_name, file_path in systems.items():
-                print(f"  🔄 Processing {system_name}...")
-                
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    content = f.read()
-                
-                # Parse based on OCR system
-                if system_name == "Marker":
-                    structure = self.parse_marker_structure(content)
-                elif system_name == "Docling":
-                    structure = self.parse_docling_structure(content)
-                elif system_name == "PyMuPDF":
-                    structure = self.parse_pymupdf_structure(content)
-                else:
-                    continue
-                
-                pdf_analysis["ocr_systems"][system_name] = structure
-                
-                # Save individual system analysis
-                output_file = self.examples_dir / f"{pdf_name}_{system_name}_structure.json"
-                with open(output_file, 'w', encoding='utf-8') as f:
-                    json.dump(structure, f, indent=2, ensure_ascii=False)
-                
-                print(f"    ✅ Saved: {output_file}")
-            
-            all_analyses[pdf_name] = pdf_analysis
+        with open(jsonl_file, 'wb') as jsonl:
+            if workers > 1:
+                pool = Pool(workers)
+                results = pool.imap_unordered(_analyze_output_file, tasks)
+            else:
+                pool = None
+                results = map(_analyze_output_file, tasks)
+            try:
+                for pdf_name, system_name, record_line, comparison_row, output_file in results:
+                    data = (record_line + '\n').encode('utf-8')
+                    jsonl.write(data)
+                    jsonl.flush()
+                    index.append((pdf_name, system_name, offset))
+                    offset += len(data)
+                    comparison_data.append(comparison_row)
+                    print(f"  ✅ {pdf_name} / {system_name}: {output_file}")
+            finally:
+                if pool is not None:
+                    pool.close()
+                    pool.join()
         
         # Save combined analysis
         combined_file = self.examples_dir / "combined_structure_analysis.json"
-        with open(combined_file, 'w', encoding='utf-8') as f:
-            json.dump(all_analyses, f, indent=2, ensure_ascii=False)
+        merge_structure_records(jsonl_file, combined_file, index)
         
         # Create comparison summary
-        self.create_structure_comparison(all_analyses)
+        comparison_data.sort(key=lambda row: (row["PDF"], row["OCR_System"]))
+        self.write_structure_comparison(comparison_data)
         
         print(f"\n✅ Structure analysis complete!")
         print(f"📁 JSON outputs saved to: {self.examples_dir}")
+        print(f"📝 Per-file records: {jsonl_file}")
         print(f"📊 Combined analysis: {combined_file}")
     
     def create_structure_comparison(self, analyses):
@@ -358,24 +467,12 @@ class DocumentStructureParser:
         
         for pdf_name, pdf_data in analyses.items():
             for system_name, structure in pdf_data["ocr_systems"].items():
-                metadata = structure["metadata"]
-                elements = structure["document_elements"]
-                
-                comparison_data.append({
-                    "PDF": pdf_name,
-                    "OCR_System": system_name,
-                    "Total_Sections": metadata["total_sections"],
-                    "Total_Paragraphs": metadata["total_paragraphs"],
-                    "Has_Structured_Content": metadata["has_structured_content"],
-                    "Title_Detected": elements["title"] is not None,
-                    "Authors_Detected": len(elements["authors"]) > 0,
-                    "Abstract_Detected": elements["abstract"] is not None,
-                    "Equations_Found": len(elements["equations"]),
-                    "Tables_Found": len(elements["tables"]),
-                    "Figures_Found": len(elements["figures"]),
-                    "References_Found": len(elements["references"]),
-                    "Reading_Order_Items": len(structure["reading_order"])
-                })
+                comparison_data.append(comparison_row(pdf_name, system_name, structure))
+        
+        return self.write_structure_comparison(comparison_data)
+    
+    def write_structure_comparison(self, comparison_data):
+        """Save and print the comparison CSV from per-structure rows"""
         
         # Save comparison CSV
         df = pd.DataFrame(comparison_data)
@@ -388,7 +485,123 @@ class DocumentStructureParser:
         print(f"\n📈 STRUCTURE PARSING SUMMARY")
         print("=" * 50)
         print(df.to_string(index=False))
+        return df
+
+
+def parse_output(system_name, content, parser=None):
+    """Structure of one OCR output, parsed by the method its backend names"""
+    parser = parser or DocumentStructureParser()
+    structure = getattr(parser, get_backend(system_name).structure_parser)(content)
+    # Backends sharing an output format (e.g. Markdown) share a parser
+    structure["ocr_system"] = system_name
+    return structure
+
+
+def parse_artifact(system_name, path, parser=None):
+    """Structure of a saved extraction, read through its TextArtifact
+    
+    Plain-text outputs are parsed from mmap'd chunks without decoding the
+    whole file at once; the Markdown parsers need the full text. Legacy
+    outputs with a text header are parsed without the header.
+    """
+    if not is_artifact(path):
+        return parse_output(system_name, read_text(path), parser)
+    with TextArtifact(path) as artifact:
+        if get_backend(system_name).structure_parser == 'parse_pymupdf_structure':
+            structure = (parser or DocumentStructureParser()).parse_pymupdf_stream(artifact.iter_chunks())
+            structure["ocr_system"] = system_name
+            return structure
+        return parse_output(system_name, artifact.text(), parser)
+
+
+def comparison_row(pdf_name, system_name, structure):
+    """Row of the structure comparison CSV for one parsed output"""
+    metadata = structure["metadata"]
+    elements = structure["document_elements"]
+    return {
+        "PDF": pdf_name,
+        "OCR_System": system_name,
+        "Total_Sections": metadata["total_sections"],
+        "Total_Paragraphs": metadata["total_paragraphs"],
+        "Has_Structured_Content": metadata["has_structured_content"],
+        "Title_Detected": elements["title"] is not None,
+        "Authors_Detected": len(elements["authors"]) > 0,
+        "Abstract_Detected": elements["abstract"] is not None,
+        "Equations_Found": len(elements["equations"]),
+        "Tables_Found": len(elements["tables"]),
+        "Figures_Found": len(elements["figures"]),
+        "References_Found": len(elements["references"]),
+        "Reading_Order_Items": len(structure["reading_order"])
+    }
+
+
+def _analyze_output_file(task):
+    """Pool worker: parse one OCR output and save its structure JSON
+    
+    Returns the JSON Lines record (already serialized) and the comparison
+    row, so only small strings travel back to the parent.
+    """
+    pdf_name, system_name, file_path, examples_dir = task
+    structure = parse_artifact(system_name, file_path)
+    
+    # Save individual system analysis
+    output_file = Path(examples_dir) / f"{pdf_name}_{system_name}_structure.json"
+    with open(output_file, 'w', encoding='utf-8') as f:
+        json.dump(structure, f, indent=2, ensure_ascii=False)
+    
+    record = {"pdf_name": pdf_name, "ocr_system": system_name, "source": file_path, "structure": structure}
+    return (pdf_name, system_name, json.dumps(record, ensure_ascii=False),
+            comparison_row(pdf_name, system_name, structure), output_file)
+
+
+def merge_structure_records(jsonl_file, combined_file, index=None):
+    """Write the combined {pdf: {"ocr_systems": {system: structure}}} JSON from JSON Lines
+    
+    Only (pdf, system, offset) is indexed in memory; records are re-read
+    one at a time in pdf/system order and written out as they are read.
+    The output matches json.dump(..., indent=2) of the whole mapping.
+    index is the list of (pdf, system, byte offset) recorded while the
+    file was written; without it each line is parsed once to build it.
+    """
+    if index is None:
+        index = []
+        with open(jsonl_file, 'rb') as f:
+            offset = 0
+            for raw in f:
+                record = json.loads(raw)
+                index.append((record["pdf_name"], record["ocr_system"], offset))
+                offset += len(raw)
+    index = sorted(index)
+    
+    def indented(value, level):
+        return json.dumps(value, indent=2, ensure_ascii=False).replace('\n', '\n' + '  ' * level)
+    
+    with open(jsonl_file, 'rb') as src, open(combined_file, 'w', encoding='utf-8') as out:
+        out.write('{')
+        current_pdf = None
+        for pdf_name, system_name, offset in index:
+            src.seek(offset)
+            structure = json.loads(src.readline())["structure"]
+            if pdf_name != current_pdf:
+                if current_pdf is not None:
+                    out.write('\n    }\n  },')
+                current_pdf = pdf_name
+                out.write(f'\n  {indented(pdf_name, 1)}: {{')
+                out.write(f'\n    "pdf_name": {indented(pdf_name, 2)},')
+                out.write(f'\n    "timestamp": {indented(datetime.now().isoformat(), 2)},')
+                out.write('\n    "ocr_systems": {')
+            else:
+                out.write(',')
+            out.write(f'\n      {indented(system_name, 3)}: {indented(structure, 3)}')
+        out.write('\n    }\n  }\n}' if current_pdf is not None else '}')
 
 if __name__ == "__main__":
+    import argparse
+    
+    cli = argparse.ArgumentParser(description="Analyze OCR output structure")
+    cli.add_argument('--workers', type=int, default=None,
+                     help="Parser processes (default: number of usable cores)")
+    args = cli.parse_args()
+    
     parser = DocumentStructureParser()
-    parser.analyze_all_outputs()
+    parser.analyze_all_outputs(workers=args.workers)
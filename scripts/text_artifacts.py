@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+Memory-Mapped Text Artifacts
+
+An extraction is stored as two files: the text itself as an uncompressed
+UTF-8 blob (``<pdf>_<system>.txt``) and a small JSON sidecar
+(``<pdf>_<system>.txt.idx.json``) with the extraction metadata and the
+byte range of every ``=== Page N ===`` page. Readers ``mmap`` the blob and
+decode only the pages or chunks they ask for, so scoring or parsing one
+page never reads the rest of a large document.
+
+Page semantics match ``page_scoring.split_pages``: the marker line is not
+part of a page, text before the first marker belongs to the first page,
+and text without markers is a single page numbered 1.
+
+Files written before this format (a text header above a ``====`` rule and
+no sidecar) are still read by ``read_text``.
+"""
+
+import codecs
+import json
+import mmap
+import os
+from pathlib import Path
+
+try:
+    from scripts.page_scoring import PAGE_MARKER
+except ImportError:  # run directly from the scripts directory
+    from page_scoring import PAGE_MARKER
+
+INDEX_SUFFIX = '.idx.json'
+INDEX_VERSION = 1
+LEGACY_HEADER_RULE = "=" * 60 + "\n\n"
+
+
+def index_path(path):
+    return Path(str(path) + INDEX_SUFFIX)
+
+
+def is_artifact(path):
+    """Whether path has a page-offset sidecar"""
+    return index_path(path).exists()
+
+
+def page_index(text):
+    """Byte offsets of the pages of text: (preface_end, [(number, start, end)], has_markers)"""
+    markers = list(PAGE_MARKER.finditer(text))
+    if not markers:
+        return 0, [(1, 0, len(text.encode('utf-8')))], False
+
+    # Encode each span between marker boundaries once to get byte offsets
+    offset = 0
+    position = 0
+    byte_at = {}
+    for boundary in sorted({m.start() for m in markers} | {m.end() for m in markers} | {len(text)}):
+        offset += len(text[position:boundary].encode('utf-8'))
+        byte_at[boundary] = offset
+        position = boundary
+
+    pages = []
+    for idx, match in enumerate(markers):
+        end = markers[idx + 1].start() if idx + 1 < len(markers) else len(text)
+        pages.append((int(match.group(1)), byte_at[match.end()], byte_at[end]))
+    return byte_at[markers[0].start()], pages, True
+
+
+def write_artifact(path, text, metadata=None):
+    """Write text and its sidecar index; returns the blob path.
+
+    The sidecar is written last, so a blob without one was interrupted.
+    """
+    path = Path(path)
+    preface_end, pages, has_markers = page_index(text)
+    index = {
+        'version': INDEX_VERSION,
+        'encoding': 'utf-8',
+        'bytes': len(text.encode('utf-8')),
+        'chars': len(text),
+        'preface_end': preface_end,
+        'has_markers': has_markers,
+        'pages': pages,
+        'metadata': metadata or {},
+    }
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        f.write(text)
+    tmp = index_path(path).with_suffix('.tmp')
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(index, f, default=str)
+    os.replace(tmp, index_path(path))
+    return path
+
+
+class TextArtifact:
+    """Read-only mmap view of an extraction artifact"""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        with open(index_path(self.path), encoding='utf-8') as f:
+            self.index = json.load(f)
+        self._pages = {number: (start, end) for number, start, end in self.index['pages']}
+        self._file = open(self.path, 'rb')
+        size = os.fstat(self._file.fileno()).st_size
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if size else b''
+        self._view = memoryview(self._map)
+
+    def close(self):
+        self._view.release()
+        if self._map:
+            self._map.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    @property
+    def metadata(self):
+        return self.index['metadata']
+
+    @property
+    def has_markers(self):
+        return self.index['has_markers']
+
+    @property
+    def page_numbers(self):
+        return [number for number, _, _ in self.index['pages']]
+
+    def __contains__(self, page_number):
+        return page_number in self._pages
+
+    def page_bytes(self, page_number):
+        """Zero-copy UTF-8 bytes of a page body (first-page preface excluded)"""
+        start, end = self._pages[page_number]
+        return self._view[start:end]
+
+    def page(self, page_number):
+        """Text of one page, as split_pages returns it"""
+        text = str(self.page_bytes(page_number), 'utf-8')
+        if page_number == self.index['pages'][0][0] and self.index['preface_end']:
+            text = str(self._view[:self.index['preface_end']], 'utf-8') + text
+        return text
+
+    def pages(self, first=None, last=None):
+        """(page_number, text) for pages numbered first..last (inclusive)"""
+        return [(number, self.page(number)) for number in self.page_numbers
+                if (first is None or number >= first) and (last is None or number <= last)]
+
+    def iter_chunks(self, chunk_bytes=1 << 20):
+        """Decoded text in chunks that concatenate to the whole document"""
+        decoder = codecs.getincrementaldecoder('utf-8')()
+        for start in range(0, len(self._view), chunk_bytes):
+            yield decoder.decode(self._view[start:start + chunk_bytes])
+        yield decoder.decode(b'', final=True)
+
+    def text(self):
+        """The whole document"""
+        return str(self._view, 'utf-8')
+
+
+def read_text(path):
+    """Extracted text of an artifact or of a legacy header-prefixed .txt file"""
+    if is_artifact(path):
+        with TextArtifact(path) as artifact:
+            return artifact.text()
+    with open(path, 'r', encoding='utf-8', newline='') as f:
+        content = f.read()
+    _, separator, text = content.partition(LEGACY_HEADER_RULE)
+    return text if separator else content
@@ -0,0 +1,69 @@
+import random
+
+import pytest
+
+from scripts.edit_distance import character_accuracy, levenshtein, token_accuracy, tokenize_ids, word_accuracy
+
+
+def _dp_levenshtein(a, b):
+    """Textbook O(n*m) Levenshtein distance"""
+    previous = list(range(len(b) + 1))
+    for i, x in enumerate(a, 1):
+        current = [i]
+        for j, y in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (x != y)))
+        previous = current
+    return previous[-1]
+
+
+@pytest.mark.parametrize("a, b, distance", [
+    ("", "", 0),
+    ("abc", "", 3),
+    ("", "abc", 3),
+    ("kitten", "sitting", 3),
+    ("flaw", "lawn", 2),
+    ("same text", "same text", 0),
+])
+def test_levenshtein_known_distances(a, b, distance):
+    assert levenshtein(a, b) == distance
+    assert levenshtein(b, a) == distance
+
+
+def test_levenshtein_matches_dynamic_programming():
+    rng = random.Random(0)
+    for _ in range(200):
+        # Lengths past 64 exercise bit vectors wider than one machine word
+        a = ''.join(rng.choice('abcd ') for _ in range(rng.randint(0, 150)))
+        b = ''.join(rng.choice('abcd ') for _ in range(rng.randint(0, 150)))
+        assert levenshtein(a, b) == _dp_levenshtein(a, b)
+
+
+def test_levenshtein_on_token_ids():
+    vocabulary = {}
+    ref = tokenize_ids("the quick brown fox".split(), vocabulary)
+    cand = tokenize_ids("the quick red fox jumps".split(), vocabulary)
+    assert levenshtein(ref, cand) == 2
+
+
+def test_levenshtein_max_distance_caps_the_result():
+    assert levenshtein("kitten", "sitting", max_distance=1) == 2
+    assert levenshtein("kitten", "sitting", max_distance=3) == 3
+    # Length difference alone exceeds the bound
+    assert levenshtein("a", "abcdef", max_distance=2) == 3
+
+
+def test_tokenize_ids_shares_the_vocabulary():
+    vocabulary = {}
+    first = tokenize_ids(["a", "b", "a"], vocabulary)
+    second = tokenize_ids(["b", "c"], vocabulary)
+    assert list(first) == [0, 1, 0]
+    assert list(second) == [1, 2]
+    assert vocabulary == {"a": 0, "b": 1, "c": 2}
+
+
+def test_accuracies():
+    assert character_accuracy("", "") == 1.0
+    assert character_accuracy("abcd", "abcf") == pytest.approx(0.75)
+    assert word_accuracy("a b c d".split(), "a b x d".split()) == pytest.approx(0.75)
+    assert token_accuracy([], []) == 1.0
+    assert token_accuracy([], tokenize_ids(["a"])) == 0.0
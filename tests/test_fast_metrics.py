@@ -0,0 +1,87 @@
+import random
+
+import pytest
+
+from scripts.edit_distance import levenshtein
+from scripts.fast_metrics import (bag_of_words_scores, char_ngrams, error_rate, minhash_sketch, sketch_jaccard,
+                                  sparse_distances)
+from scripts.normalized_text import normalize_pair
+
+
+def _exact_jaccard(a, b):
+    set_a, set_b = char_ngrams(a), char_ngrams(b)
+    return len(set_a & set_b) / len(set_a | set_b)
+
+
+def _words(rng, count):
+    return ' '.join(''.join(rng.choice('abcdefghij') for _ in range(rng.randint(2, 8))) for _ in range(count))
+
+
+def test_sketch_jaccard_of_small_sets_is_exact():
+    # Truncating both sketches at the smaller maximum would give 1/2
+    assert sketch_jaccard([1, 5], [1, 3]) == pytest.approx(1 / 3)
+    assert sketch_jaccard([1, 2, 3], [1, 2, 3]) == 1.0
+    assert sketch_jaccard([1, 2], [3, 4]) == 0.0
+
+
+def test_sketch_jaccard_of_empty_sketches():
+    assert sketch_jaccard([], []) == 1.0
+    assert sketch_jaccard([], [1]) == 0.0
+
+
+def test_sketch_jaccard_of_full_sketches_uses_the_shared_slice():
+    # Below min(a[-1], b[-1]) = 6 the slices are {1, 2, 4} and {1, 3, 4, 5}
+    assert sketch_jaccard([1, 2, 4, 6], [1, 3, 4, 5], size=4) == pytest.approx(2 / 5)
+
+
+def test_minhash_estimate_is_close_to_the_exact_jaccard():
+    rng = random.Random(0)
+    reference = _words(rng, 400)
+    words = reference.split()
+    candidate = ' '.join(words[:300] + [_words(rng, 1) for _ in range(100)])
+    estimate = sketch_jaccard(minhash_sketch(reference), minhash_sketch(candidate))
+    assert estimate == pytest.approx(_exact_jaccard(reference, candidate), abs=0.1)
+    assert sketch_jaccard(minhash_sketch(reference), minhash_sketch(reference)) == 1.0
+
+
+def test_minhash_sketch_of_normalized_text_is_cached():
+    reference, _ = normalize_pair("some text to sketch", "other")
+    sketch = minhash_sketch(reference)
+    assert minhash_sketch(reference) is sketch
+    assert sketch == minhash_sketch(reference.collapsed)
+
+
+def test_sparse_distances_of_identical_texts():
+    reference, candidate = normalize_pair("one two three four", "one  two\nthree four")
+    assert sparse_distances(reference, candidate) == (0, 0)
+
+
+def test_sparse_distances_of_a_substitution_are_exact():
+    reference, candidate = normalize_pair("alpha beta gamma delta epsilon", "alpha beta gamme delta epsilon")
+    assert sparse_distances(reference, candidate) == (1, 1)
+
+
+def test_sparse_distances_bound_the_exact_distances():
+    rng = random.Random(1)
+    for _ in range(20):
+        words = _words(rng, 120).split()
+        edited = [word for word in words if rng.random() > 0.1]
+        edited.insert(rng.randint(0, len(edited)), 'inserted')
+        reference, candidate = normalize_pair(' '.join(words), ' '.join(edited))
+        char_distance, word_distance = sparse_distances(reference, candidate)
+        assert char_distance >= levenshtein(reference.collapsed, candidate.collapsed)
+        assert word_distance >= levenshtein(reference.token_ids, candidate.token_ids)
+
+
+def test_bag_of_words_scores():
+    reference, candidate = normalize_pair("a b b c", "a b d")
+    scores = bag_of_words_scores(reference, candidate)
+    assert scores['token_precision'] == pytest.approx(2 / 3)
+    assert scores['token_recall'] == pytest.approx(2 / 4)
+    assert scores['token_f1'] == pytest.approx(4 / 7)
+
+
+def test_error_rate():
+    assert error_rate(3, 10) == 0.3
+    assert error_rate(0, 0) == 0.0
+    assert error_rate(2, 0) == 1.0
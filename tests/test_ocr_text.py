@@ -0,0 +1,79 @@
+import shutil
+
+import pytest
+
+fitz = pytest.importorskip("fitz")
+ocrmypdf = pytest.importorskip("ocrmypdf")
+pytest.importorskip("pymupdf4llm")
+pytest.importorskip("pandas")
+
+from scripts import ocr_text
+from scripts.ocr_text import classify_pages, run_ocr, run_selective_ocr
+
+
+def _scanned_copy(page, dpi=150):
+    """An image-only page showing what ``page`` renders"""
+    return page.get_pixmap(dpi=dpi)
+
+
+@pytest.fixture
+def mixed_pdf(tmp_path):
+    """Three pages: born-digital, scanned (image only), born-digital; with a TOC"""
+    path = tmp_path / "mixed.pdf"
+    with fitz.open() as source:
+        scan = source.new_page()
+        scan.insert_text((72, 200), "SCANNED PAGE TEXT", fontsize=40)
+        pixmap = _scanned_copy(scan)
+    with fitz.open() as doc:
+        for number, text in ((1, "alpha " * 40), (2, None), (3, "gamma " * 40)):
+            page = doc.new_page()
+            if text is None:
+                page.insert_image(page.rect, pixmap=pixmap)
+            else:
+                page.insert_textbox(fitz.Rect(72, 72, 540, 720), text, fontsize=11)
+        doc.set_toc([[1, "Start", 1], [1, "End", 3]])
+        doc.save(path)
+    return path
+
+
+def test_classify_pages_finds_the_scanned_page(mixed_pdf):
+    assert [page["page"] for page in classify_pages(mixed_pdf) if page["needs_ocr"]] == [2]
+
+
+def test_selective_ocr_splices_ocr_pages_back_in_order(mixed_pdf, tmp_path, monkeypatch):
+    def fake_ocr(input_path, output_path):
+        with fitz.open(input_path) as doc:
+            for page in doc:
+                page.insert_text((72, 72), f"OCR OF SUBSET PAGE {page.number + 1}")
+            doc.save(output_path)
+
+    monkeypatch.setattr(ocr_text, "run_ocr", fake_ocr)
+    output = run_selective_ocr(mixed_pdf, tmp_path / "out.pdf", [2], tmp_path)
+
+    with fitz.open(output) as doc:
+        texts = [page.get_text() for page in doc]
+        toc = doc.get_toc()
+    assert len(texts) == 3
+    assert "alpha" in texts[0] and "OCR" not in texts[0]
+    assert "OCR OF SUBSET PAGE 1" in texts[1]
+    assert "gamma" in texts[2] and "OCR" not in texts[2]
+    assert toc == [[1, "Start", 1], [1, "End", 3]]
+
+
+def test_run_ocr_options_pass_ocrmypdf_validation(mixed_pdf, tmp_path):
+    # force_ocr and skip_text together fail OCRmyPDF's option validation
+    # (a TypeError), before it looks for tesseract
+    try:
+        run_ocr(mixed_pdf, tmp_path / "ocr.pdf")
+    except ocrmypdf.exceptions.MissingDependencyError:
+        pass
+
+
+@pytest.mark.skipif(shutil.which("tesseract") is None, reason="tesseract not installed")
+def test_selective_ocr_recognizes_the_scanned_page(mixed_pdf, tmp_path):
+    output = run_selective_ocr(mixed_pdf, tmp_path / "out.pdf", [2], tmp_path)
+    with fitz.open(output) as doc:
+        texts = [page.get_text() for page in doc]
+    assert len(texts) == 3
+    assert "SCANNED" in texts[1].upper()
+    assert "alpha" in texts[0] and "gamma" in texts[2]
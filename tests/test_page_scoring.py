@@ -0,0 +1,62 @@
+import pytest
+
+from scripts.normalized_text import NormalizedText
+from scripts.page_scoring import align_pages, score_page_aligned, split_pages, strip_page_markers
+
+PAGE_WORDS = [
+    "malaria vectors were collected from twelve villages during the rainy season",
+    "bioassays measured mortality after exposure to treated wall linings in huts",
+    "resistance to pyrethroids was widespread across every sampled population here",
+]
+
+
+def _marked(pages):
+    return ''.join(f"\n=== Page {number} ===\n{text}\n" for number, text in enumerate(pages, 1))
+
+
+def test_split_pages():
+    assert split_pages("no markers") == [(1, "no markers")]
+    assert split_pages("intro\n=== Page 1 ===\none\n=== Page 2 ===\ntwo") == [(1, "intro\n\none\n"), (2, "\ntwo")]
+
+
+def test_strip_page_markers():
+    assert strip_page_markers(_marked(["one", "two"])).split() == ["one", "two"]
+
+
+def test_align_pages_pairs_marked_pages_by_number():
+    reference = _marked(PAGE_WORDS[:2])
+    candidate = "=== Page 2 ===\nsecond\n=== Page 3 ===\nextra"
+    assert align_pages(reference, candidate) == [
+        (1, PAGE_WORDS[0], ''),
+        (2, PAGE_WORDS[1], 'second'),
+        (3, '', 'extra'),
+    ]
+
+
+def test_align_pages_projects_reference_pages_onto_an_unmarked_candidate():
+    candidate = "# Title\n\n" + "\n\n".join(PAGE_WORDS)
+    aligned = align_pages(_marked(PAGE_WORDS), candidate)
+    assert [number for number, _, _ in aligned] == [1, 2, 3]
+    assert [ref for _, ref, _ in aligned] == PAGE_WORDS
+    assert [cand for _, _, cand in aligned] == ["# Title " + PAGE_WORDS[0]] + PAGE_WORDS[1:]
+
+
+def test_align_pages_projects_candidate_pages_onto_an_unmarked_reference():
+    # A ground-truth reference without markers against a paged extraction
+    reference = "\n".join(PAGE_WORDS)
+    aligned = align_pages(reference, _marked(PAGE_WORDS))
+    assert aligned == [(number, text, text) for number, text in enumerate(PAGE_WORDS, 1)]
+    assert not any('===' in chunk for _, ref, cand in aligned for chunk in (ref, cand))
+
+
+def test_align_pages_accepts_normalized_text():
+    vocabulary = {}
+    reference = NormalizedText(_marked(PAGE_WORDS), vocabulary)
+    candidate = NormalizedText("\n".join(PAGE_WORDS), vocabulary)
+    assert align_pages(reference, candidate) == align_pages(reference.text, candidate.text)
+
+
+def test_score_page_aligned_of_identical_pages():
+    scores = score_page_aligned(_marked(PAGE_WORDS), "\n".join(PAGE_WORDS))
+    assert scores['character_accuracy'] == pytest.approx(1.0)
+    assert scores['word_accuracy'] == pytest.approx(1.0)
@@ -0,0 +1,28 @@
+import pytest
+
+pytest.importorskip("pandas")
+
+from scripts.structure_parser import classify_marker_line
+
+
+@pytest.mark.parametrize("line, element", [
+    ("# Insecticide resistance in Anopheles", 'title'),
+    ("## Methods", 'section'),
+    ("### Study area", 'subsection'),
+    ("Martin Akogbeto, Rock Aikpon and Gil Padonou", 'authors'),
+    ("$$ M = 100 (a - b) / a $$", 'equation'),
+    ("| Village | Mortality |", 'table'),
+    ("Figure 2: mortality by village", 'figure'),
+    ("[12] Somboon P, Lines J. Trans. R. Soc. Trop. Med. Hyg. 1995", 'reference'),
+    ("mosquitoes were exposed for one hour to each of the treated wall linings in the huts", 'paragraph'),
+    ("short line", None),
+])
+def test_classify_marker_line(line, element):
+    assert classify_marker_line(line) == element
+
+
+def test_title_and_authors_only_while_open():
+    assert classify_marker_line("# Another heading", title_open=False) is None
+    assert classify_marker_line("Martin Akogbeto", authors_open=False) is None
+    # Heading rules still take priority over the closed title
+    assert classify_marker_line("## Results", title_open=False) == 'section'